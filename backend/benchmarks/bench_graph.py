@@ -0,0 +1,346 @@
+"""
+benchmarks/bench_graph.py
+-------------------------
+Latency / throughput benchmark for the graph service layer.
+
+For every scale it generates a synthetic Chennai graph, loads it into a
+backend and measures:
+  - each tool query type (`find_places`, `vector_search`, `find_hotels`,
+    `find_cabs`, `calculate_itinerary`) with randomized realistic params;
+  - the trip planner per route size (stops per day, hotel round trip).
+
+Backends:
+  - memory  — benchmarks/memory_graph.py, no services required (default).
+  - neo4j   — loads the graph into the Neo4j from .env (NEO4J_URI) and calls
+              neo4j_service directly. Reported both uncached (`_run_query`) and
+              through the result cache (`query_graph`). The database is wiped,
+              so non-local URIs are refused unless --allow-remote is given.
+
+Each run is written to <results dir>/<backend>-<timestamp>.json (default
+benchmarks/results/, git-ignored; --results-dir or BENCH_RESULTS_DIR moves it)
+with p50/p95/p99/mean latency (ms) and throughput (ops/s), then compared with
+a baseline; p95 regressions above --threshold are reported, and fail the run
+only with --fail-on-regression.
+
+Latencies are hardware-bound, so baselines are per machine and never
+committed: <results dir>/baseline-<backend>-<machine>.json is written by the
+first run on a machine and by --update-baseline. --baseline <file> compares
+with any other result file instead (a warning is printed if it was recorded
+on a different machine).
+
+    python -m benchmarks.bench_graph                        # memory, 10× 100× 1000×
+    python -m benchmarks.bench_graph --scales 10 --iterations 500
+    python -m benchmarks.bench_graph --backend neo4j --scales 10 100
+    python -m benchmarks.bench_graph --update-baseline      # re-record this machine's baseline
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import subprocess
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _BACKEND_DIR not in sys.path:
+    sys.path.insert(0, _BACKEND_DIR)
+
+from benchmarks.synthetic_graph import SCALES, EMBEDDING_DIM, generate, describe, load_seed_data
+from benchmarks.memory_graph import InMemoryGraph
+
+_BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.getenv("BENCH_RESULTS_DIR") or os.path.join(_BENCH_DIR, "results")
+QUERY_TYPES = ("find_places", "vector_search", "find_hotels", "find_cabs", "calculate_itinerary")
+ROUTE_SIZES = (3, 5, 8, 10, 12, 15, 20, 30)
+MAX_MATRIX_MB = float(os.getenv("BENCH_MAX_MATRIX_MB", "2048"))   # dense road matrix guard
+REGRESSION_THRESHOLD = 0.20       # flag p95 slower by more than 20 %…
+REGRESSION_MIN_DELTA_MS = 0.05    # …and by more than timer noise
+
+VECTOR_QUERIES = [
+    "quiet beach for a sunset walk", "ancient temple with stone carvings", "museum about Tamil history",
+    "place for kids on a weekend", "colonial architecture and heritage buildings", "local market for silk sarees",
+    "budget hotel with breakfast near the beach", "luxury hotel with a pool", "green park to relax in the evening",
+    "church with stained glass windows", "shopping mall with food court", "zoo or wildlife park",
+]
+
+
+# ─── Measurement ──────────────────────────────────────────────────────────────
+
+def summarize(latencies_ms: list, wall_secs: float) -> dict:
+    lat = np.asarray(latencies_ms, dtype=np.float64)
+    return {
+        "n": int(len(lat)),
+        "p50_ms": round(float(np.percentile(lat, 50)), 4),
+        "p95_ms": round(float(np.percentile(lat, 95)), 4),
+        "p99_ms": round(float(np.percentile(lat, 99)), 4),
+        "mean_ms": round(float(lat.mean()), 4),
+        "max_ms": round(float(lat.max()), 4),
+        "throughput_ops_s": round(len(lat) / wall_secs, 2) if wall_secs > 0 else None,
+    }
+
+
+def measure(fn, make_args, iterations: int, warmup: int, concurrency: int = 1) -> dict:
+    """Call fn(*make_args()) `iterations` times (after `warmup` untimed calls) and summarize."""
+    for _ in range(warmup):
+        fn(*make_args())
+    calls = [make_args() for _ in range(iterations)]
+
+    def timed(args):
+        start = time.perf_counter()
+        fn(*args)
+        return (time.perf_counter() - start) * 1000
+
+    wall_start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(timed, calls))
+    else:
+        latencies = [timed(args) for args in calls]
+    return summarize(latencies, time.perf_counter() - wall_start)
+
+
+# ─── Workload ─────────────────────────────────────────────────────────────────
+
+class Workload:
+    """Randomized tool params drawn from the seed data's real vocabulary."""
+
+    def __init__(self, graph: dict, seed: int = 7):
+        self.rng = random.Random(seed)
+        seed_data = load_seed_data()
+        self.categories = sorted({p["category"] for p in seed_data["places"]})
+        self.amenities = sorted({a for h in seed_data["hotels"] for r in h["rooms"] for a in r["amenities"]})
+        self.vehicle_types = sorted({v["vehicle_type"] for a in seed_data["transport"]["transport_agencies"]
+                                     for v in a["fleet"]})
+        self.place_names = [p["name"] for p in graph["places"]]
+        self.hotel_names = [h["name"] for h in graph["hotels"]]
+        # Query vectors near real rows, so top-k scores look like real searches
+        np_rng = np.random.default_rng(seed)
+        rows = np.concatenate([graph["place_embeddings"], graph["hotel_embeddings"]])
+        picks = rows[np_rng.integers(0, len(rows), size=64)]
+        self.vectors = picks + 0.5 * np_rng.normal(size=picks.shape).astype(np.float32) / np.sqrt(EMBEDDING_DIM)
+
+    def params(self, query_type: str) -> dict:
+        rng = self.rng
+        if query_type == "find_places":
+            return {"interests": rng.sample(self.categories, rng.randint(1, 3))}
+        if query_type == "vector_search":
+            return {"query": rng.choice(VECTOR_QUERIES)}
+        if query_type == "find_hotels":
+            params = {"max_price": rng.choice([2000, 3000, 5000, 8000, 15000])}
+            if rng.random() < 0.5:
+                params["amenity"] = rng.choice(self.amenities)
+            return params
+        if query_type == "find_cabs":
+            params = {"max_price": rng.choice([1500, 2500, 4000, 8000])}
+            if rng.random() < 0.5:
+                params["vehicle_type"] = rng.choice(self.vehicle_types)
+            return params
+        return {}
+
+    def vector(self):
+        return self.vectors[self.rng.randrange(len(self.vectors))]
+
+    def trip(self, size: int):
+        """(stops, hotel_name) — `size` distinct places plus a hotel for the round trip."""
+        return self.rng.sample(self.place_names, min(size, len(self.place_names))), self.rng.choice(self.hotel_names)
+
+
+def matrix_mb(graph: dict) -> float:
+    """Memory a dense float32 RoadTimeMatrix over every edge endpoint would need."""
+    n = len({a for a, _, _, _ in graph["road_edges"]} | {b for _, b, _, _ in graph["road_edges"]})
+    return n * n * 4 / 2 ** 20
+
+
+# ─── Backends ─────────────────────────────────────────────────────────────────
+
+def run_memory(graph: dict, args) -> dict:
+    workload = Workload(graph, args.seed)
+    mb = matrix_mb(graph)
+    build_matrix = mb <= MAX_MATRIX_MB
+
+    start = time.perf_counter()
+    store = InMemoryGraph(graph, build_road_matrix=build_matrix)
+    result = {"load_secs": round(time.perf_counter() - start, 3), "road_matrix_mb": round(mb, 1),
+              "queries": {}, "routes": {}}
+
+    for query_type in QUERY_TYPES:
+        if query_type == "vector_search":
+            make_args = lambda query_type=query_type: (query_type, {"embedding": workload.vector()})
+        else:
+            make_args = lambda query_type=query_type: (query_type, workload.params(query_type))
+        result["queries"][query_type] = measure(store.query_graph, make_args, args.iterations, args.warmup, args.concurrency)
+        print(f"  {query_type:<22} {_fmt(result['queries'][query_type])}")
+
+    if not build_matrix:
+        result["routes"] = {"skipped": f"dense road matrix would need {mb:.0f} MB (> BENCH_MAX_MATRIX_MB={MAX_MATRIX_MB:.0f})"}
+        print(f"  routes: {result['routes']['skipped']}")
+        return result
+
+    for size in ROUTE_SIZES:
+        stats = measure(store.optimize_trip, lambda: workload.trip(size), args.route_iterations, args.warmup, args.concurrency)
+        solver = store.optimize_trip(*workload.trip(size))["solver"]
+        result["routes"][str(size)] = {**stats, "solver": solver}
+        print(f"  route {size:>3} stops ({solver:<12}) {_fmt(stats)}")
+    return result
+
+
+def run_neo4j(graph: dict, args) -> dict:
+    from benchmarks.neo4j_loader import is_local_uri, load_graph
+    from services import neo4j_service as svc
+
+    uri = os.getenv("NEO4J_URI")
+    if not is_local_uri(uri) and not args.allow_remote:
+        sys.exit(f"❌ Refusing to wipe non-local Neo4j at {uri}. Pass --allow-remote to override.")
+
+    workload = Workload(graph, args.seed)
+    mb = matrix_mb(graph)
+
+    start = time.perf_counter()
+    version = load_graph(svc.driver, graph)
+    result = {"load_secs": round(time.perf_counter() - start, 3), "road_matrix_mb": round(mb, 1),
+              "queries": {}, "cached_queries": {}, "routes": {}}
+    print(f"  loaded into Neo4j in {result['load_secs']}s (graph version {version})")
+
+    svc.get_graph_version(force=True)
+    svc.query_cache.clear()
+    svc.load_vector_index()
+    for text in VECTOR_QUERIES:
+        svc.embed_query(text)   # model load + embedding cache outside the timings
+
+    for query_type in QUERY_TYPES:
+        make_args = lambda query_type=query_type: (query_type, workload.params(query_type))
+        result["queries"][query_type] = measure(svc._run_query, make_args, args.iterations, args.warmup, args.concurrency)
+        print(f"  {query_type:<22} {_fmt(result['queries'][query_type])}")
+        if query_type in svc.CACHEABLE_QUERY_TYPES:
+            result["cached_queries"][query_type] = measure(svc.query_graph, make_args, args.iterations, args.warmup, args.concurrency)
+            print(f"  {query_type + ' (cached)':<22} {_fmt(result['cached_queries'][query_type])}")
+    result["query_cache"] = svc.query_cache_stats()
+
+    if mb > MAX_MATRIX_MB:
+        result["routes"] = {"skipped": f"dense road matrix would need {mb:.0f} MB (> BENCH_MAX_MATRIX_MB={MAX_MATRIX_MB:.0f})"}
+        print(f"  routes: {result['routes']['skipped']}")
+        return result
+
+    svc.load_road_matrix()
+    svc.get_transport_options()
+    for size in ROUTE_SIZES:
+        stats = measure(svc.calculate_optimal_route, lambda: workload.trip(size), args.route_iterations, args.warmup, args.concurrency)
+        result["routes"][str(size)] = stats
+        print(f"  route {size:>3} stops {_fmt(stats)}")
+    return result
+
+
+# ─── Results ──────────────────────────────────────────────────────────────────
+
+def _fmt(stats: dict) -> str:
+    return (f"p50 {stats['p50_ms']:>9.3f} ms  p95 {stats['p95_ms']:>9.3f} ms  "
+            f"p99 {stats['p99_ms']:>9.3f} ms  {stats['throughput_ops_s']:>10.1f} ops/s")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=_BACKEND_DIR,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def machine_id() -> str:
+    """Host + CPU architecture, safe for a file name — baselines are only comparable on one machine."""
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{platform.node() or 'host'}-{platform.machine() or 'cpu'}")
+
+
+def baseline_file(results_dir: str, backend: str) -> str:
+    return os.path.join(results_dir, f"baseline-{backend}-{machine_id()}.json")
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """[(label, baseline_p95, current_p95, change)] for every p95 regression beyond threshold."""
+    regressions = []
+    for scale, sections in current["scales"].items():
+        old_sections = baseline.get("scales", {}).get(scale, {})
+        for section in ("queries", "cached_queries", "routes"):
+            for name, stats in sections.get(section, {}).items():
+                old = old_sections.get(section, {}).get(name)
+                if not isinstance(stats, dict) or not isinstance(old, dict) or not old.get("p95_ms"):
+                    continue
+                delta = stats["p95_ms"] - old["p95_ms"]
+                if delta > REGRESSION_MIN_DELTA_MS and delta / old["p95_ms"] > threshold:
+                    regressions.append((f"{scale}× {section}/{name}", old["p95_ms"], stats["p95_ms"], delta / old["p95_ms"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the graph service layer on synthetic Chennai graphs.")
+    parser.add_argument("--backend", choices=("memory", "neo4j"), default="memory")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(SCALES))
+    parser.add_argument("--iterations", type=int, default=200, help="Timed calls per query type")
+    parser.add_argument("--route-iterations", type=int, default=50, help="Timed calls per route size")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1, help="Worker threads issuing calls")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="p95 regression ratio to flag")
+    parser.add_argument("--baseline", help="Result file to compare with (default: this machine's baseline)")
+    parser.add_argument("--update-baseline", action="store_true", help="Save this run as this machine's baseline")
+    parser.add_argument("--results-dir", default=RESULTS_DIR, help="Where run results are written")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--allow-remote", action="store_true", help="Allow wiping a non-local Neo4j")
+    args = parser.parse_args(argv)
+
+    run = {
+        "backend": args.backend,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": machine_id(),
+        "platform": platform.platform(),
+        "config": {k: v for k, v in vars(args).items()
+                   if k not in ("baseline", "update_baseline", "results_dir", "fail_on_regression")},
+        "scales": {},
+    }
+    runner = run_neo4j if args.backend == "neo4j" else run_memory
+
+    for scale in args.scales:
+        start = time.perf_counter()
+        graph = generate(scale, seed=args.seed)
+        print(f"\n📈 {scale}× graph: {describe(graph)} (generated in {time.perf_counter() - start:.1f}s)")
+        run["scales"][str(scale)] = {"graph": describe(graph), **runner(graph, args)}
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    out_path = os.path.join(args.results_dir, f"{args.backend}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.json")
+    with open(out_path, "w") as f:
+        json.dump(run, f, indent=2)
+    print(f"\n💾 Results written to {out_path}")
+
+    machine_baseline = baseline_file(args.results_dir, args.backend)
+    if args.update_baseline or (not args.baseline and not os.path.exists(machine_baseline)):
+        with open(machine_baseline, "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"📌 Saved as the baseline for {machine_id()}: {machine_baseline}")
+        return 0
+
+    baseline_path = args.baseline or machine_baseline
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    if baseline.get("machine") != machine_id():
+        print(f"⚠️  {os.path.basename(baseline_path)} was recorded on {baseline.get('machine') or 'another machine'}; "
+              "absolute latencies are not comparable across hardware.")
+    regressions = compare(run, baseline, args.threshold)
+    if not regressions:
+        print(f"✅ No p95 regressions vs {os.path.basename(baseline_path)}.")
+        return 0
+    print(f"⚠️  p95 regressions vs {os.path.basename(baseline_path)}:")
+    for label, old, new, change in regressions:
+        print(f"  {label:<40} {old:>9.3f} ms → {new:>9.3f} ms  (+{change:.0%})")
+    return 1 if args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+benchmarks/memory_graph.py
+--------------------------
+In-memory stand-in for the Neo4j service layer, used when no local Neo4j is
+available (and to separate database time from our own Python/numpy time).
+
+InMemoryGraph answers the same tool queries as `neo4j_service.query_graph`
+with the same semantics as the Cypher in `_plan_query` (filters, grouping,
+LIMIT 5), scanning plain Python lists the way an index-less MATCH scans
+nodes. vector_search and the trip planner reuse the production pieces
+directly: VectorIndex, RoadTimeMatrix and the route optimizer.
+"""
+
+import numpy as np
+
+from services.road_matrix import RoadTimeMatrix
+from services.route_optimizer import optimize_route
+from services.vector_index import VectorIndex
+
+VECTOR_SEARCH_K = {"Place": 5, "Hotel": 3}   # same as neo4j_service.VECTOR_SEARCH_K
+RESULT_LIMIT = 5
+
+
+class InMemoryGraph:
+    def __init__(self, graph: dict, build_road_matrix: bool = True):
+        # Flattened the way build_graph.py stores them as node properties
+        self.places = [
+            {"id": p["id"], "name": p["name"], "category": p["category"], "description": p["description"],
+             "lat": p["location"]["latitude"], "lon": p["location"]["longitude"]}
+            for p in graph["places"]
+        ]
+        self.hotels = [
+            {"hotel_id": h["hotel_id"], "name": h["name"], "location": h["location"], "description": h["description"],
+             "rooms": [{"room_type": r["room_type"], "price": r["price_per_night"], "amenities": r["amenities"]}
+                       for r in h["rooms"]]}
+            for h in graph["hotels"]
+        ]
+        self.agencies = [
+            {"agency_id": a["agency_id"], "name": a["agency_name"], "rating": a["overall_rating"],
+             "vehicles": [{"vehicle_id": v["vehicle_id"], "model": v["model"], "type": v["vehicle_type"],
+                           "price": v["day_package"]["fixed_price"]} for v in a["fleet"]]}
+            for a in graph["transport"]["transport_agencies"]
+        ]
+
+        self.vector_index = VectorIndex(
+            [{"name": p["name"], "category": p["category"], "description": p["description"]} for p in self.places]
+            + [{"name": h["name"], "category": "hotel", "description": h["description"]} for h in self.hotels],
+            np.concatenate([graph["place_embeddings"], graph["hotel_embeddings"]]),
+            ["Place"] * len(self.places) + ["Hotel"] * len(self.hotels),
+        )
+
+        # Edge lists for calculate_itinerary (NEARBY_PLACE then CONNECTED_TO)
+        place_idx = {p["name"]: k for k, p in enumerate(self.places)}
+        nearby = [(place_idx[b], t) for _, b, t, rel in graph["road_edges"] if rel == "NEARBY_PLACE"]
+        connected = [(place_idx[a], place_idx[b], t) for a, b, t, rel in graph["road_edges"] if rel == "CONNECTED_TO"]
+        self._nearby_dst = np.array([d for d, _ in nearby], dtype=np.int64)
+        self._nearby_time = np.array([t for _, t in nearby], dtype=np.float64)
+        self._connected = np.array([(a, b) for a, b, _ in connected], dtype=np.int64).reshape(-1, 2)
+        self._connected_time = np.array([t for _, _, t in connected], dtype=np.float64)
+
+        self.road_matrix = None
+        if build_road_matrix:
+            self.road_matrix = RoadTimeMatrix.from_edges((a, b, t) for a, b, t, _ in graph["road_edges"])
+
+    # ─── Tool Queries ─────────────────────────────────────────────────────────
+
+    def query_graph(self, query_type, params):
+        if query_type == "find_places":
+            interests = set(params.get("interests", []))
+            return [p for p in self.places if p["category"] in interests][:RESULT_LIMIT]
+
+        elif query_type == "vector_search":
+            # Takes a precomputed query vector — the stand-in never loads MiniLM
+            return self.vector_index.search(params["embedding"], VECTOR_SEARCH_K)
+
+        elif query_type == "find_hotels":
+            max_price = params.get("max_price", 100000)
+            amenity = params.get("amenity", None)
+            results = []
+            for h in self.hotels:
+                rooms = [r for r in h["rooms"] if r["price"] <= max_price and (not amenity or amenity in r["amenities"])]
+                if rooms:
+                    results.append({"hotel_id": h["hotel_id"], "name": h["name"], "location": h["location"],
+                                    "description": h["description"], "rooms": rooms})
+                    if len(results) == RESULT_LIMIT:
+                        break
+            return results
+
+        elif query_type == "find_cabs":
+            max_price = params.get("max_price", 100000)
+            vehicle_type = params.get("vehicle_type", None)
+            results = []
+            for a in self.agencies:
+                vehicles = [v for v in a["vehicles"] if v["price"] <= max_price and (not vehicle_type or v["type"] == vehicle_type)]
+                if vehicles:
+                    results.append({"agency_id": a["agency_id"], "name": a["name"], "rating": a["rating"],
+                                    "vehicles": vehicles})
+                    if len(results) == RESULT_LIMIT:
+                        break
+            return results
+
+        elif query_type == "calculate_itinerary":
+            # min over (h)-[r1:NEARBY_PLACE]->(p1)-[r2:CONNECTED_TO]->(p2) of r1 + r2
+            if not len(self._connected) or not len(self._nearby_dst):
+                return None
+            best_in = np.full(len(self.places), np.inf)
+            np.minimum.at(best_in, self._nearby_dst, self._nearby_time)
+            totals = best_in[self._connected[:, 0]] + self._connected_time
+            k = int(np.argmin(totals))
+            if not np.isfinite(totals[k]):
+                return None
+            p1, p2 = self._connected[k]
+            return {"place1": self.places[p1]["name"], "place2": self.places[p2]["name"], "total_time": float(totals[k])}
+
+        return None
+
+    # ─── Trip Planner ─────────────────────────────────────────────────────────
+
+    def optimize_trip(self, stops: list, hotel_name: str = None) -> dict:
+        """One day of calculate_optimal_route: dense sub-matrix + solver (no detail queries)."""
+        names = ([hotel_name] if hotel_name else []) + [s for s in stops if s != hotel_name]
+        return optimize_route(self.road_matrix.dense(names), closed=bool(hotel_name) and len(names) > 1)
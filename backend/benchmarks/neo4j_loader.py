@@ -0,0 +1,125 @@
+"""
+benchmarks/neo4j_loader.py
+--------------------------
+Loads a synthetic graph (see synthetic_graph.py) into a local Neo4j with the
+same labels, properties and relationships that `services/build_graph.py`
+writes, so `neo4j_service` runs its production Cypher against it.
+
+Reviews, drivers and the City node are skipped — no benchmarked query reads
+them. Road times come from the generator, not the Google Maps API.
+
+⚠️  load_graph() WIPES the target database first.
+"""
+
+import uuid
+from urllib.parse import urlparse
+
+BATCH_SIZE = 1000
+_LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1", "neo4j"}   # "neo4j" = docker-compose service name
+
+
+def is_local_uri(uri: str) -> bool:
+    return bool(uri) and urlparse(uri).hostname in _LOCAL_HOSTS
+
+
+def _batches(rows: list, size: int = BATCH_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _write(session, cypher: str, rows: list) -> None:
+    for batch in _batches(rows):
+        session.run(cypher, {"rows": batch}).consume()
+
+
+def load_graph(driver, graph: dict, dimensions: int = 384) -> str:
+    """Replace the database contents with `graph`. Returns the new graph version stamp."""
+    with driver.session() as session:
+        session.run("CALL { MATCH (n) DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS").consume()
+
+        session.run("CREATE CONSTRAINT place_id IF NOT EXISTS FOR (p:Place) REQUIRE p.id IS UNIQUE").consume()
+        session.run("CREATE CONSTRAINT hotel_id IF NOT EXISTS FOR (h:Hotel) REQUIRE h.id IS UNIQUE").consume()
+        session.run("CREATE CONSTRAINT agency_id IF NOT EXISTS FOR (a:Agency) REQUIRE a.id IS UNIQUE").consume()
+        for index, label in (("place_desc_index", "Place"), ("hotel_desc_index", "Hotel")):
+            session.run(f"""
+                CREATE VECTOR INDEX {index} IF NOT EXISTS
+                FOR (n:{label}) ON (n.embedding)
+                OPTIONS {{indexConfig: {{
+                    `vector.dimensions`: {dimensions},
+                    `vector.similarity_function`: 'cosine'
+                }}}}
+            """).consume()
+
+        _write(session, """
+            UNWIND $rows AS p
+            CREATE (place:Place {id: p.id})
+            SET place.name = p.name, place.category = p.category, place.description = p.description,
+                place.embedding = p.embedding, place.lat = p.lat, place.lon = p.lon, place.area = p.area
+        """, [
+            {"id": p["id"], "name": p["name"], "category": p["category"], "description": p["description"],
+             "embedding": e.tolist(), "lat": float(p["location"]["latitude"]),
+             "lon": float(p["location"]["longitude"]), "area": p["location"].get("area")}
+            for p, e in zip(graph["places"], graph["place_embeddings"])
+        ])
+
+        _write(session, """
+            UNWIND $rows AS h
+            CREATE (hotel:Hotel {id: h.id})
+            SET hotel.name = h.name, hotel.lat = h.lat, hotel.lon = h.lon, hotel.area = h.area,
+                hotel.description = h.description, hotel.embedding = h.embedding
+            WITH hotel, h
+            UNWIND h.rooms AS r
+            CREATE (room:Room {id: r.room_id})
+            SET room.type = r.room_type, room.price = r.price_per_night, room.bed_type = r.bed_type,
+                room.max_guests = r.max_guests, room.total_rooms = r.total_rooms,
+                room.available_rooms = r.available_rooms, room.amenities = r.amenities
+            CREATE (hotel)-[:HAS_ROOM]->(room)
+        """, [
+            {"id": h["hotel_id"], "name": h["name"], "lat": float(h["latitude"]), "lon": float(h["longitude"]),
+             "area": h["location"], "description": h["description"], "embedding": e.tolist(), "rooms": h["rooms"]}
+            for h, e in zip(graph["hotels"], graph["hotel_embeddings"])
+        ])
+
+        _write(session, """
+            UNWIND $rows AS a
+            CREATE (agency:Agency {id: a.id})
+            SET agency.name = a.name, agency.rating = a.rating, agency.description = a.description
+            WITH agency, a
+            UNWIND a.fleet AS v
+            CREATE (veh:Vehicle {id: v.vehicle_id})
+            SET veh.category = v.vehicle_category, veh.type = v.vehicle_type, veh.model = v.model,
+                veh.price = v.day_package.fixed_price, veh.status = v.availability_status
+            CREATE (agency)-[:OWNS_VEHICLE]->(veh)
+        """, [
+            {"id": a["agency_id"], "name": a["agency_name"], "rating": a["overall_rating"],
+             "description": a.get("agency_description"), "fleet": a["fleet"]}
+            for a in graph["transport"]["transport_agencies"]
+        ])
+
+        place_ids = {p["name"]: p["id"] for p in graph["places"]}
+        hotel_ids = {h["name"]: h["hotel_id"] for h in graph["hotels"]}
+        _write(session, """
+            UNWIND $rows AS e
+            MATCH (h:Hotel {id: e.from_id}), (p:Place {id: e.to_id})
+            CREATE (h)-[:NEARBY_PLACE {road_time_mins: e.road_time}]->(p)
+        """, [
+            {"from_id": hotel_ids[a], "to_id": place_ids[b], "road_time": t}
+            for a, b, t, rel in graph["road_edges"] if rel == "NEARBY_PLACE"
+        ])
+        _write(session, """
+            UNWIND $rows AS e
+            MATCH (p1:Place {id: e.from_id}), (p2:Place {id: e.to_id})
+            CREATE (p1)-[:CONNECTED_TO {road_time_mins: e.road_time}]->(p2)
+        """, [
+            {"from_id": place_ids[a], "to_id": place_ids[b], "road_time": t}
+            for a, b, t, rel in graph["road_edges"] if rel == "CONNECTED_TO"
+        ])
+
+        session.run("CALL db.awaitIndexes(600)").consume()
+
+        version = uuid.uuid4().hex
+        session.run("""
+            MERGE (m:GraphMeta {key: 'xplorer'})
+            SET m.version = $version, m.built_at = datetime()
+        """, {"version": version}).consume()
+    return version
@@ -0,0 +1,264 @@
+"""
+benchmarks/synthetic_graph.py
+-----------------------------
+Synthetic Chennai graphs for the benchmark harness.
+
+The seed files in `services/data/` are cloned `scale` times:
+  - Places, hotels and agencies keep the exact JSON shape of
+    places.json / hotels.json / transport.json (clone 0 is the original record;
+    later clones get a numbered name, fresh ids and jittered coordinates).
+  - Road edges mimic `build_graph.build_spatial_connections`: hotel → place
+    (NEARBY_PLACE) and place → place (CONNECTED_TO) pairs under 20 km, capped to
+    the ROAD_NEIGHBOURS nearest so large scales stay tractable. Road time is
+    derived from the haversine distance instead of the Google Maps API.
+  - Embeddings are 384-dim vectors (MiniLM's size), clustered per seed record so
+    clones of the same place are near each other.
+
+Everything is seeded, so the same scale always produces the same graph:
+
+    python -m benchmarks.synthetic_graph --scale 100 --out /tmp/chennai-100x
+"""
+
+import os
+import json
+import argparse
+import numpy as np
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEED_DATA_DIR = os.path.join(_BACKEND_DIR, "services", "data")
+
+SCALES = (10, 100, 1000)
+EMBEDDING_DIM = 384               # all-MiniLM-L6-v2
+ROAD_NEIGHBOURS = 24              # edges kept per node (the builder keeps every pair < 20 km)
+MAX_EDGE_KM = 20.0                # same radius as build_spatial_connections
+AVG_SPEED_KMH = 22.0              # city driving speed used for synthetic road times
+ROAD_DETOUR = 1.35                # road distance / straight-line distance
+
+# Rough Chennai bounding box — jittered clones are clipped to it
+_LAT_RANGE = (12.80, 13.25)
+_LON_RANGE = (80.00, 80.32)
+_JITTER_DEG = 0.03
+_EARTH_RADIUS_KM = 6371.0
+
+
+# ─── Seed Data ────────────────────────────────────────────────────────────────
+
+def load_seed_data() -> dict:
+    """Read the three seed JSON files the real graph is built from."""
+    def read(filename):
+        with open(os.path.join(SEED_DATA_DIR, filename)) as f:
+            return json.load(f)
+    return {
+        "places": read("places.json"),
+        "hotels": read("hotels.json"),
+        "transport": read("transport.json"),
+    }
+
+
+# ─── Geometry ─────────────────────────────────────────────────────────────────
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km (works element-wise on numpy arrays)."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * _EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def road_time_mins(km, rng: np.random.Generator):
+    """Synthetic driving time: detoured distance at city speed, plus traffic noise and parking."""
+    km = np.asarray(km, dtype=np.float64)
+    noise = rng.uniform(0.85, 1.3, size=km.shape)
+    return np.round(km * ROAD_DETOUR / AVG_SPEED_KMH * 60 * noise + 3, 2)
+
+
+def _jitter(lat: float, lon: float, rng: np.random.Generator):
+    lat = float(np.clip(lat + rng.normal(0, _JITTER_DEG), *_LAT_RANGE))
+    lon = float(np.clip(lon + rng.normal(0, _JITTER_DEG), *_LON_RANGE))
+    return round(lat, 6), round(lon, 6)
+
+
+def _nearest(src: np.ndarray, dst: np.ndarray, k: int, exclude_self: bool = False, chunk: int = 1024):
+    """
+    Yield (i, j_indices, km) for the k nearest dst points of every src point
+    within MAX_EDGE_KM. Neighbours are picked on a flat-earth projection (exact
+    enough at city scale) and only the winners get a haversine distance.
+    Chunked so 1000× scale never builds an N×N matrix.
+    """
+    k = min(k, len(dst) - (1 if exclude_self else 0))
+    if k <= 0:
+        return
+    lon_scale = np.cos(np.radians(np.mean(_LAT_RANGE)))
+    src_xy = np.column_stack([src[:, 0], src[:, 1] * lon_scale]).astype(np.float32)
+    dst_xy = np.column_stack([dst[:, 0], dst[:, 1] * lon_scale]).astype(np.float32)
+    dst_sq = (dst_xy ** 2).sum(axis=1)
+
+    for start in range(0, len(src), chunk):
+        block = src_xy[start:start + chunk]
+        d2 = (block ** 2).sum(axis=1)[:, None] + dst_sq[None, :] - 2 * block @ dst_xy.T
+        if exclude_self:
+            rows = np.arange(len(block))
+            d2[rows, start + rows] = np.inf
+        top = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        for r, cols in enumerate(top):
+            i = start + r
+            km = haversine_km(src[i, 0], src[i, 1], dst[cols, 0], dst[cols, 1])
+            keep = km < MAX_EDGE_KM
+            yield i, cols[keep], km[keep]
+
+
+# ─── Generator ────────────────────────────────────────────────────────────────
+
+def _copy(record):
+    """Deep copy of a JSON record (a JSON round-trip is much faster than copy.deepcopy)."""
+    return json.loads(json.dumps(record))
+
+
+def _clone_places(seed_places: list, scale: int, rng) -> list:
+    places, next_id = [], 1
+    for k in range(scale):
+        for seed in seed_places:
+            p = _copy(seed)
+            p["id"] = next_id
+            next_id += 1
+            if k:
+                p["name"] = f"{seed['name']} {k + 1}"
+                lat, lon = _jitter(seed["location"]["latitude"], seed["location"]["longitude"], rng)
+                p["location"]["latitude"], p["location"]["longitude"] = lat, lon
+                p["scores"]["popularity_index"] = int(rng.integers(20, 100))
+            places.append(p)
+    return places
+
+
+def _clone_hotels(seed_hotels: list, scale: int, rng) -> list:
+    hotels, room_seq = [], 0
+    for k in range(scale):
+        for seed in seed_hotels:
+            h = _copy(seed)
+            h["hotel_id"] = f"H{len(hotels) + 1:06d}"
+            if k:
+                h["name"] = f"{seed['name']} {k + 1}"
+                h["latitude"], h["longitude"] = _jitter(float(seed["latitude"]), float(seed["longitude"]), rng)
+                h["gps"] = f"{h['latitude']},{h['longitude']}"
+                h["description"] = seed["description"].replace(seed["name"], h["name"])
+            for room in h["rooms"]:
+                room_seq += 1
+                room["room_id"] = f"R{room_seq:07d}"
+                if k:
+                    room["price_per_night"] = int(round(room["price_per_night"] * rng.uniform(0.7, 1.4), -2))
+                    room["available_rooms"] = int(rng.integers(0, room["total_rooms"] + 1))
+            hotels.append(h)
+    return hotels
+
+
+def _clone_transport(seed_transport: dict, scale: int, rng) -> dict:
+    agencies, vehicle_seq, driver_seq = [], 0, 0
+    for k in range(scale):
+        for seed in seed_transport["transport_agencies"]:
+            a = _copy(seed)
+            a["agency_id"] = f"A{len(agencies) + 1:06d}"
+            if k:
+                a["agency_name"] = f"{seed['agency_name']} {k + 1}"
+                a["overall_rating"] = round(float(rng.uniform(3.0, 5.0)), 1)
+            driver_ids = {}
+            for d in a.get("drivers", []):
+                driver_seq += 1
+                driver_ids[d["driver_id"]] = d["driver_id"] = f"D{driver_seq:07d}"
+            for v in a["fleet"]:
+                vehicle_seq += 1
+                v["vehicle_id"] = f"V{vehicle_seq:07d}"
+                v["assigned_driver_id"] = driver_ids.get(v.get("assigned_driver_id"), v.get("assigned_driver_id"))
+                if k:
+                    v["day_package"]["fixed_price"] = int(round(v["day_package"]["fixed_price"] * rng.uniform(0.8, 1.3), -1))
+            agencies.append(a)
+    return {**{key: val for key, val in seed_transport.items() if key != "transport_agencies"},
+            "transport_agencies": agencies}
+
+
+def _embeddings(n_seed: int, scale: int, rng) -> np.ndarray:
+    """Unit vectors; clone k of seed record s is centre[s] plus noise (row order = clone-major)."""
+    centres = rng.normal(size=(n_seed, EMBEDDING_DIM)).astype(np.float32)
+    vectors = np.tile(centres, (scale, 1)) + 0.35 * rng.normal(size=(n_seed * scale, EMBEDDING_DIM)).astype(np.float32)
+    vectors[:n_seed] = centres
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _road_edges(places: list, hotels: list, rng, neighbours: int) -> list:
+    """[(from_name, to_name, road_time_mins, rel_type)] in the builder's edge directions."""
+    place_xy = np.array([[p["location"]["latitude"], p["location"]["longitude"]] for p in places], dtype=np.float64)
+    hotel_xy = np.array([[float(h["latitude"]), float(h["longitude"])] for h in hotels], dtype=np.float64)
+
+    edges = []
+    for i, cols, km in _nearest(hotel_xy, place_xy, neighbours):
+        for j, t in zip(cols.tolist(), road_time_mins(km, rng).tolist()):
+            edges.append((hotels[i]["name"], places[j]["name"], t, "NEARBY_PLACE"))
+
+    seen = set()
+    for i, cols, km in _nearest(place_xy, place_xy, neighbours, exclude_self=True):
+        for j, t in zip(cols.tolist(), road_time_mins(km, rng).tolist()):
+            a, b = (i, j) if places[i]["id"] < places[j]["id"] else (j, i)   # p1.id < p2.id
+            if (a, b) not in seen:
+                seen.add((a, b))
+                edges.append((places[a]["name"], places[b]["name"], t, "CONNECTED_TO"))
+    return edges
+
+
+def generate(scale: int, seed: int = 42, neighbours: int = ROAD_NEIGHBOURS, seed_data: dict = None) -> dict:
+    """
+    Build a synthetic graph `scale` times the size of the seed data.
+    Returns {places, hotels, transport, road_edges, place_embeddings, hotel_embeddings}.
+    """
+    seed_data = seed_data or load_seed_data()
+    rng = np.random.default_rng(seed)
+
+    places = _clone_places(seed_data["places"], scale, rng)
+    hotels = _clone_hotels(seed_data["hotels"], scale, rng)
+    transport = _clone_transport(seed_data["transport"], scale, rng)
+    return {
+        "scale": scale,
+        "places": places,
+        "hotels": hotels,
+        "transport": transport,
+        "road_edges": _road_edges(places, hotels, rng, neighbours),
+        "place_embeddings": _embeddings(len(seed_data["places"]), scale, rng),
+        "hotel_embeddings": _embeddings(len(seed_data["hotels"]), scale, rng),
+    }
+
+
+def describe(graph: dict) -> dict:
+    """Node / edge counts for result files."""
+    agencies = graph["transport"]["transport_agencies"]
+    return {
+        "places": len(graph["places"]),
+        "hotels": len(graph["hotels"]),
+        "rooms": sum(len(h["rooms"]) for h in graph["hotels"]),
+        "agencies": len(agencies),
+        "vehicles": sum(len(a["fleet"]) for a in agencies),
+        "road_edges": len(graph["road_edges"]),
+    }
+
+
+def write_graph(graph: dict, out_dir: str) -> None:
+    """Write the graph as places.json / hotels.json / transport.json (+ road_edges.json)."""
+    os.makedirs(out_dir, exist_ok=True)
+    files = {
+        "places.json": graph["places"],
+        "hotels.json": graph["hotels"],
+        "transport.json": graph["transport"],
+        "road_edges.json": [
+            {"from": a, "to": b, "road_time_mins": t, "type": rel} for a, b, t, rel in graph["road_edges"]
+        ],
+    }
+    for filename, data in files.items():
+        with open(os.path.join(out_dir, filename), "w") as f:
+            json.dump(data, f)
+    print(f"✅ Wrote {describe(graph)} to {out_dir}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic Chennai graph.")
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--neighbours", type=int, default=ROAD_NEIGHBOURS)
+    parser.add_argument("--out", required=True, help="Output directory")
+    args = parser.parse_args()
+    write_graph(generate(args.scale, args.seed, args.neighbours), args.out)
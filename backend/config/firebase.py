@@ -8,7 +8,7 @@ This is the production-safe approach (works on any deployment platform).
 
 import os
 import firebase_admin
-from firebase_admin import credentials, auth, firestore
+from firebase_admin import credentials, auth, firestore, firestore_async
 from dotenv import load_dotenv
 
 # Load .env explicitly from backend/ folder
@@ -19,11 +19,12 @@ load_dotenv(dotenv_path=os.path.join(_BACKEND_DIR, ".env"))
 
 _firebase_app = None
 _firestore_client = None
+_firestore_async_client = None
 
 
 def init_firebase() -> None:
     """Initialize Firebase Admin SDK once at app startup using env variables."""
-    global _firebase_app, _firestore_client
+    global _firebase_app, _firestore_client, _firestore_async_client
 
     if _firebase_app is not None:
         return  # Already initialized
@@ -57,7 +58,8 @@ def init_firebase() -> None:
 
     cred = credentials.Certificate(service_account_info)
     _firebase_app = firebase_admin.initialize_app(cred)
-    _firestore_client = firestore.client()
+    _firestore_client = firestore.client()              # scripts, worker threads
+    _firestore_async_client = firestore_async.client()  # request handlers (services/firestore_async.py)
 
 
 def get_auth() -> auth:
@@ -70,3 +72,10 @@ def get_firestore():
     if _firestore_client is None:
         raise RuntimeError("Firebase has not been initialized. Call init_firebase() first.")
     return _firestore_client
+
+
+def get_firestore_async():
+    """Return initialized async Firestore client (use from the event loop only)."""
+    if _firestore_async_client is None:
+        raise RuntimeError("Firebase has not been initialized. Call init_firebase() first.")
+    return _firestore_async_client
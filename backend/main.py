@@ -2,24 +2,96 @@
 main.py
 -------
 FastAPI application entry point.
-Initializes Firebase and mounts all routers.
+Initializes Firebase, starts background warm-up and mounts all routers.
 """
 
-from fastapi import FastAPI
+import os
+import asyncio
+from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 from config.firebase import init_firebase
+from middleware.auth_middleware import get_current_user
+from services.auth_service import refresh_signing_certs_forever
+from services.embedding_service import embedding_service
+from services.http_client import init_http_client, close_http_client
+from services.neo4j_service import async_driver, load_road_matrix, load_vector_index, close_drivers, embedding_cache, query_cache_stats
+from services.travel_ai_service import prompt_cache
+from services import weather_service, semantic_cache
 from routes.auth import router as auth_router
 from routes.user import router as user_router
 
+# ─── Readiness ────────────────────────────────────────────────────────────────
+# Filled in by the background warm-up; /health/ready reports 503 until all are True.
+_readiness = {
+    "embedding_model": False,
+    "neo4j": False,
+    "road_matrix": False,
+    "vector_index": False,
+}
+_WARMUP_RETRY_MAX_SECS = 30
+
+
+async def _until_ready(check: str, step) -> None:
+    """Run `step` until it succeeds, backing off exponentially between attempts, then mark `check` ready."""
+    delay = 1
+    while True:
+        try:
+            await step()
+            _readiness[check] = True
+            return
+        except Exception as e:
+            print(f"⚠️  {check} warm-up failed ({e}); retrying in {delay}s.")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _WARMUP_RETRY_MAX_SECS)
+
+
+async def _warm_embedding_model() -> None:
+    """Load MiniLM and run one forward pass so the first user request is not a cold start."""
+    async def step():
+        await asyncio.to_thread(embedding_service.load_model)
+        await embedding_service.aencode("warm up")
+
+    await _until_ready("embedding_model", step)
+    print("✅ Embedding model loaded.")
+
+
+async def _warm_neo4j() -> None:
+    """Verify Neo4j connectivity, then preload the graph snapshots (each retried with backoff)."""
+    await _until_ready("neo4j", async_driver.verify_connectivity)
+    print("✅ Neo4j connection verified.")
+
+    # A failed preload is retried here so readiness recovers; requests meanwhile load the snapshots on first use
+    await asyncio.gather(*(
+        _until_ready(check, lambda loader=loader: asyncio.to_thread(loader))
+        for check, loader in (("road_matrix", load_road_matrix), ("vector_index", load_vector_index))
+    ))
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize Firebase Admin SDK once when the server starts."""
+    """
+    Initialize Firebase Admin SDK, then warm the embedding model and Neo4j,
+    register the Gemini prompt cache and keep the token signing certificates
+    fresh in the background so startup is not blocked. Load balancers should
+    gate traffic on /health/ready.
+    """
     init_firebase()
     print("✅ Firebase initialized successfully.")
+    init_http_client()
+    warm_up_tasks = [
+        asyncio.create_task(_warm_embedding_model()),
+        asyncio.create_task(_warm_neo4j()),
+        asyncio.create_task(refresh_signing_certs_forever()),
+        asyncio.create_task(prompt_cache.refresh()),
+    ]
     yield
+    for task in warm_up_tasks:
+        task.cancel()
+    await close_drivers()
+    await close_http_client()
     print("🛑 Server shutting down.")
 
 
@@ -40,6 +112,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Next-Hotels-Cursor", "X-Next-Transport-Cursor"],   # pagination
 )
 
 # ─── Routers ──────────────────────────────────────────────────────────────────
@@ -50,3 +123,30 @@ app.include_router(user_router)   # /user/profile, /user/chats
 @app.get("/", tags=["Health"])
 def health_check():
     return {"status": "ok", "service": "Xplorer Auth API", "version": "1.0.0"}
+
+
+@app.get("/health/ready", tags=["Health"])
+def readiness_check():
+    """200 once warm-up has finished, 503 (with per-check status) until then."""
+    ready = all(_readiness.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "warming_up", "checks": dict(_readiness)},
+    )
+
+
+# Ops-only cache counters: off unless HEALTH_STATS=true, and even then only for signed-in callers
+HEALTH_STATS = os.getenv("HEALTH_STATS", "false").lower() == "true"
+
+
+@app.get("/health/stats", tags=["Health"], include_in_schema=HEALTH_STATS)
+def cache_stats(user: dict = Depends(get_current_user)):
+    """Hit/miss counters of the in-process caches, for tuning sizes and TTLs (ops endpoint)."""
+    if not HEALTH_STATS:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return {
+        "embedding_cache": embedding_cache.stats(),
+        "query_cache": query_cache_stats(),
+        "weather_cache": weather_service.stats(),
+        "semantic_cache": semantic_cache.stats(),
+    }
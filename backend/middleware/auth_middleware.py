@@ -14,22 +14,23 @@ Usage in any route:
 import os
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from services.auth_service import verify_id_token
+from services.auth_service import averify_id_token
 
 # Tells FastAPI to expect: Authorization: Bearer <token>
 # And points the Swagger UI Authorize button to our hidden token endpoint
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/swagger_token")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     """
     Extracts the Bearer token from the Authorization header,
-    verifies it with Firebase Admin SDK, and checks for email verification.
+    verifies it with Firebase Admin SDK (cached per token until it expires),
+    and checks for email verification.
 
     Raises 401 if token is missing or invalid.
     Raises 403 if email is not verified (production only).
     """
-    decoded_token = verify_id_token(token)
+    decoded_token = await averify_id_token(token)
     
     # TODO: Re-enable strict email verification for production
     # For development, we only log a warning instead of blocking.
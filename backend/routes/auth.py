@@ -20,7 +20,12 @@ from services.auth_service import (
     delete_firebase_user,
     send_verification_email,
 )
-from services.firestore_service import create_user_profile, get_user_profile
+from services.firestore_async import (
+    create_user_profile,
+    get_user_profile,
+    delete_user_data,
+    log_delete_progress,
+)
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -56,7 +61,7 @@ async def register(payload: UserRegisterRequest):
     }
 
     try:
-        create_user_profile(uid, profile_data)
+        await create_user_profile(uid, profile_data)
         
         # Authenticate briefly to send the verification email
         firebase_response = await login_firebase_user(
@@ -66,15 +71,19 @@ async def register(payload: UserRegisterRequest):
         await send_verification_email(firebase_response["idToken"])
         
     except Exception as e:
-        # Rollback: delete the Firebase Auth user we just created
+        # Rollback: delete the Firebase Auth user we just created and any profile data
         await delete_firebase_user(uid)
+        try:
+            await delete_user_data(uid, on_progress=log_delete_progress(f"Rollback for {uid}"))
+        except HTTPException as cleanup_error:
+            print(f"⚠️  Rollback could not delete Firestore data for {uid}: {cleanup_error.detail}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Profile save failed. Registration rolled back. Error: {str(e)}",
         )
 
     # Return the profile
-    saved_profile = get_user_profile(uid)
+    saved_profile = await get_user_profile(uid)
     return UserProfileResponse(**saved_profile)
 
 
@@ -101,7 +110,7 @@ async def login(payload: UserLoginRequest):
 
     # Step 2: Get display name from Firestore
     try:
-        profile = get_user_profile(uid)
+        profile = await get_user_profile(uid)
         full_name = profile.get("full_name", "")
     except Exception:
         full_name = ""  # Don't fail login if profile fetch fails
@@ -1,4 +1,7 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+import json
+import asyncio
+from fastapi import APIRouter, Depends, status, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Dict, Any
 
 from middleware.auth_middleware import get_current_user
@@ -17,7 +20,7 @@ from models.booking import (
     TransportBookingRequest,
     TransportBookingResponse,
 )
-from services.firestore_service import (
+from services.firestore_async import (
     get_user_profile,
     update_user_profile,
     create_conversation,
@@ -30,24 +33,25 @@ from services.firestore_service import (
     save_transport_booking,
     get_transport_bookings
 )
-from services.travel_ai_service import XplorerAI  # LangChain + Gemini logic
+from services.travel_ai_service import XplorerAI, quick_title, schedule_title_refinement  # LangChain + Gemini logic
+from services.chat_history import history_load_size
 
 router = APIRouter(prefix="/user", tags=["Xplorer AI User Interface"])
 
 # ─── 1. USER PROFILE ─────────────────────────────────────────────────────────
 
 @router.get("/profile", response_model=UserProfileResponse)
-def get_my_profile(user: dict = Depends(get_current_user)):
+async def get_my_profile(user: dict = Depends(get_current_user)):
     """Fetch the full profile and travel preferences of the authenticated user."""
-    profile = get_user_profile(user["uid"])
+    profile = await get_user_profile(user["uid"])
     return UserProfileResponse(**profile)
 
 @router.put("/profile")
-def update_my_preferences(updates: Dict[str, Any], user: dict = Depends(get_current_user)):
+async def update_my_preferences(updates: Dict[str, Any], user: dict = Depends(get_current_user)):
     """Update travel style, interests, or budget preferences."""
     ALLOWED = {"full_name", "country", "travel_style", "interests"}
     filtered = {k: v for k, v in updates.items() if k in ALLOWED}
-    update_user_profile(user["uid"], filtered)
+    await update_user_profile(user["uid"], filtered)
     return {"message": "Preferences updated."}
 
 # ─── 2. AI SMART CHAT (The Core Agent) ───────────────────────────────────────
@@ -59,21 +63,15 @@ async def start_new_travel_consultation(
 ):
     """
     Initializes a new AI session with the first message.
-    Generates a dynamic title, creates the session, and returns the first AI response.
+    The session is created (with an instant local title) while the first AI
+    response is generated; the LLM-written title replaces it in the background.
     """
     uid = user["uid"]
-    agent = XplorerAI(uid)
-    
-    try:
-        # Generate dynamic title based on first input
-        title = await agent.generate_title(payload.user_input)
-    except Exception as e:
-        print(f"❌ AI title generation failed: {e}")
-        title = "New Trip Plan"
-    
-    # Create the conversation in Firestore
-    session = create_conversation(uid, title)
-    convo_id = session["convo_id"]
+    agent = await XplorerAI.create(uid)
+
+    # Create the conversation in Firestore concurrently with the first turn
+    title = quick_title(payload.user_input)
+    session_task = asyncio.create_task(create_conversation(uid, title))
     
     try:
         # Process the first message
@@ -84,19 +82,25 @@ async def start_new_travel_consultation(
         )
     except Exception as e:
         print(f"❌ AI chat failed: {e}")
+        await asyncio.gather(session_task, return_exceptions=True)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=f"AI service is temporarily unavailable. Please try again in a minute. Error: {type(e).__name__}"
         )
+
+    session = await session_task
+    convo_id = session["convo_id"]
     
     # Save the turn to Firestore
-    saved_msg = add_message(
+    saved_msg = await add_message(
         uid=uid,
         convo_id=convo_id,
         user_input=payload.user_input,
         ai_generated_output=ai_response, # Contains text/itinerary data
-        submitted_data=payload.submitted_data
+        submitted_data=payload.submitted_data,
+        convo=session
     )
+    schedule_title_refinement(agent, convo_id, payload.user_input)
     
     return ConversationStartResponse(
         convo_id=convo_id,
@@ -120,11 +124,11 @@ async def send_message_to_agent(
     """
     uid = user["uid"]
     
-    # 1. Get History & Context
-    history = get_conversation(uid, session_id)
+    # 1. Get History & Context (only the recent messages the prompt needs)
+    history = await get_conversation(uid, session_id, recent=history_load_size())
     
     # 2. Initialize Xplorer AI Agent
-    agent = XplorerAI(uid)
+    agent = await XplorerAI.create(uid)
     
     try:
         # 3. Generate Intelligent Response (Gemini + Neo4j)
@@ -141,67 +145,159 @@ async def send_message_to_agent(
         )
     
     # 4. Save the turn to Firestore
-    saved_msg = add_message(
+    saved_msg = await add_message(
         uid=uid,
         convo_id=session_id,
         user_input=payload.user_input,
         ai_generated_output=ai_response, # Contains text or structured itinerary
-        submitted_data=payload.submitted_data
+        submitted_data=payload.submitted_data,
+        convo=history
     )
     
     return MessageResponse(**saved_msg)
 
+def _sse(event: str, data) -> str:
+    """One Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.post("/chat/{session_id}/message/stream")
+async def stream_message_to_agent(
+    session_id: str,
+    payload: ChatRequest,
+    user: dict = Depends(get_current_user)
+):
+    """
+    Streaming variant of /chat/{session_id}/message (text/event-stream).
+    Events, in order: `start`, then `tool_call` / `tool_result` progress and
+    `delta` chunks of the reply text, then `final` (the structured response) and
+    `message` (the saved turn, same shape as MessageResponse). Failures end the
+    stream with an `error` event. The turn is saved only once the reply is complete.
+    """
+    uid = user["uid"]
+
+    # Resolved before streaming so a missing session is still a plain 404
+    history = await get_conversation(uid, session_id, recent=history_load_size())
+    agent = await XplorerAI.create(uid)
+
+    async def events():
+        yield _sse("start", {"session_id": session_id})
+        ai_response = None
+        try:
+            async for event, data in agent.stream_chat(
+                user_input=payload.user_input,
+                history=history,
+                submitted_data=payload.submitted_data
+            ):
+                if event == "final":
+                    ai_response = data
+                yield _sse(event, data)
+
+            saved_msg = await add_message(
+                uid=uid,
+                convo_id=session_id,
+                user_input=payload.user_input,
+                ai_generated_output=ai_response,
+                submitted_data=payload.submitted_data,
+                convo=history
+            )
+            yield _sse("message", MessageResponse(**saved_msg).model_dump())
+        except HTTPException as e:
+            # The reply was generated but saving the turn failed
+            print(f"❌ Saving streamed turn failed: {e.detail}")
+            yield _sse("error", {"detail": e.detail})
+        except Exception as e:
+            print(f"❌ AI chat stream failed: {e}")
+            yield _sse("error", {
+                "detail": f"AI service is temporarily unavailable. Please try again in a minute. Error: {type(e).__name__}"
+            })
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # ─── 3. TRIP HISTORY & SESSIONS ─────────────────────────────────────────────
 
 @router.get("/chat/sessions", response_model=List[ConversationListItem])
-def list_my_trip_consultations(
+async def list_my_trip_consultations(
+    response: Response,
     limit: int = 20,
+    cursor: str = None,
     last_updated_at: str = None,
     user: dict = Depends(get_current_user)
 ):
-    """Returns a list of all past AI chat sessions with pagination."""
-    return list_conversations(user["uid"], limit=limit, last_updated_at=last_updated_at)
+    """
+    Returns a page of past AI chat sessions, most recent first (`limit` is
+    clamped to 1..MAX_PAGE_SIZE). Pass the X-Next-Cursor response header as
+    `cursor` to get the next page (the header is absent on the last page).
+    """
+    items, next_cursor = await list_conversations(
+        user["uid"], limit=limit, cursor=cursor, last_updated_at=last_updated_at
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
 
 @router.get("/chat/sessions/{session_id}", response_model=ConversationResponse)
-def get_full_chat_details(session_id: str, user: dict = Depends(get_current_user)):
+async def get_full_chat_details(session_id: str, user: dict = Depends(get_current_user)):
     """Retrieves all messages and metadata for a specific session."""
-    data = get_conversation(user["uid"], session_id)
+    data = await get_conversation(user["uid"], session_id)
     return ConversationResponse(**data)
 
 @router.delete("/chat/sessions/{session_id}")
-def delete_trip_consultation(session_id: str, user: dict = Depends(get_current_user)):
+async def delete_trip_consultation(session_id: str, user: dict = Depends(get_current_user)):
     """Permanently deletes a chat session."""
-    delete_conversation(user["uid"], session_id)
+    await delete_conversation(user["uid"], session_id)
     return {"message": "Session deleted."}
 
 # ─── 4. MOCK BOOKINGS (One-Click Execution) ──────────────────────────────────
 
 @router.post("/bookings/hotels", response_model=HotelBookingResponse)
-def book_suggested_hotel(payload: HotelBookingRequest, user: dict = Depends(get_current_user)):
+async def book_suggested_hotel(payload: HotelBookingRequest, user: dict = Depends(get_current_user)):
     """Confirms a hotel booking suggested by the AI."""
-    saved = save_hotel_booking(user["uid"], payload.model_dump())
+    saved = await save_hotel_booking(user["uid"], payload.model_dump())
     return HotelBookingResponse(**saved)
 
 @router.post("/bookings/transport", response_model=TransportBookingResponse)
-def book_suggested_transport(payload: TransportBookingRequest, user: dict = Depends(get_current_user)):
+async def book_suggested_transport(payload: TransportBookingRequest, user: dict = Depends(get_current_user)):
     """Confirms a cab/bike booking suggested by the AI."""
-    saved = save_transport_booking(user["uid"], payload.model_dump())
+    saved = await save_transport_booking(user["uid"], payload.model_dump())
     return TransportBookingResponse(**saved)
 
 @router.get("/bookings/all")
-def get_all_my_itinerary_bookings(user: dict = Depends(get_current_user)):
-    """Fetches all confirmed hotels and transport for the user."""
+async def get_all_my_itinerary_bookings(
+    response: Response,
+    limit: int = 50,
+    hotels_cursor: str = None,
+    transport_cursor: str = None,
+    user: dict = Depends(get_current_user)
+):
+    """
+    Fetches confirmed hotels and transport for the user, newest first, one page
+    of each (both read concurrently; `limit` is clamped to 1..MAX_PAGE_SIZE).
+    Further pages: pass the X-Next-Hotels-Cursor / X-Next-Transport-Cursor
+    headers back as `hotels_cursor` / `transport_cursor`.
+    """
     uid = user["uid"]
+    (hotels, hotels_next), (transport, transport_next) = await asyncio.gather(
+        get_hotel_bookings(uid, limit, hotels_cursor),
+        get_transport_bookings(uid, limit, transport_cursor),
+    )
+    if hotels_next:
+        response.headers["X-Next-Hotels-Cursor"] = hotels_next
+    if transport_next:
+        response.headers["X-Next-Transport-Cursor"] = transport_next
     return {
-        "hotels": get_hotel_bookings(uid),
-        "transport": get_transport_bookings(uid)
+        "hotels": hotels,
+        "transport": transport
     }
 
 # ─── 5. TRIP PLANNER (Route Optimization) ────────────────────────────────────
 
 from pydantic import BaseModel
 from typing import Optional
-from services.neo4j_service import calculate_optimal_route
+from services.neo4j_service import acalculate_optimal_route
 
 class TripPlanRequest(BaseModel):
     days: Optional[List[List[str]]] = None # List of lists (places per day)
@@ -209,7 +305,7 @@ class TripPlanRequest(BaseModel):
     hotel_name: Optional[str] = None
 
 @router.post("/trip/plan")
-def plan_optimized_trip(
+async def plan_optimized_trip(
     payload: TripPlanRequest,
     user: dict = Depends(get_current_user)
 ):
@@ -219,9 +315,9 @@ def plan_optimized_trip(
     """
     # Prefer 'days' if provided
     if payload.days:
-        result = calculate_optimal_route(payload.days, payload.hotel_name, is_multiday=True)
+        result = await acalculate_optimal_route(payload.days, payload.hotel_name, is_multiday=True)
     else:
-        result = calculate_optimal_route(payload.place_names, payload.hotel_name)
+        result = await acalculate_optimal_route(payload.place_names, payload.hotel_name)
     return result
 
 @router.get("/maps/key")
@@ -4,17 +4,22 @@ services/auth_service.py
 Handles all Firebase Authentication operations:
   - Register (create user in Firebase Auth)
   - Login  (sign in via Firebase REST API to get ID token)
-  - Get user info from token
+  - Get user info from token (verified claims cached until the token's `exp`)
 
 Note: Firebase Admin SDK does NOT support email/password sign-in directly.
       We use the Firebase Auth REST API for login to retrieve the ID token.
 """
 
 import os
+import time
+import asyncio
+import hashlib
 import httpx
 from fastapi import HTTPException, status
 from firebase_admin import auth
 from dotenv import load_dotenv
+from services import http_client
+from services.cache import LRUCache
 
 load_dotenv()
 
@@ -24,6 +29,15 @@ FIREBASE_SIGN_IN_URL = (
     f"?key={FIREBASE_WEB_API_KEY}"
 )
 
+# ─── Token Verification Cache ─────────────────────────────────────────────────
+# sha256(ID token) -> decoded claims, each entry expiring at the token's `exp`.
+# Raw tokens are never kept in memory. Like auth.verify_id_token's default
+# (check_revoked=False), a cached token stays valid until it expires.
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+SIGNING_CERT_REFRESH_SECS = int(os.getenv("SIGNING_CERT_REFRESH_SECS", "3600"))
+
+token_cache = LRUCache(maxsize=TOKEN_CACHE_SIZE)
+
 
 async def register_firebase_user(email: str, password: str, full_name: str) -> str:
     """
@@ -61,8 +75,14 @@ async def login_firebase_user(email: str, password: str) -> dict:
         "returnSecureToken": True,
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(FIREBASE_SIGN_IN_URL, json=payload)
+    try:
+        # Sign-in has no side effects, so it is safe to retry on timeouts / 5xx
+        response = await http_client.post(FIREBASE_SIGN_IN_URL, json=payload, idempotent=True)
+    except httpx.HTTPError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Firebase sign-in unavailable: {str(e) or type(e).__name__}",
+        )
 
     if response.status_code != 200:
         error_message = response.json().get("error", {}).get("message", "Login failed")
@@ -93,8 +113,7 @@ async def send_verification_email(id_token: str) -> None:
         "requestType": "VERIFY_EMAIL",
         "idToken": id_token
     }
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, json=payload)
+    response = await http_client.post(url, json=payload)
     
     if response.status_code != 200:
         print(f"Failed to send verification email: {response.text}")
@@ -110,14 +129,28 @@ async def delete_firebase_user(uid: str) -> None:
         pass  # Best-effort rollback
 
 
+def _token_key(id_token: str) -> str:
+    return hashlib.sha256(id_token.encode("utf-8")).hexdigest()
+
+
 def verify_id_token(id_token: str) -> dict:
     """
     Verify a Firebase ID token and return decoded token claims.
     Raises HTTPException if the token is invalid or expired.
     """
+    cached = token_cache.get(_token_key(id_token))
+    if cached is not None:
+        return dict(cached)
+    return _verify_and_cache(id_token)
+
+
+def _verify_and_cache(id_token: str) -> dict:
     try:
         decoded = auth.verify_id_token(id_token)
-        return decoded
+        ttl = decoded.get("exp", 0) - time.time()
+        if ttl > 0:
+            token_cache.set(_token_key(id_token), decoded, ttl=ttl)
+        return dict(decoded)
     except auth.ExpiredIdTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -133,3 +166,40 @@ def verify_id_token(id_token: str) -> dict:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Token verification failed: {str(e)}",
         )
+
+
+async def averify_id_token(id_token: str) -> dict:
+    """
+    Async verify_id_token: cache hits return inline, misses run the RSA check
+    (and any certificate fetch) in a worker thread instead of on the event loop.
+    """
+    cached = token_cache.get(_token_key(id_token))
+    if cached is not None:
+        return dict(cached)
+    return await asyncio.to_thread(_verify_and_cache, id_token)
+
+
+# ─── Signing Certificates ─────────────────────────────────────────────────────
+
+def refresh_signing_certs() -> bool:
+    """
+    Fetch Google's ID-token signing certificates into the Admin SDK's HTTP cache,
+    bypassing any cached copy, so token verification never waits on the fetch.
+    Relies on firebase_admin internals — best effort, returns False on failure.
+    """
+    try:
+        from firebase_admin import _token_gen
+        verifier = auth._get_client(None)._token_verifier
+        response = verifier.request(_token_gen.ID_TOKEN_CERT_URI, headers={"Cache-Control": "no-cache"})
+        return response.status == 200
+    except Exception as e:
+        print(f"⚠️  Signing certificate refresh failed: {e}")
+        return False
+
+
+async def refresh_signing_certs_forever() -> None:
+    """Background task: refresh the signing certificates every SIGNING_CERT_REFRESH_SECS."""
+    while True:
+        if await asyncio.to_thread(refresh_signing_certs):
+            print("🔑 Firebase signing certificates refreshed.")
+        await asyncio.sleep(SIGNING_CERT_REFRESH_SECS)
@@ -1,5 +1,6 @@
 import os
 import json
+import uuid
 import googlemaps
 from neo4j import GraphDatabase
 from dotenv import load_dotenv
@@ -267,6 +268,15 @@ class XplorerGraphBuilder:
                 except Exception as e:
                     print(f"  Google API Error: {e}")
 
+    def stamp_graph_version(self):
+        """Write a fresh version stamp so running API servers drop their cached graph data."""
+        version = uuid.uuid4().hex
+        self.query("""
+            MERGE (m:GraphMeta {key: 'xplorer'})
+            SET m.version = $version, m.built_at = datetime()
+        """, {"version": version})
+        print(f"Graph version stamped: {version}")
+
 # --- EXECUTION ---
 if __name__ == "__main__":
     builder = XplorerGraphBuilder()
@@ -286,6 +296,7 @@ if __name__ == "__main__":
         
         # 3. Connect the map
         builder.build_spatial_connections()
+        builder.stamp_graph_version()
         print("\n✅ Knowledge Graph Built Successfully!")
         
     except FileNotFoundError as e:
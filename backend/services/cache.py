@@ -0,0 +1,84 @@
+"""
+services/cache.py
+-----------------
+Small in-process cache primitives shared by the service layer.
+
+LRUCache is a thread-safe, size-bounded LRU map with an optional per-entry
+TTL and hit/miss counters. It is deliberately dependency-free so any
+service can keep a process-wide cache without extra infrastructure.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()    # key -> (expires_at or None, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value (and mark it recently used), or `default`."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def peek(self, key, default=None):
+        """Like get(), but leaves the hit/miss counters and recency order alone."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and (entry[0] is None or entry[0] > time.monotonic()):
+                return entry[1]
+            return default
+
+    def set(self, key, value, ttl: float = None) -> None:
+        """Store `value`. `ttl` overrides the cache default for this entry."""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+            return default if entry is _MISSING else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def values(self) -> list:
+        """Snapshot of the stored values (expired ones included), oldest first."""
+        with self._lock:
+            return [value for _, value in self._data.values()]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,175 @@
+"""
+services/chat_history.py
+------------------------
+Bounded conversation history for the Gemini prompt.
+
+Replaying every past message makes each turn slower and more expensive as a
+conversation grows, so the prompt is built from:
+  1. The rolling summary stored on the conversation doc (`history_summary`,
+     covering the first `summary_through` messages), refreshed in the
+     background by `travel_ai_service.refresh_history_summary`.
+  2. Messages not yet folded into the summary, in compact form (at most
+     HISTORY_MAX_UNSUMMARIZED of them, newest kept).
+  3. The last HISTORY_KEEP_TURNS turns verbatim.
+
+Itineraries are the bulk of most AI replies; only the most recent one is
+replayed in full — older ones become a one-line reference.
+
+Chat turns load only the last `history_load_size()` messages; `history` then
+carries `message_offset`, the index of its first message in the conversation.
+"""
+
+import os
+import json
+from google.genai import types
+
+HISTORY_KEEP_TURNS = int(os.getenv("HISTORY_KEEP_TURNS", "6"))
+HISTORY_SUMMARY_BATCH = int(os.getenv("HISTORY_SUMMARY_BATCH", "4"))
+HISTORY_MAX_UNSUMMARIZED = int(os.getenv("HISTORY_MAX_UNSUMMARIZED", "10"))
+
+_MAX_COMPACT_INPUT_CHARS = 500
+_MAX_ITINERARY_REF_CHARS = 400
+_SUMMARY_ACK = '{"text": "Noted — I have the context of our earlier conversation.", "itinerary": null}'
+
+
+# ─── Compaction ───────────────────────────────────────────────────────────────
+
+def _truncate(text: str, limit: int) -> str:
+    text = str(text or "")
+    return text if len(text) <= limit else text[:limit].rstrip() + "…"
+
+
+def itinerary_reference(itinerary) -> str:
+    """One-line stand-in for an itinerary: day numbers, themes and stops."""
+    if not isinstance(itinerary, list):
+        return _truncate(json.dumps(itinerary, default=str), _MAX_ITINERARY_REF_CHARS)
+    days = []
+    for day in itinerary:
+        if not isinstance(day, dict):
+            continue
+        stops = [str(a).split(":", 1)[-1].strip() for a in day.get("activities") or []]
+        line = f"Day {day.get('dayNumber', len(days) + 1)}"
+        if day.get("theme"):
+            line += f" ({day['theme']})"
+        if stops:
+            line += ": " + ", ".join(stops)
+        if day.get("hotels"):
+            line += f"; hotel: {day['hotels']}"
+        days.append(line)
+    return _truncate(f"{len(days)}-day itinerary — " + " | ".join(days), _MAX_ITINERARY_REF_CHARS)
+
+
+def compact_output(ai_out, keep_itinerary: bool = False) -> str:
+    """
+    Serialized AI reply for the prompt. Unless `keep_itinerary`, the itinerary is
+    replaced by `itinerary_ref` and UI-only fields are dropped.
+    """
+    if not isinstance(ai_out, dict):
+        return str(ai_out or "")
+    if keep_itinerary or not ai_out.get("itinerary"):
+        return json.dumps({k: v for k, v in ai_out.items() if keep_itinerary or k != "ui_elements"}, default=str)
+    return json.dumps({"text": ai_out.get("text", ""), "itinerary_ref": itinerary_reference(ai_out["itinerary"])})
+
+
+def _last_itinerary_index(messages: list):
+    for k in range(len(messages) - 1, -1, -1):
+        out = messages[k].get("ai_generated_output")
+        if isinstance(out, dict) and out.get("itinerary"):
+            return k
+    return None
+
+
+# ─── Prompt Window ────────────────────────────────────────────────────────────
+
+def history_load_size() -> int:
+    """Messages a chat turn needs: the verbatim window plus the compact / summary backlog."""
+    return HISTORY_KEEP_TURNS + max(HISTORY_MAX_UNSUMMARIZED, HISTORY_SUMMARY_BATCH)
+
+
+def _loaded(history: dict) -> tuple:
+    """(messages, offset, total) — loaded messages cover [offset, total)."""
+    messages = history.get("messages", [])
+    offset = history.get("message_offset", 0) or 0
+    return messages, offset, offset + len(messages)
+
+
+def history_window(history: dict, keep_turns: int = None) -> tuple:
+    """
+    Split history into (summary, compact_turns, recent_turns).
+    compact_turns / recent_turns are lists of (user_text, model_text).
+    """
+    keep_turns = HISTORY_KEEP_TURNS if keep_turns is None else keep_turns
+    messages, offset, total = _loaded(history)
+    summary = history.get("history_summary") or ""
+    through = min(history.get("summary_through", 0) or 0, total)
+    if not summary:
+        through = 0
+
+    # Indices below are relative to the loaded messages
+    recent_start = max(through, total - keep_turns, offset) - offset
+    compact_start = max(through - offset, recent_start - HISTORY_MAX_UNSUMMARIZED, 0)
+    latest_itinerary = _last_itinerary_index(messages)
+
+    compact = [
+        (_truncate(m.get("user_input", ""), _MAX_COMPACT_INPUT_CHARS), compact_output(m.get("ai_generated_output", "")))
+        for m in messages[compact_start:recent_start]
+    ]
+    recent = [
+        (m.get("user_input", ""), compact_output(m.get("ai_generated_output", ""), keep_itinerary=(k == latest_itinerary)))
+        for k, m in enumerate(messages[recent_start:], start=recent_start)
+    ]
+    return summary, compact, recent
+
+
+def history_contents(history: dict, keep_turns: int = None) -> list:
+    """Prompt contents (alternating user/model) for the bounded history."""
+    summary, compact, recent = history_window(history, keep_turns)
+    contents = []
+    if summary:
+        contents.append(types.Content(role="user", parts=[types.Part.from_text(
+            text=f"[SUMMARY OF OUR EARLIER CONVERSATION]\n{summary}"
+        )]))
+        contents.append(types.Content(role="model", parts=[types.Part.from_text(text=_SUMMARY_ACK)]))
+    for user_text, model_text in compact + recent:
+        contents.append(types.Content(role="user", parts=[types.Part.from_text(text=user_text)]))
+        contents.append(types.Content(role="model", parts=[types.Part.from_text(text=model_text)]))
+    return contents
+
+
+# ─── Summary Refresh ──────────────────────────────────────────────────────────
+
+def summary_backlog(history: dict, keep_turns: int = None) -> tuple:
+    """
+    (start, end) message range due to be folded into the rolling summary, or
+    None while fewer than HISTORY_SUMMARY_BATCH turns are waiting.
+    """
+    keep_turns = HISTORY_KEEP_TURNS if keep_turns is None else keep_turns
+    _, _, total = _loaded(history)
+    through = (history.get("summary_through", 0) or 0) if history.get("history_summary") else 0
+    end = total - keep_turns
+    if end - through < HISTORY_SUMMARY_BATCH:
+        return None
+    return through, end
+
+
+def backlog_messages(history: dict, start: int, end: int):
+    """Messages [start, end) from `history`, or None if they were not all loaded."""
+    messages, offset, _ = _loaded(history)
+    if start < offset:
+        return None
+    return messages[start - offset:end - offset]
+
+
+def summary_prompt(previous_summary: str, messages: list) -> str:
+    turns = "\n".join(
+        f"User: {_truncate(m.get('user_input', ''), _MAX_COMPACT_INPUT_CHARS)}\n"
+        f"Assistant: {compact_output(m.get('ai_generated_output', ''))}"
+        for m in messages
+    )
+    return (
+        "You maintain a running summary of a travel-planning chat with Xplorer AI (Chennai travel agent).\n"
+        "Update the summary with the new turns. Keep every fact needed to continue planning: travel dates, "
+        "number of travellers, interests, places/hotels/transport chosen or rejected, itinerary decisions and "
+        "open questions. Plain text, at most 150 words, no preamble.\n\n"
+        f"CURRENT SUMMARY:\n{previous_summary or '(none)'}\n\nNEW TURNS:\n{turns}"
+    )
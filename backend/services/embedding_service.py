@@ -0,0 +1,131 @@
+"""
+services/embedding_service.py
+-----------------------------
+Owns the SentenceTransformer model and runs every encode on one dedicated
+worker thread.
+
+Concurrent callers submit single sentences; the worker coalesces whatever is
+queued into a micro-batch (up to EMBEDDING_MAX_BATCH sentences, waiting at
+most EMBEDDING_MAX_WAIT_MS for stragglers) and runs one batched forward pass.
+Each caller gets a Future back, so async code can await it without blocking
+the event loop:
+
+    vector = await embedding_service.aencode("quiet hotel near the beach")
+"""
+
+import os
+import time
+import queue
+import asyncio
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+from dotenv import load_dotenv
+from sentence_transformers import SentenceTransformer
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+load_dotenv(dotenv_path=os.path.join(_BACKEND_DIR, ".env"))
+
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+EMBEDDING_MAX_BATCH = int(os.getenv("EMBEDDING_MAX_BATCH", "32"))
+EMBEDDING_MAX_WAIT_MS = float(os.getenv("EMBEDDING_MAX_WAIT_MS", "5"))
+
+
+class EmbeddingService:
+    def __init__(self, model_name: str, max_batch_size: int = 32, max_wait_ms: float = 5):
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = 0
+        self.sentences = 0
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    # ─── Model ────────────────────────────────────────────────────────────────
+
+    def load_model(self) -> SentenceTransformer:
+        """Load the model once; concurrent callers wait for the same load."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    print("Loading SentenceTransformer model...")
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    # ─── Public API ───────────────────────────────────────────────────────────
+
+    def submit(self, text: str) -> Future:
+        """Queue one sentence; the Future resolves to its float32 embedding."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def encode(self, text: str) -> np.ndarray:
+        """Blocking encode (scripts, worker threads)."""
+        return self.submit(text).result()
+
+    async def aencode(self, text: str) -> np.ndarray:
+        """Awaitable encode — the event loop stays free during inference."""
+        return await asyncio.wrap_future(self.submit(text))
+
+    def stats(self) -> dict:
+        return {
+            "model_loaded": self.is_loaded,
+            "batches": self.batches,
+            "sentences": self.sentences,
+            "avg_batch_size": round(self.sentences / self.batches, 2) if self.batches else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+    # ─── Worker ───────────────────────────────────────────────────────────────
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None:
+            with self._worker_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="embedding-worker", daemon=True)
+                    self._worker.start()
+
+    def _next_batch(self) -> list:
+        """Block for the first item, then gather more until the batch is full or max_wait passes."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = [(t, f) for t, f in self._next_batch() if f.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                # Identical sentences in one batch share a single forward pass
+                texts = list(dict.fromkeys(t for t, _ in batch))
+                vectors = self.load_model().encode(texts, batch_size=len(texts), convert_to_numpy=True)
+                by_text = {t: np.asarray(v, dtype=np.float32) for t, v in zip(texts, vectors)}
+                self.batches += 1
+                self.sentences += len(batch)
+                for text, future in batch:
+                    future.set_result(by_text[text])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
+
+embedding_service = EmbeddingService(EMBEDDING_MODEL, EMBEDDING_MAX_BATCH, EMBEDDING_MAX_WAIT_MS)
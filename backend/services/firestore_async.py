@@ -0,0 +1,340 @@
+"""
+services/firestore_async.py
+---------------------------
+Async twin of services/firestore_service.py, backed by Firestore's AsyncClient.
+
+Same functions, same arguments, same return values and HTTPExceptions — just
+awaitable, so a Firestore round-trip never blocks the event loop and a worker
+serves other chat turns while it waits. Route handlers use this module;
+scripts and worker-thread code keep using the sync one.
+
+Document layout, payloads, pagination and the profile cache all come from
+firestore_service, so the two stay interchangeable. Bulk deletes still run the
+sync BulkWriter implementation, in a worker thread.
+"""
+
+import copy
+import asyncio
+from typing import Callable, Union
+from fastapi import HTTPException, status
+from google.api_core.exceptions import NotFound
+from config.firebase import get_firestore_async
+from services import firestore_service as sync
+from services.firestore_service import (
+    CHUNKED,
+    MESSAGE_CHUNKS,
+    CONVERSATION_LIST_FIELDS,
+    HOTEL_BOOKING_FIELDS,
+    TRANSPORT_BOOKING_FIELDS,
+    profile_cache,
+    log_delete_progress,
+    _now_iso,
+    _convo_ref,
+    _new_conversation,
+    _created_conversation,
+    _stage_message,
+    _conversation_not_found,
+    _START_FIRST,
+    _recent_chunk_refs,
+    _chunk_messages,
+    _legacy_messages_query,
+    _legacy_messages,
+    _conversation_view,
+    _conversation_item,
+    _conversations_source,
+    _page_query,
+    _page_result,
+)
+
+
+async def _collect(stream) -> list:
+    return [doc async for doc in stream]
+
+
+async def _page(collection_ref, order_field: str, fields: tuple, limit: int, cursor: str = None) -> tuple:
+    query, limit = _page_query(collection_ref, order_field, fields, limit, cursor)
+    return _page_result(await _collect(query.stream()), order_field, limit)
+
+
+# ─── User Profile ──────────────────────────────────────────────────────────────
+
+async def create_user_profile(uid: str, profile_data: dict) -> None:
+    """
+    Save a new user's profile to Firestore: users/{uid}
+    Called right after Firebase Auth user creation.
+    """
+    db = get_firestore_async()
+    profile_data["created_at"] = _now_iso()
+    profile_data["uid"] = uid
+
+    try:
+        await db.collection("users").document(uid).set(profile_data)
+        profile_cache.pop(uid)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to save user profile: {str(e)}",
+        )
+
+
+async def get_user_profile(uid: str) -> dict:
+    """
+    Retrieve a user's profile from Firestore by UID (cached).
+    """
+    profile = profile_cache.get(uid)
+    if profile is not None:
+        return copy.deepcopy(profile)
+
+    db = get_firestore_async()
+    doc = await db.collection("users").document(uid).get()
+
+    if not doc.exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User profile not found.",
+        )
+    profile = doc.to_dict()
+    profile_cache.set(uid, profile)
+    return copy.deepcopy(profile)
+
+
+async def update_user_profile(uid: str, updates: dict) -> None:
+    """
+    Partially update a user's profile fields.
+    """
+    db = get_firestore_async()
+    updates["updated_at"] = _now_iso()
+
+    try:
+        await db.collection("users").document(uid).update(updates)
+        profile_cache.pop(uid)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update profile: {str(e)}",
+        )
+
+
+async def delete_user_data(uid: str, on_progress: Callable[[dict], None] = None) -> dict:
+    """Delete all Firestore data for a user (see firestore_service.delete_user_data)."""
+    return await asyncio.to_thread(sync.delete_user_data, uid, on_progress)
+
+
+# ─── Conversations ─────────────────────────────────────────────────────────────
+
+async def create_conversation(uid: str, conversation_title: str = None) -> dict:
+    """
+    Create a new conversation thread for a user.
+    Returns the convo_id and metadata.
+    """
+    db = get_firestore_async()
+    convo_data = _new_conversation(conversation_title)
+
+    try:
+        _, ref = await db.collection("users").document(uid).collection("conversations").add(convo_data)
+        return _created_conversation(ref.id, convo_data)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create conversation: {str(e)}",
+        )
+
+
+async def add_message(
+    uid: str,
+    convo_id: str,
+    user_input: str,
+    ai_generated_output: Union[dict, str],
+    submitted_data: dict = None,
+    convo: dict = None,
+) -> dict:
+    """
+    Add a message to an existing conversation and bump its metadata in one
+    batch. Pass the already-loaded `convo` to skip re-reading the conversation doc.
+    """
+    db = get_firestore_async()
+    convo_ref = _convo_ref(db, uid, convo_id)
+
+    if convo is None:
+        convo_doc = await convo_ref.get()
+        if not convo_doc.exists:
+            raise _conversation_not_found(convo_id, _START_FIRST)
+        convo = convo_doc.to_dict()
+
+    try:
+        batch = db.batch()
+        saved = _stage_message(batch, convo_ref, convo, user_input, ai_generated_output, submitted_data)
+        await batch.commit()
+        return saved
+    except NotFound:
+        raise _conversation_not_found(convo_id, _START_FIRST)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to add message: {str(e)}",
+        )
+
+
+async def get_conversation(uid: str, convo_id: str, recent: int = None) -> dict:
+    """
+    Get a conversation with its messages, ordered by timestamp. With `recent`,
+    only the last `recent` messages are read (see firestore_service.get_conversation).
+    """
+    db = get_firestore_async()
+
+    convo_ref = _convo_ref(db, uid, convo_id)
+    convo_doc = await convo_ref.get()
+
+    if not convo_doc.exists:
+        raise _conversation_not_found(convo_id)
+
+    convo_data = convo_doc.to_dict()
+
+    try:
+        if convo_data.get("layout") != CHUNKED:
+            docs = await _collect(_legacy_messages_query(convo_ref, recent).stream())
+            messages = _legacy_messages(docs, recent)
+        elif recent is None:
+            messages = _chunk_messages(await _collect(convo_ref.collection(MESSAGE_CHUNKS).stream()))
+        else:
+            refs = _recent_chunk_refs(convo_ref, convo_data.get("message_count", 0), recent)
+            messages = _chunk_messages(await _collect(db.get_all(refs)), recent)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve messages: {str(e)}",
+        )
+
+    return _conversation_view(convo_id, convo_data, messages, recent)
+
+
+async def update_conversation_title(uid: str, convo_id: str, title: str) -> None:
+    """
+    Rename a conversation. Does not touch updated_at, so the sessions list order is kept.
+    """
+    db = get_firestore_async()
+
+    try:
+        await _convo_ref(db, uid, convo_id).update({"conversation_title": title})
+    except NotFound:
+        raise _conversation_not_found(convo_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update conversation title: {str(e)}",
+        )
+
+
+async def update_conversation_summary(uid: str, convo_id: str, summary: str, summary_through: int) -> None:
+    """
+    Store the rolling summary of the first `summary_through` messages.
+    Does not touch updated_at — summarizing is not user activity.
+    """
+    db = get_firestore_async()
+
+    try:
+        await _convo_ref(db, uid, convo_id).update({"history_summary": summary, "summary_through": summary_through})
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update conversation summary: {str(e)}",
+        )
+
+
+async def list_conversations(uid: str, limit: int = 20, cursor: str = None, last_updated_at: str = None) -> tuple:
+    """
+    List a page of conversations, most recently updated first.
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    db = get_firestore_async()
+    collection = db.collection("users").document(uid).collection("conversations")
+
+    try:
+        rows, next_cursor = await _page(
+            _conversations_source(collection, cursor, last_updated_at), "updated_at",
+            CONVERSATION_LIST_FIELDS, limit, cursor,
+        )
+        return [_conversation_item(doc_id, d) for doc_id, d in rows], next_cursor
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to list conversations: {str(e)}",
+        )
+
+
+async def delete_conversation(uid: str, convo_id: str) -> None:
+    """
+    Delete a conversation and all its messages.
+    """
+    if not (await _convo_ref(get_firestore_async(), uid, convo_id).get()).exists:
+        raise _conversation_not_found(convo_id)
+    await asyncio.to_thread(sync.delete_conversation, uid, convo_id)
+
+
+# ─── Bookings ──────────────────────────────────────────────────────────────────
+
+async def _save_booking(uid: str, collection: str, data: dict, label: str) -> dict:
+    db = get_firestore_async()
+    data["booked_at"] = _now_iso()
+
+    try:
+        _, ref = await db.collection("users").document(uid).collection(collection).add(data)
+        return {"booking_id": ref.id, **data}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to save {label}: {str(e)}",
+        )
+
+
+async def _get_bookings(uid: str, collection: str, fields: tuple, limit: int, cursor: str, label: str) -> tuple:
+    db = get_firestore_async()
+    try:
+        rows, next_cursor = await _page(
+            db.collection("users").document(uid).collection(collection), "booked_at", fields, limit, cursor,
+        )
+        return [{**d, "booking_id": doc_id} for doc_id, d in rows], next_cursor
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch {label}: {str(e)}",
+        )
+
+
+async def _delete_booking(uid: str, collection: str, booking_id: str, not_found: str) -> None:
+    ref = get_firestore_async().collection("users").document(uid).collection(collection).document(booking_id)
+    if not (await ref.get()).exists:
+        raise HTTPException(status_code=404, detail=not_found)
+    await ref.delete()
+
+
+async def save_hotel_booking(uid: str, data: dict) -> dict:
+    """Save a hotel booking under users/{uid}/hotel_bookings/{auto_id}."""
+    return await _save_booking(uid, "hotel_bookings", data, "hotel booking")
+
+
+async def get_hotel_bookings(uid: str, limit: int = 50, cursor: str = None) -> tuple:
+    """A page of hotel bookings, newest first: (bookings, next_cursor)."""
+    return await _get_bookings(uid, "hotel_bookings", HOTEL_BOOKING_FIELDS, limit, cursor, "hotel bookings")
+
+
+async def delete_hotel_booking(uid: str, booking_id: str) -> None:
+    await _delete_booking(uid, "hotel_bookings", booking_id, "Hotel booking not found.")
+
+
+async def save_transport_booking(uid: str, data: dict) -> dict:
+    """Save a transport booking under users/{uid}/transport_bookings/{auto_id}."""
+    return await _save_booking(uid, "transport_bookings", data, "transport booking")
+
+
+async def get_transport_bookings(uid: str, limit: int = 50, cursor: str = None) -> tuple:
+    """A page of transport bookings, newest first: (bookings, next_cursor)."""
+    return await _get_bookings(uid, "transport_bookings", TRANSPORT_BOOKING_FIELDS, limit, cursor, "transport bookings")
+
+
+async def delete_transport_booking(uid: str, booking_id: str) -> None:
+    await _delete_booking(uid, "transport_bookings", booking_id, "Transport booking not found.")
@@ -3,6 +3,8 @@ services/firestore_service.py
 ------------------------------
 All Firestore read/write operations.
 Strictly separated from auth logic — swap the DB layer here without touching routes.
+Route handlers use the AsyncClient twin in services/firestore_async.py; this sync
+module serves scripts and worker threads, and owns the shared layout helpers.
 
 Firestore structure:
   users/{uid}/
@@ -12,18 +14,37 @@ Firestore structure:
           ├── created_at           (ISO datetime)
           ├── updated_at           (ISO datetime — refreshed on each new message)
           ├── message_count        (int — incremented on each new message)
-          └── messages/            (subcollection)
+          ├── history_summary      (string — rolling summary of older turns, optional)
+          ├── summary_through      (int — number of messages folded into history_summary)
+          ├── layout               ("chunked" | absent = legacy "subcollection")
+          ├── message_chunks/      (subcollection — layout "chunked")
+          │     └── {chunk index, zero-padded}/
+          │           └── messages  (array of up to MESSAGE_CHUNK_SIZE message dicts, with message_id)
+          └── messages/            (subcollection — legacy layout)
                 └── {message_id}/
                       ├── user_input
                       ├── ai_generated_output
                       ├── timestamp   (ISO datetime)
                       └── date        (YYYY-MM-DD)
+
+With the chunked layout a chat turn costs a constant number of operations:
+one conversation read plus one batched read of the (at most two) chunks
+holding the recent messages, then one batched commit that appends the message
+and bumps message_count with an Increment transform.
 """
 
+import os
+import copy
+import json
+import base64
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from typing import Union
+from typing import Callable, Union
 from fastapi import HTTPException, status
+from google.api_core.exceptions import NotFound
+from google.cloud.firestore import ArrayUnion, FieldFilter, Increment
 from config.firebase import get_firestore
+from services.cache import LRUCache
 
 
 # ─── Helpers ──────────────────────────────────────────────────────────────────
@@ -35,7 +56,74 @@ def _today_date() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%d")
 
 
+# ─── Pagination ───────────────────────────────────────────────────────────────
+# Listings are ordered by (timestamp field, document id) so ties never skip or
+# repeat rows, read only the fields they return, and are capped at MAX_PAGE_SIZE.
+# The cursor is an opaque token for the last row of the previous page.
+
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "100"))
+
+
+def encode_cursor(value, doc_id: str) -> str:
+    raw = json.dumps([value, doc_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """(value, doc_id) from encode_cursor. Raises 400 on a malformed cursor."""
+    try:
+        value, doc_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(doc_id, str) or not doc_id:
+            raise ValueError(doc_id)
+        return value, doc_id
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor.")
+
+
+def _page_query(collection_ref, order_field: str, fields: tuple, limit: int, cursor: str = None):
+    """(query for one page plus a look-ahead row, page size) — shared with firestore_async."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = (
+        collection_ref
+        .select(list(fields))
+        .order_by(order_field, direction="DESCENDING")
+        .order_by("__name__", direction="DESCENDING")
+    )
+    if cursor:
+        value, doc_id = decode_cursor(cursor)
+        query = query.start_after({order_field: value, "__name__": doc_id})
+    # One extra row tells us whether another page exists
+    return query.limit(limit + 1), limit
+
+
+def _page_result(docs: list, order_field: str, limit: int) -> tuple:
+    rows = [(doc.id, doc.to_dict() or {}) for doc in docs[:limit]]
+    next_cursor = None
+    if len(docs) > limit:
+        last_id, last = rows[-1]
+        next_cursor = encode_cursor(last.get(order_field), last_id)
+    return rows, next_cursor
+
+
+def _page(collection_ref, order_field: str, fields: tuple, limit: int, cursor: str = None) -> tuple:
+    """
+    One page of `collection_ref`, newest `order_field` first, projected to `fields`.
+    Returns ([(doc_id, data)], next_cursor or None).
+    """
+    query, limit = _page_query(collection_ref, order_field, fields, limit, cursor)
+    return _page_result(list(query.stream()), order_field, limit)
+
+
 # ─── User Profile ──────────────────────────────────────────────────────────────
+# Every chat turn and login reads the profile, but it only changes through the
+# functions below, so reads go through a per-process TTL+LRU cache. Writes here
+# invalidate it; the TTL bounds staleness across multiple workers.
+
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "4096"))
+PROFILE_CACHE_TTL_SECS = float(os.getenv("PROFILE_CACHE_TTL_SECS", "300"))
+
+profile_cache = LRUCache(maxsize=PROFILE_CACHE_SIZE, ttl=PROFILE_CACHE_TTL_SECS)
+
 
 def create_user_profile(uid: str, profile_data: dict) -> None:
     """
@@ -48,6 +136,7 @@ def create_user_profile(uid: str, profile_data: dict) -> None:
 
     try:
         db.collection("users").document(uid).set(profile_data)
+        profile_cache.pop(uid)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -57,8 +146,12 @@ def create_user_profile(uid: str, profile_data: dict) -> None:
 
 def get_user_profile(uid: str) -> dict:
     """
-    Retrieve a user's profile from Firestore by UID.
+    Retrieve a user's profile from Firestore by UID (cached).
     """
+    profile = profile_cache.get(uid)
+    if profile is not None:
+        return copy.deepcopy(profile)
+
     db = get_firestore()
     doc = db.collection("users").document(uid).get()
 
@@ -67,7 +160,9 @@ def get_user_profile(uid: str) -> dict:
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User profile not found.",
         )
-    return doc.to_dict()
+    profile = doc.to_dict()
+    profile_cache.set(uid, profile)
+    return copy.deepcopy(profile)
 
 
 def update_user_profile(uid: str, updates: dict) -> None:
@@ -79,6 +174,7 @@ def update_user_profile(uid: str, updates: dict) -> None:
 
     try:
         db.collection("users").document(uid).update(updates)
+        profile_cache.pop(uid)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -86,23 +182,26 @@ def update_user_profile(uid: str, updates: dict) -> None:
         )
 
 
-def delete_user_data(uid: str) -> None:
+def delete_user_data(uid: str, on_progress: Callable[[dict], None] = None) -> dict:
     """
-    Delete all Firestore data for a user (profile + all conversations).
-    Used during rollback or account deletion.
+    Delete all Firestore data for a user: profile, conversations with their
+    messages, and hotel/transport bookings. Used during rollback or account deletion.
+    Safe to call again after an interruption — it picks up whatever is left.
+    Returns per-collection delete counts.
     """
     db = get_firestore()
+    user_ref = db.collection("users").document(uid)
     try:
-        # Delete all messages inside each conversation, then the conversation doc
-        convos = db.collection("users").document(uid).collection("conversations").stream()
-        for convo in convos:
-            msgs = convo.reference.collection("messages").stream()
-            for msg in msgs:
-                msg.reference.delete()
-            convo.reference.delete()
-
-        # Delete profile doc
-        db.collection("users").document(uid).delete()
+        # list_documents() also returns conversations whose doc is already gone
+        # but whose messages are not (an earlier, interrupted run)
+        convo_refs = _list_refs(user_ref.collection("conversations"))
+        leaves = [(sub, convo.collection(sub)) for convo in convo_refs for sub in CONVERSATION_SUBCOLLECTIONS]
+        leaves += [(sub, user_ref.collection(sub)) for sub in USER_SUBCOLLECTIONS]
+
+        counts = _bulk_delete(db, leaves, [("conversations", convo_refs), ("users", [user_ref])], on_progress)
+        profile_cache.pop(uid)
+        print(f"🗑️  Deleted Firestore data for {uid}: {counts}")
+        return counts
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -110,19 +209,110 @@ def delete_user_data(uid: str) -> None:
         )
 
 
-# ─── Conversations ─────────────────────────────────────────────────────────────
+# ─── Bulk Deletion ─────────────────────────────────────────────────────────────
+# Deletes go through a BulkWriter (batched, parallel, throttled, retried) instead
+# of one RPC per document. Subcollections are listed DELETE_PARALLELISM at a
+# time and removed before their parents, so an interrupted run leaves every
+# remaining document reachable and a re-run finishes the job.
 
-def create_conversation(uid: str, conversation_title: str = None) -> dict:
-    """
-    Create a new conversation thread for a user.
-    Returns the convo_id and metadata.
+DELETE_PARALLELISM = int(os.getenv("DELETE_PARALLELISM", "8"))
+DELETE_PAGE_SIZE = int(os.getenv("DELETE_PAGE_SIZE", "500"))
+DELETE_MAX_ATTEMPTS = int(os.getenv("DELETE_MAX_ATTEMPTS", "5"))
+USER_SUBCOLLECTIONS = ("hotel_bookings", "transport_bookings")
 
-    If no title is given, auto-names it with date/time:
-      e.g. "Chat on 21 Feb 2026, 09:15 PM"
+
+def _list_refs(collection_ref) -> list:
+    """Document refs in a collection (ids only, no document data is read)."""
+    return list(collection_ref.list_documents(page_size=DELETE_PAGE_SIZE))
+
+
+def log_delete_progress(label: str) -> Callable[[dict], None]:
+    """`on_progress` callback that prints the running counts every DELETE_PAGE_SIZE documents."""
+    logged = [0]
+
+    def report(counts: dict) -> None:
+        total = sum(counts.values())
+        if total - logged[0] >= DELETE_PAGE_SIZE:
+            logged[0] = total
+            print(f"🗑️  {label}: {total} documents deleted so far {counts}")
+
+    return report
+
+
+def _bulk_delete(db, leaves: list, parents: list, on_progress: Callable[[dict], None] = None) -> dict:
     """
-    db = get_firestore()
-    now = _now_iso()
+    Delete every document in the `leaves` collections ([(name, collection_ref)]),
+    then the `parents` documents ([(name, [doc_ref])]) level by level.
+    `on_progress` gets the running counts after each collection is queued and
+    after each level is flushed. Raises if any delete still fails after retries.
+    """
+    counts = {}
+    failures = []
+
+    def on_error(failure, _writer) -> bool:
+        if failure.attempts < DELETE_MAX_ATTEMPTS:
+            return True
+        failures.append(failure.message)
+        return False
+
+    def report():
+        if on_progress:
+            on_progress(dict(counts))
+
+    writer = db.bulk_writer()
+    writer.on_write_error(on_error)
+    try:
+        # Listing runs in worker threads; the BulkWriter is only used from this one
+        with ThreadPoolExecutor(max_workers=DELETE_PARALLELISM) as pool:
+            futures = {pool.submit(_list_refs, coll): name for name, coll in leaves}
+            for future in as_completed(futures):
+                name = futures[future]
+                refs = future.result()
+                for ref in refs:
+                    writer.delete(ref)
+                counts[name] = counts.get(name, 0) + len(refs)
+                report()
+        writer.flush()
+        report()
+
+        for name, refs in parents:
+            if failures:
+                break      # keep parents so the leftovers stay reachable for a re-run
+            for ref in refs:
+                writer.delete(ref)
+            writer.flush()
+            counts[name] = counts.get(name, 0) + len(refs)
+            report()
+    finally:
+        writer.close()
+
+    if failures:
+        raise RuntimeError(f"{len(failures)} deletes failed (call again to resume): {failures[0]}")
+    return counts
+
+
+# ─── Conversations ─────────────────────────────────────────────────────────────
+# New conversations use CONVERSATION_LAYOUT; existing ones keep the layout they
+# were created with, so legacy subcollection conversations stay readable.
+
+CONVERSATION_LAYOUT = os.getenv("CONVERSATION_LAYOUT", "chunked")
+MESSAGE_CHUNK_SIZE = int(os.getenv("MESSAGE_CHUNK_SIZE", "20"))
+MESSAGES = "messages"
+MESSAGE_CHUNKS = "message_chunks"
+CONVERSATION_SUBCOLLECTIONS = (MESSAGES, MESSAGE_CHUNKS)
+CHUNKED = "chunked"
+
 
+def _convo_ref(db, uid: str, convo_id: str):
+    return db.collection("users").document(uid).collection("conversations").document(convo_id)
+
+
+def _chunk_ref(convo_ref, index: int):
+    return convo_ref.collection(MESSAGE_CHUNKS).document(f"{index:06d}")
+
+
+def _new_conversation(conversation_title: str = None) -> dict:
+    now = _now_iso()
     if not conversation_title:
         friendly_time = datetime.now(timezone.utc).strftime("%d %b %Y, %I:%M %p")
         conversation_title = f"Chat on {friendly_time}"
@@ -133,15 +323,35 @@ def create_conversation(uid: str, conversation_title: str = None) -> dict:
         "updated_at": now,
         "message_count": 0,
     }
+    if CONVERSATION_LAYOUT == CHUNKED:
+        convo_data["layout"] = CHUNKED
+    return convo_data
+
+
+def _created_conversation(convo_id: str, convo_data: dict) -> dict:
+    return {
+        "convo_id": convo_id,
+        "conversation_title": convo_data["conversation_title"],
+        "created_at": convo_data["created_at"],
+        "layout": convo_data.get("layout"),
+        "message_count": 0,
+    }
+
+
+def create_conversation(uid: str, conversation_title: str = None) -> dict:
+    """
+    Create a new conversation thread for a user.
+    Returns the convo_id and metadata.
+
+    If no title is given, auto-names it with date/time:
+      e.g. "Chat on 21 Feb 2026, 09:15 PM"
+    """
+    db = get_firestore()
+    convo_data = _new_conversation(conversation_title)
 
     try:
         ref = db.collection("users").document(uid).collection("conversations").add(convo_data)
-        convo_id = ref[1].id
-        return {
-            "convo_id": convo_id,
-            "conversation_title": conversation_title,
-            "created_at": now,
-        }
+        return _created_conversation(ref[1].id, convo_data)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -149,55 +359,88 @@ def create_conversation(uid: str, conversation_title: str = None) -> dict:
         )
 
 
-def add_message(uid: str, convo_id: str, user_input: str, ai_generated_output: Union[dict, str], submitted_data: dict = None) -> dict:
+def _stage_message(batch, convo_ref, convo: dict, user_input: str, ai_generated_output, submitted_data: dict) -> dict:
     """
-    Add a message (user_input + ai_generated_output) to an existing conversation.
-    Also updates the conversation's updated_at and increments message_count.
-    Returns the saved message dict with message_id.
+    Queue the message write and the conversation metadata update on `batch`
+    (sync or async WriteBatch). Returns the message dict with message_id.
     """
-    db = get_firestore()
     now = _now_iso()
-    today = _today_date()
-
-    convo_ref = db.collection("users").document(uid).collection("conversations").document(convo_id)
-
-    # Verify conversation exists
-    convo_doc = convo_ref.get()
-    if not convo_doc.exists:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Conversation '{convo_id}' not found. Start a new conversation first.",
-        )
-
     message_data = {
         "user_input": user_input,
         "ai_generated_output": ai_generated_output,
         "submitted_data": submitted_data,
         "timestamp": now,
-        "date": today,
+        "date": _today_date(),
     }
 
+    if convo.get("layout") == CHUNKED:
+        message_id = convo_ref.collection(MESSAGE_CHUNKS).document().id   # auto-id, no RPC
+        chunk = _chunk_ref(convo_ref, convo.get("message_count", 0) // MESSAGE_CHUNK_SIZE)
+        batch.set(chunk, {"messages": ArrayUnion([{"message_id": message_id, **message_data}])}, merge=True)
+    else:
+        msg_ref = convo_ref.collection(MESSAGES).document()
+        message_id = msg_ref.id
+        batch.set(msg_ref, message_data)
+
+    update_payload = {
+        "updated_at": now,
+        "message_count": Increment(1),
+    }
+    # Check if this response contains an itinerary
+    if isinstance(ai_generated_output, dict) and ai_generated_output.get("itinerary"):
+        update_payload["has_itinerary"] = True
+    # update() fails the whole batch if the conversation was deleted meanwhile
+    batch.update(convo_ref, update_payload)
+
+    return {
+        "message_id": message_id,
+        **message_data,
+    }
+
+
+def _conversation_not_found(convo_id: str, hint: str = "") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Conversation '{convo_id}' not found.{hint}",
+    )
+
+
+_START_FIRST = " Start a new conversation first."
+
+
+def add_message(
+    uid: str,
+    convo_id: str,
+    user_input: str,
+    ai_generated_output: Union[dict, str],
+    submitted_data: dict = None,
+    convo: dict = None,
+) -> dict:
+    """
+    Add a message (user_input + ai_generated_output) to an existing conversation.
+    Also updates the conversation's updated_at and increments message_count.
+    Returns the saved message dict with message_id.
+
+    `convo` is the conversation as already loaded this turn (get_conversation or
+    create_conversation output); passing it skips re-reading the conversation doc.
+    The message and metadata update are committed in one batch.
+    """
+    db = get_firestore()
+    convo_ref = _convo_ref(db, uid, convo_id)
+
+    if convo is None:
+        convo_doc = convo_ref.get()
+        if not convo_doc.exists:
+            raise _conversation_not_found(convo_id, _START_FIRST)
+        convo = convo_doc.to_dict()
+
     try:
-        msg_ref = convo_ref.collection("messages").add(message_data)
-        message_id = msg_ref[1].id
-
-        # Update conversation metadata
-        existing = convo_doc.to_dict()
-        update_payload = {
-            "updated_at": now,
-            "message_count": existing.get("message_count", 0) + 1,
-        }
-
-        # Check if this response contains an itinerary
-        if isinstance(ai_generated_output, dict) and ai_generated_output.get("itinerary"):
-            update_payload["has_itinerary"] = True
-
-        convo_ref.update(update_payload)
-
-        return {
-            "message_id": message_id,
-            **message_data,
-        }
+        batch = db.batch()
+        saved = _stage_message(batch, convo_ref, convo, user_input, ai_generated_output, submitted_data)
+        batch.commit()
+        return saved
+    except NotFound:
+        raise _conversation_not_found(convo_id, _START_FIRST)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -205,80 +448,162 @@ def add_message(uid: str, convo_id: str, user_input: str, ai_generated_output: U
         )
 
 
-def get_conversation(uid: str, convo_id: str) -> dict:
+def _recent_chunk_refs(convo_ref, message_count: int, recent: int) -> list:
+    """Chunk docs holding the last `recent` messages (at most two for recent <= MESSAGE_CHUNK_SIZE)."""
+    first = max(0, message_count - recent) // MESSAGE_CHUNK_SIZE
+    last = max(0, message_count - 1) // MESSAGE_CHUNK_SIZE
+    return [_chunk_ref(convo_ref, k) for k in range(first, last + 1)]
+
+
+def _chunk_messages(chunk_docs: list, recent: int = None) -> list:
+    messages = []
+    for doc in sorted(chunk_docs, key=lambda d: d.id):
+        if doc.exists:
+            messages.extend((doc.to_dict() or {}).get("messages", []))
+    messages.sort(key=lambda m: m.get("timestamp", ""))
+    return messages if recent is None else messages[-recent:]
+
+
+def _legacy_messages_query(convo_ref, recent: int = None):
+    query = convo_ref.collection(MESSAGES)
+    if recent is None:
+        return query.order_by("timestamp")
+    return query.order_by("timestamp", direction="DESCENDING").limit(recent)
+
+
+def _legacy_messages(docs: list, recent: int = None) -> list:
+    messages = []
+    for msg in (docs if recent is None else reversed(docs)):
+        m = msg.to_dict()
+        m["message_id"] = msg.id
+        messages.append(m)
+    return messages
+
+
+def _conversation_view(convo_id: str, convo_data: dict, messages: list, recent: int = None) -> dict:
+    message_count = convo_data.get("message_count", 0)
+    return {
+        "convo_id": convo_id,
+        "conversation_title": convo_data.get("conversation_title", ""),
+        "created_at": convo_data.get("created_at", ""),
+        "updated_at": convo_data.get("updated_at", ""),
+        "messages": messages,
+        "message_offset": max(0, message_count - len(messages)) if recent is not None else 0,
+        "message_count": message_count,
+        "layout": convo_data.get("layout"),
+        "history_summary": convo_data.get("history_summary", ""),
+        "summary_through": convo_data.get("summary_through", 0),
+    }
+
+
+def get_conversation(uid: str, convo_id: str, recent: int = None) -> dict:
     """
-    Get a full conversation with all its messages, ordered by timestamp.
+    Get a conversation with its messages, ordered by timestamp.
+
+    With `recent`, only the last `recent` messages are read (the chat-turn path);
+    `message_offset` is then the index of the first returned message within the
+    whole conversation.
     """
     db = get_firestore()
 
-    convo_ref = db.collection("users").document(uid).collection("conversations").document(convo_id)
+    convo_ref = _convo_ref(db, uid, convo_id)
     convo_doc = convo_ref.get()
 
     if not convo_doc.exists:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Conversation '{convo_id}' not found.",
-        )
+        raise _conversation_not_found(convo_id)
 
     convo_data = convo_doc.to_dict()
 
     try:
-        msgs = convo_ref.collection("messages").order_by("timestamp").stream()
-        messages = []
-        for msg in msgs:
-            m = msg.to_dict()
-            m["message_id"] = msg.id
-            messages.append(m)
+        if convo_data.get("layout") != CHUNKED:
+            messages = _legacy_messages(list(_legacy_messages_query(convo_ref, recent).stream()), recent)
+        elif recent is None:
+            messages = _chunk_messages(list(convo_ref.collection(MESSAGE_CHUNKS).stream()))
+        else:
+            refs = _recent_chunk_refs(convo_ref, convo_data.get("message_count", 0), recent)
+            messages = _chunk_messages(list(db.get_all(refs)), recent)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve messages: {str(e)}",
         )
 
+    return _conversation_view(convo_id, convo_data, messages, recent)
+
+
+def update_conversation_title(uid: str, convo_id: str, title: str) -> None:
+    """
+    Rename a conversation. Does not touch updated_at, so the sessions list order is kept.
+    """
+    db = get_firestore()
+
+    try:
+        _convo_ref(db, uid, convo_id).update({"conversation_title": title})
+    except NotFound:
+        raise _conversation_not_found(convo_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update conversation title: {str(e)}",
+        )
+
+
+def update_conversation_summary(uid: str, convo_id: str, summary: str, summary_through: int) -> None:
+    """
+    Store the rolling summary of the first `summary_through` messages.
+    Does not touch updated_at — summarizing is not user activity.
+    """
+    db = get_firestore()
+    convo_ref = db.collection("users").document(uid).collection("conversations").document(convo_id)
+
+    try:
+        convo_ref.update({"history_summary": summary, "summary_through": summary_through})
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update conversation summary: {str(e)}",
+        )
+
+
+CONVERSATION_LIST_FIELDS = ("conversation_title", "created_at", "updated_at", "message_count", "has_itinerary")
+
+
+def _conversation_item(doc_id: str, d: dict) -> dict:
     return {
-        "convo_id": convo_id,
-        "conversation_title": convo_data.get("conversation_title", ""),
-        "created_at": convo_data.get("created_at", ""),
-        "updated_at": convo_data.get("updated_at", ""),
-        "messages": messages,
+        "convo_id": doc_id,
+        "conversation_title": d.get("conversation_title", ""),
+        "created_at": d.get("created_at", ""),
+        "updated_at": d.get("updated_at", ""),
+        "message_count": d.get("message_count", 0),
+        "has_itinerary": d.get("has_itinerary", False),
     }
 
 
-def list_conversations(uid: str, limit: int = 20, last_updated_at: str = None) -> list:
+def _conversations_source(collection, cursor: str = None, last_updated_at: str = None):
+    if last_updated_at and not cursor:
+        return collection.where(filter=FieldFilter("updated_at", "<", last_updated_at))
+    return collection
+
+
+def list_conversations(uid: str, limit: int = 20, cursor: str = None, last_updated_at: str = None) -> tuple:
     """
-    List all conversations for a user (summary only — no messages).
-    Returns empty list [] if the user has never started a conversation.
-    Ordered by most recently updated first.
-    Includes pagination via limit and last_updated_at (ISO string).
+    List a page of conversations for a user (summary only — no messages),
+    most recently updated first. Returns (items, next_cursor); next_cursor is
+    None on the last page. Items are [] if the user has never started a conversation.
+    `last_updated_at` is the older, tie-unsafe cursor, still accepted from old clients.
     """
     db = get_firestore()
+    collection = db.collection("users").document(uid).collection("conversations")
 
     try:
-        query = (
-            db.collection("users")
-            .document(uid)
-            .collection("conversations")
-            .order_by("updated_at", direction="DESCENDING")
+        rows, next_cursor = _page(
+            _conversations_source(collection, cursor, last_updated_at), "updated_at",
+            CONVERSATION_LIST_FIELDS, limit, cursor,
         )
 
-        if last_updated_at:
-            query = query.start_after({"updated_at": last_updated_at})
-
-        query = query.limit(limit)
-        
-        docs = query.stream()
-        result = []
-        for doc in docs:
-            d = doc.to_dict()
-            result.append({
-                "convo_id": doc.id,
-                "conversation_title": d.get("conversation_title", ""),
-                "created_at": d.get("created_at", ""),
-                "updated_at": d.get("updated_at", ""),
-                "message_count": d.get("message_count", 0),
-                "has_itinerary": d.get("has_itinerary", False),
-            })
-        return result  # Will be [] for new users — perfectly normal
+        return [_conversation_item(doc_id, d) for doc_id, d in rows], next_cursor  # items will be [] for new users — perfectly normal
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -291,21 +616,16 @@ def delete_conversation(uid: str, convo_id: str) -> None:
     Delete a conversation and all its messages.
     """
     db = get_firestore()
-    convo_ref = db.collection("users").document(uid).collection("conversations").document(convo_id)
+    convo_ref = _convo_ref(db, uid, convo_id)
 
     if not convo_ref.get().exists:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Conversation '{convo_id}' not found.",
-        )
+        raise _conversation_not_found(convo_id)
 
     try:
-        # Delete all messages first
-        msgs = convo_ref.collection("messages").stream()
-        for msg in msgs:
-            msg.reference.delete()
-        # Delete conversation doc
-        convo_ref.delete()
+        # Messages first (either layout), then the conversation doc
+        leaves = [(sub, convo_ref.collection(sub)) for sub in CONVERSATION_SUBCOLLECTIONS]
+        _bulk_delete(db, leaves, [("conversations", [convo_ref])],
+                     log_delete_progress(f"Deleting conversation {convo_id}"))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -333,20 +653,23 @@ def save_hotel_booking(uid: str, data: dict) -> dict:
         )
 
 
-def get_hotel_bookings(uid: str) -> list:
+HOTEL_BOOKING_FIELDS = ("hotel_id", "hotel_name", "location", "room_type", "check_in_date", "check_out_date", "booked_at")
+
+
+def get_hotel_bookings(uid: str, limit: int = 50, cursor: str = None) -> tuple:
     """
-    List all hotel bookings for a user, newest first.
-    Returns [] if none exist.
+    List a page of hotel bookings for a user, newest first.
+    Returns (bookings, next_cursor); bookings are [] if none exist.
     """
     db = get_firestore()
     try:
-        docs = (
-            db.collection("users").document(uid)
-            .collection("hotel_bookings")
-            .order_by("booked_at", direction="DESCENDING")
-            .stream()
+        rows, next_cursor = _page(
+            db.collection("users").document(uid).collection("hotel_bookings"),
+            "booked_at", HOTEL_BOOKING_FIELDS, limit, cursor,
         )
-        return [{**doc.to_dict(), "booking_id": doc.id} for doc in docs]
+        return [{**d, "booking_id": doc_id} for doc_id, d in rows], next_cursor
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -383,20 +706,23 @@ def save_transport_booking(uid: str, data: dict) -> dict:
         )
 
 
-def get_transport_bookings(uid: str) -> list:
+TRANSPORT_BOOKING_FIELDS = ("agency_name", "vehicle_category", "vehicle_type", "model", "trip_date", "booked_at")
+
+
+def get_transport_bookings(uid: str, limit: int = 50, cursor: str = None) -> tuple:
     """
-    List all transport bookings for a user, newest first.
-    Returns [] if none exist.
+    List a page of transport bookings for a user, newest first.
+    Returns (bookings, next_cursor); bookings are [] if none exist.
     """
     db = get_firestore()
     try:
-        docs = (
-            db.collection("users").document(uid)
-            .collection("transport_bookings")
-            .order_by("booked_at", direction="DESCENDING")
-            .stream()
+        rows, next_cursor = _page(
+            db.collection("users").document(uid).collection("transport_bookings"),
+            "booked_at", TRANSPORT_BOOKING_FIELDS, limit, cursor,
         )
-        return [{**doc.to_dict(), "booking_id": doc.id} for doc in docs]
+        return [{**d, "booking_id": doc_id} for doc_id, d in rows], next_cursor
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
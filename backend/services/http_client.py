@@ -0,0 +1,117 @@
+"""
+services/http_client.py
+-----------------------
+One application-scoped httpx.AsyncClient for all outbound REST calls
+(Firebase Auth REST API, Open-Meteo).
+
+A pooled client keeps TLS sessions and HTTP/2 connections alive between
+calls instead of paying a fresh handshake on every login or weather lookup.
+main.py opens it in the lifespan and closes it on shutdown; scripts that
+never run the app get one lazily on first use.
+
+`request()` adds explicit timeouts and retries with exponential backoff:
+  - connection failures are always retried (the request never left),
+  - timeouts and 429/5xx responses only for idempotent calls.
+"""
+
+import os
+import random
+import asyncio
+import httpx
+
+HTTP_TIMEOUT_SECS = float(os.getenv("HTTP_TIMEOUT_SECS", "10"))
+HTTP_CONNECT_TIMEOUT_SECS = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECS", "5"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY_SECS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECS", "60"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+_IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+_MAX_BACKOFF_SECS = 8.0
+
+_client = None
+
+
+# ─── Client Lifecycle ─────────────────────────────────────────────────────────
+
+def init_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(HTTP_TIMEOUT_SECS, connect=HTTP_CONNECT_TIMEOUT_SECS),
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECS,
+            ),
+        )
+    return _client
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The shared client (created on first use outside the app lifespan)."""
+    return init_http_client()
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# ─── Requests ─────────────────────────────────────────────────────────────────
+
+def _backoff(attempt: int, response: httpx.Response = None) -> float:
+    """Retry-After if the server sent one (in seconds), else exponential backoff with jitter."""
+    if response is not None:
+        try:
+            return min(float(response.headers["Retry-After"]), _MAX_BACKOFF_SECS)
+        except (KeyError, ValueError):
+            pass
+    return min(0.25 * (2 ** attempt), _MAX_BACKOFF_SECS) * (0.5 + random.random() / 2)
+
+
+async def request(method: str, url: str, *, idempotent: bool = None, retries: int = None, **kwargs) -> httpx.Response:
+    """
+    Send a request through the shared client. kwargs go to httpx (json, params,
+    headers, timeout, ...). `idempotent` defaults from the method; pass True for
+    side-effect-free POSTs so they are retried on timeouts and 5xx too.
+    Raises the last httpx error once retries are exhausted.
+    """
+    method = method.upper()
+    idempotent = method in _IDEMPOTENT_METHODS if idempotent is None else idempotent
+    retries = HTTP_MAX_RETRIES if retries is None else retries
+    client = get_http_client()
+
+    attempt = 0
+    while True:
+        try:
+            response = await client.request(method, url, **kwargs)
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+            if attempt >= retries:
+                raise
+            delay = _backoff(attempt)
+        except (httpx.TimeoutException, httpx.RemoteProtocolError, httpx.ReadError):
+            if not idempotent or attempt >= retries:
+                raise
+            delay = _backoff(attempt)
+        else:
+            if response.status_code not in _RETRY_STATUSES or not idempotent or attempt >= retries:
+                return response
+            delay = _backoff(attempt, response)
+            await response.aclose()
+
+        attempt += 1
+        print(f"🔁 {method} {httpx.URL(url).host} retry {attempt}/{retries} in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+
+async def get(url: str, **kwargs) -> httpx.Response:
+    return await request("GET", url, **kwargs)
+
+
+async def post(url: str, **kwargs) -> httpx.Response:
+    return await request("POST", url, **kwargs)
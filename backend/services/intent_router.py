@@ -0,0 +1,254 @@
+"""
+services/intent_router.py
+-------------------------
+Rules-based front door for chat turns that carry `submitted_data`.
+
+When the user submits one of the agent's forms (the frontend sends the field
+values with the canned text "Information updated."), a hotel or cab search
+with well-formed parameters maps straight onto `find_hotels` / `find_cabs`.
+Those turns are answered from the graph here, skipping the Gemini call and
+its tool round-trips. Anything else escalates to XplorerAI's normal loop:
+  - free text next to the form (the user asked something too),
+  - fields outside the hotel / cab schema (dates for an itinerary, interests,
+    room types the graph query can't filter on…),
+  - forms with no real filter (only dates / guests) and no explicit intent,
+  - values that don't parse or aren't in the graph's vocabulary (price
+    ranges and shorthand like "5k" included),
+  - a budget, amenity or vehicle type mentioned earlier in the conversation
+    that the form doesn't repeat — the router only sees the form,
+  - no matching results (the model is better at suggesting alternatives).
+
+A form can also name its intent explicitly: {"intent": "find_hotels", ...}.
+"""
+
+import os
+import re
+
+from services.neo4j_service import aquery_graph
+
+INTENT_ROUTER = os.getenv("INTENT_ROUTER", "true").lower() == "true"
+
+FORM_SUBMIT_TEXTS = {"", "information updated", "information updated."}
+ANY = {"any", "no preference", "none", "either", "all"}
+
+# Vocabulary of the seed data (services/data) — values outside it go to the LLM
+VEHICLE_TYPES = {v.lower(): v for v in ("Hatchback", "Motorcycle", "SUV", "Scooter", "Sedan")}
+AMENITIES = {a.lower(): a for a in (
+    "AC", "Balcony", "Bathtub", "Breakfast Included", "City View", "Coffee Maker", "Gym Access",
+    "Lounge Access", "Mini Bar", "Pool View", "Room Service", "Sea View", "Spa Access", "TV", "WiFi",
+)}
+
+# Form field names accepted for each intent (lower-cased); shared ones don't decide the intent
+PRICE_FIELDS = {"max_price", "budget", "price", "max_budget"}
+HOTEL_FIELDS = {"amenity", "amenities", "check_in", "check_in_date", "check_out", "check_out_date",
+                "hotel_budget", "guests"}
+CAB_FIELDS = {"vehicle_type", "vehicle", "cab_type", "trip_date", "pickup_date", "cab_budget"}
+CONTROL_FIELDS = {"intent", "action"}
+AMENITY_FIELDS = {"amenity", "amenities"}
+VEHICLE_FIELDS = {"vehicle_type", "vehicle", "cab_type"}
+BUDGET_FIELDS = PRICE_FIELDS | {"hotel_budget", "cab_budget"}
+
+# Filters each search applies — an earlier mention of one the form leaves out escalates
+FILTERS = {"find_hotels": {"max_price", "amenity"}, "find_cabs": {"max_price", "vehicle_type"}}
+_PRICE_MENTION = re.compile(
+    r"₹|\brs\.?\s*\d|\binr\b|\brupees?\b|\bbudget\b|\bafford|\bcheap|"
+    r"\b(?:under|below|within|max(?:imum)?|less than|upto|up to)\s*\d"
+)
+_PRICE_SHORTHAND = re.compile(r"\d\s*(?:k|l|lakhs?|lacs?|thousand|hundred)\b", re.IGNORECASE)
+
+_stats = {"routed": 0, "escalated": 0}
+
+
+# ─── Parameter Parsing ────────────────────────────────────────────────────────
+
+class _Escalate(Exception):
+    """The request is not a well-formed structured search."""
+
+
+def _price(value):
+    """
+    '₹5,000', 'Under 5000', 5000 → 5000; None / 'Any' → None.
+    Ranges ('₹2,000 - ₹5,000') and shorthand ('5k') escalate — the model reads those better.
+    """
+    if value is None or str(value).strip().lower() in ANY:
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    numbers = re.findall(r"\d[\d,]*(?:\.\d+)?", str(value))
+    if len(numbers) != 1 or _PRICE_SHORTHAND.search(str(value)):
+        raise _Escalate(f"unparseable price {value!r}")
+    number = float(numbers[0].replace(",", ""))
+    return int(number) if number.is_integer() else number
+
+
+def _choice(value, vocabulary: dict):
+    if value is None or str(value).strip().lower() in ANY:
+        return None
+    if isinstance(value, list):
+        if len(value) != 1:
+            raise _Escalate(f"multiple values {value!r}")
+        value = value[0]
+    canonical = vocabulary.get(str(value).strip().lower())
+    if canonical is None:
+        raise _Escalate(f"unknown value {value!r}")
+    return canonical
+
+
+def _first(data: dict, fields: set):
+    for key, value in data.items():
+        if key in fields and value not in (None, ""):
+            return value
+    return None
+
+
+def classify(user_input: str, submitted_data: dict):
+    """
+    (query_type, params, form) for a routable request, or raises _Escalate.
+    `form` is the lower-cased submitted data, used for the reply text.
+    Without an explicit intent, the form must set at least one filter.
+    """
+    if not isinstance(submitted_data, dict) or not submitted_data:
+        raise _Escalate("no submitted data")
+    form = {str(k).strip().lower(): v for k, v in submitted_data.items()}
+    explicit = str(form.get("intent") or form.get("action") or "").strip().lower()
+
+    if explicit not in ("find_hotels", "find_cabs"):
+        if explicit:
+            raise _Escalate(f"intent {explicit!r}")
+        if (user_input or "").strip().lower() not in FORM_SUBMIT_TEXTS:
+            raise _Escalate("free text with the form")
+        hotel, cab = bool(form.keys() & HOTEL_FIELDS), bool(form.keys() & CAB_FIELDS)
+        if hotel == cab:
+            raise _Escalate("ambiguous form")
+        explicit = "find_hotels" if hotel else "find_cabs"
+
+    schema = HOTEL_FIELDS if explicit == "find_hotels" else CAB_FIELDS
+    unknown = form.keys() - schema - PRICE_FIELDS - CONTROL_FIELDS
+    if unknown:
+        raise _Escalate(f"fields outside the {explicit} schema: {sorted(unknown)}")
+
+    params = {}
+    max_price = _price(_first(form, BUDGET_FIELDS))
+    if max_price is not None:
+        params["max_price"] = max_price
+    if explicit == "find_hotels":
+        amenity = _choice(_first(form, AMENITY_FIELDS), AMENITIES)
+        if amenity:
+            params["amenity"] = amenity
+    else:
+        vehicle_type = _choice(_first(form, VEHICLE_FIELDS), VEHICLE_TYPES)
+        if vehicle_type:
+            params["vehicle_type"] = vehicle_type
+    if not params and not (form.get("intent") or form.get("action")):
+        raise _Escalate("no filters in the form")
+    return explicit, params, form
+
+
+def history_filters(history: dict) -> set:
+    """
+    Filters ("max_price", "amenity", "vehicle_type") the user mentioned earlier in
+    the conversation — in their messages, past form submissions or the summary.
+    """
+    history = history or {}
+    texts = [history.get("history_summary") or ""]
+    found = set()
+    for m in history.get("messages") or []:
+        texts.append(str(m.get("user_input") or ""))
+        data = m.get("submitted_data")
+        if isinstance(data, dict):
+            keys = {str(k).strip().lower() for k, v in data.items() if v not in (None, "")}
+            if keys & BUDGET_FIELDS:
+                found.add("max_price")
+            if keys & AMENITY_FIELDS:
+                found.add("amenity")
+            if keys & VEHICLE_FIELDS:
+                found.add("vehicle_type")
+            texts.extend(str(v) for v in data.values() if isinstance(v, str))
+
+    text = " ".join(texts).lower()
+    if _PRICE_MENTION.search(text):
+        found.add("max_price")
+    if any(re.search(rf"\b{re.escape(a)}\b", text) for a in AMENITIES):
+        found.add("amenity")
+    if any(re.search(rf"\b{re.escape(v)}s?\b", text) for v in VEHICLE_TYPES):
+        found.add("vehicle_type")
+    return found
+
+
+# ─── Replies ──────────────────────────────────────────────────────────────────
+
+def _money(value) -> str:
+    return f"₹{value:,.0f}" if isinstance(value, (int, float)) else str(value)
+
+
+def _hotels_text(results: list, params: dict, form: dict) -> str:
+    criteria = []
+    if "max_price" in params:
+        criteria.append(f"under {_money(params['max_price'])}/night")
+    if "amenity" in params:
+        criteria.append(f"with {params['amenity']}")
+    dates = [form.get(k) for k in ("check_in_date", "check_in", "check_out_date", "check_out") if form.get(k)]
+    when = f" for {dates[0]} to {dates[1]}" if len(dates) >= 2 else ""
+    lines = [f"Here are hotels{' ' + ' '.join(criteria) if criteria else ''}{when}:"]
+    for h in results:
+        rooms = sorted(h.get("rooms") or [], key=lambda r: r.get("price") or 0)
+        room_text = ", ".join(f"{r.get('room_type')} {_money(r.get('price'))}" for r in rooms[:3])
+        lines.append(f"- **{h.get('name')}** ({h.get('location')}) — {room_text}")
+    lines.append("Tell me which one you'd like and I'll help you book it.")
+    return "\n".join(lines)
+
+
+def _cabs_text(results: list, params: dict, form: dict) -> str:
+    criteria = []
+    if "vehicle_type" in params:
+        criteria.append(params["vehicle_type"])
+    criteria.append("rides")
+    if "max_price" in params:
+        criteria.append(f"under {_money(params['max_price'])}/day")
+    when = form.get("trip_date") or form.get("pickup_date")
+    lines = [f"Here are {' '.join(criteria)}{f' for {when}' if when else ''}:"]
+    for a in results:
+        vehicles = sorted(a.get("vehicles") or [], key=lambda v: v.get("price") or 0)
+        vehicle_text = ", ".join(f"{v.get('model')} ({v.get('type')}) {_money(v.get('price'))}/day" for v in vehicles[:3])
+        lines.append(f"- **{a.get('name')}** (★{a.get('rating')}) — {vehicle_text}")
+    lines.append("Pick one and I'll help you book it.")
+    return "\n".join(lines)
+
+
+# ─── Router ───────────────────────────────────────────────────────────────────
+
+async def route_request(user_input: str, submitted_data: dict = None, history: dict = None):
+    """
+    The final response dict (same shape as XplorerAI.process_chat) when the turn
+    can be answered from the graph directly, else None to escalate to the LLM.
+    """
+    if not INTENT_ROUTER or not submitted_data:
+        return None
+    try:
+        query_type, params, form = classify(user_input, submitted_data)
+        dropped = (history_filters(history) & FILTERS[query_type]) - params.keys()
+        if dropped:
+            raise _Escalate(f"earlier {', '.join(sorted(dropped))} not in the form")
+        results = await aquery_graph(query_type, params)
+        if isinstance(results, dict) and "error" in results:
+            raise _Escalate(results["error"])
+        if not isinstance(results, list) or not results:
+            raise _Escalate("no results")
+        text = _hotels_text(results, params, form) if query_type == "find_hotels" else _cabs_text(results, params, form)
+    except _Escalate as reason:
+        _stats["escalated"] += 1
+        print(f"🧭 Intent router → LLM ({reason})")
+        return None
+    except Exception as e:
+        _stats["escalated"] += 1
+        print(f"⚠️  Intent router query failed, escalating: {e}")
+        return None
+
+    _stats["routed"] += 1
+    print(f"🧭 Intent router answered {query_type} {params} directly.")
+    return {"text": text, "itinerary": None}
+
+
+def stats() -> dict:
+    total = _stats["routed"] + _stats["escalated"]
+    return {**_stats, "routed_rate": round(_stats["routed"] / total, 4) if total else 0.0}
@@ -1,249 +1,732 @@
 import os
-from neo4j import GraphDatabase
+import re
+import copy
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+import numpy as np
+from neo4j import GraphDatabase, AsyncGraphDatabase
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
+
+from services.cache import LRUCache
+from services.embedding_service import EMBEDDING_MODEL, embedding_service
+from services.road_matrix import RoadTimeMatrix
+from services.vector_index import VectorIndex, SNAPSHOT_QUERY as VECTOR_SNAPSHOT_QUERY
+from services.route_optimizer import optimize_route, sub_matrix
 
 # Load environment variables
 _BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 load_dotenv(dotenv_path=os.path.join(_BACKEND_DIR, ".env"))
 
-driver = GraphDatabase.driver(
-    os.getenv("NEO4J_URI"), 
-    auth=(os.getenv("NEO4J_USER"), os.getenv("NEO4J_PASSWORD"))
-)
+# Connection pool settings shared by both drivers
+_DRIVER_CONFIG = {
+    "max_connection_pool_size": int(os.getenv("NEO4J_MAX_POOL_SIZE", "50")),
+    "connection_acquisition_timeout": float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "10")),
+    "liveness_check_timeout": float(os.getenv("NEO4J_LIVENESS_CHECK_SECS", "30")),
+}
+_NEO4J_AUTH = (os.getenv("NEO4J_USER"), os.getenv("NEO4J_PASSWORD"))
+
+# Async driver — used by the FastAPI app so graph queries never block the event loop
+async_driver = AsyncGraphDatabase.driver(os.getenv("NEO4J_URI"), auth=_NEO4J_AUTH, **_DRIVER_CONFIG)
+
+# Sync driver — kept for scripts (build_graph, test_neo4j*, benchmarks)
+driver = GraphDatabase.driver(os.getenv("NEO4J_URI"), auth=_NEO4J_AUTH, **_DRIVER_CONFIG)
+
+
+async def close_drivers() -> None:
+    """Close both drivers (called on app shutdown)."""
+    await async_driver.close()
+    driver.close()
+
+
+# ─── Query Embedding Cache ────────────────────────────────────────────────────
+# Users (and the LLM, within one conversation) repeat the same vector_search
+# queries, so normalized query text → float32 embedding is kept in an LRU/TTL
+# cache. Set EMBEDDING_CACHE_PATH to a SQLite file to keep warm entries across
+# restarts.
+
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "2048"))
+EMBEDDING_CACHE_TTL_SECS = float(os.getenv("EMBEDDING_CACHE_TTL_SECS", "86400"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")
+
+
+class QueryEmbeddingCache:
+    def __init__(self, maxsize: int, ttl: float, path: str = ""):
+        self.ttl = ttl
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.disk_hits = 0
+        self._db = None
+        self._db_lock = threading.Lock()
+        if path:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                    " key TEXT PRIMARY KEY, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️  Embedding cache disk backing disabled: {e}")
+                self._db = None
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Case/whitespace-insensitive key; MiniLM is uncased so lowercasing is lossless."""
+        return re.sub(r"\s+", " ", text).strip().strip("?.!").strip().lower()
+
+    def _key(self, text: str) -> str:
+        return f"{EMBEDDING_MODEL}:{self.normalize(text)}"
+
+    def _disk_get(self, key: str):
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT vector, created_at FROM query_embeddings WHERE key = ?", (key,)
+            ).fetchone()
+        if row and (not self.ttl or time.time() - row[1] < self.ttl):
+            vector = np.frombuffer(row[0], dtype=np.float32)
+            self.memory.set(key, vector)
+            self.disk_hits += 1
+            return vector
+        return None
+
+    def _disk_put(self, key: str, vector: np.ndarray) -> None:
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (key, vector, created_at) VALUES (?, ?, ?)",
+                    (key, vector.tobytes(), time.time()),
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️  Embedding cache write failed: {e}")
+
+    @staticmethod
+    def _frozen(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        vector.setflags(write=False)   # shared between callers
+        return vector
+
+    def get(self, text: str):
+        key = self._key(text)
+        vector = self.memory.get(key)
+        if vector is None and self._db is not None:
+            vector = self._disk_get(key)
+        return vector
+
+    def set(self, text: str, vector) -> np.ndarray:
+        vector = self._frozen(vector)
+        key = self._key(text)
+        self.memory.set(key, vector)
+        if self._db is not None:
+            self._disk_put(key, vector)
+        return vector
+
+    async def aget(self, text: str):
+        """get() for the event loop — the SQLite tier is read in a worker thread."""
+        key = self._key(text)
+        vector = self.memory.get(key)
+        if vector is None and self._db is not None:
+            vector = await asyncio.to_thread(self._disk_get, key)
+        return vector
+
+    async def aset(self, text: str, vector) -> np.ndarray:
+        """set() for the event loop — the SQLite insert + commit run in a worker thread."""
+        vector = self._frozen(vector)
+        key = self._key(text)
+        self.memory.set(key, vector)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_put, key, vector)
+        return vector
+
+    def stats(self) -> dict:
+        return {**self.memory.stats(), "disk_hits": self.disk_hits, "disk_backed": self._db is not None}
+
+
+embedding_cache = QueryEmbeddingCache(EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_TTL_SECS, EMBEDDING_CACHE_PATH)
+
+
+def embed_query(text: str) -> np.ndarray:
+    """float32 embedding for a search query, served from the cache when possible."""
+    vector = embedding_cache.get(text)
+    if vector is None:
+        vector = embedding_cache.set(text, embedding_service.encode(embedding_cache.normalize(text)))
+    return vector
+
+
+async def aembed_query(text: str) -> np.ndarray:
+    """Async embed_query — cache misses are micro-batched on the embedding worker."""
+    vector = await embedding_cache.aget(text)
+    if vector is None:
+        encoded = await embedding_service.aencode(embedding_cache.normalize(text))
+        vector = await embedding_cache.aset(text, encoded)
+    return vector
+
+
+# ─── Graph Version & Snapshots ────────────────────────────────────────────────
+
+# build_graph.py stamps (:GraphMeta {key: 'xplorer'}) with a new version on every run.
+GRAPH_VERSION_CHECK_SECS = float(os.getenv("GRAPH_VERSION_CHECK_SECS", "60"))
+_GRAPH_VERSION_QUERY = "MATCH (m:GraphMeta {key: 'xplorer'}) RETURN m.version AS version"
+
+_graph_version = None
+_graph_version_checked_at = 0.0
+
+
+def _version_check_due(force: bool) -> bool:
+    return force or time.monotonic() - _graph_version_checked_at >= GRAPH_VERSION_CHECK_SECS
+
+
+def _set_graph_version(record) -> None:
+    global _graph_version, _graph_version_checked_at
+    _graph_version = record["version"] if record else None
+    _graph_version_checked_at = time.monotonic()
+
+
+def get_graph_version(force: bool = False):
+    """
+    Current graph version stamp (None for graphs built before stamping existed).
+    Re-read from Neo4j at most every GRAPH_VERSION_CHECK_SECS.
+    """
+    global _graph_version_checked_at
+    if _version_check_due(force):
+        try:
+            with driver.session() as session:
+                _set_graph_version(session.run(_GRAPH_VERSION_QUERY).single())
+        except Exception as e:
+            print(f"⚠️  Graph version check failed: {e}")
+            _graph_version_checked_at = time.monotonic()
+    return _graph_version
+
+
+async def aget_graph_version(force: bool = False):
+    """Async variant of get_graph_version."""
+    global _graph_version_checked_at
+    if _version_check_due(force):
+        try:
+            async with async_driver.session() as session:
+                res = await session.run(_GRAPH_VERSION_QUERY)
+                _set_graph_version(await res.single())
+        except Exception as e:
+            print(f"⚠️  Graph version check failed: {e}")
+            _graph_version_checked_at = time.monotonic()
+    return _graph_version
+
+
+class GraphSnapshot:
+    """
+    A process-wide value derived from static graph data, built once by
+    `loader(session, version)` and rebuilt only when the graph version changes.
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.value = None
+        self.version = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            version = get_graph_version(force=True)
+            with driver.session() as session:
+                self.value = self.loader(session, version)
+            self.version = version
+            return self.value
+
+    def get(self):
+        if self.value is None or self.version != get_graph_version():
+            return self.load()
+        return self.value
+
+    async def aget(self):
+        """Async get — the rare rebuild runs in a worker thread."""
+        if self.value is None or self.version != await aget_graph_version():
+            return await asyncio.to_thread(self.load)
+        return self.value
+
+
+def _load_road_matrix(session, version) -> RoadTimeMatrix:
+    """Read every road edge once and build the road-time matrix."""
+    res = session.run("""
+        MATCH (n)-[r:CONNECTED_TO|NEARBY_PLACE]->(m)
+        WHERE r.road_time_mins IS NOT NULL
+        RETURN n.name AS from_node, m.name AS to_node, r.road_time_mins AS road_time
+    """)
+    edges = [(rec["from_node"], rec["to_node"], rec["road_time"]) for rec in res]
+    matrix = RoadTimeMatrix.from_edges(edges, version)
+    print(f"🗺️  Road-time matrix loaded: {len(matrix)} nodes, {len(edges)} edges (graph version {version}).")
+    return matrix
+
+
+def _load_vector_index(session, version) -> VectorIndex:
+    """Snapshot every Place/Hotel embedding into the in-process vector index."""
+    index = VectorIndex.from_records(session.run(VECTOR_SNAPSHOT_QUERY).data(), version)
+    print(f"🧭 Vector index loaded: {len(index)} embeddings (graph version {version}).")
+    return index
+
+
+road_matrix_snapshot = GraphSnapshot(_load_road_matrix)
+vector_index_snapshot = GraphSnapshot(_load_vector_index)
+
+
+def load_road_matrix() -> RoadTimeMatrix:
+    """(Re)build the process-wide road-time matrix now."""
+    return road_matrix_snapshot.load()
+
+
+def get_road_matrix() -> RoadTimeMatrix:
+    """Cached road-time matrix; reloaded only when the graph version changes."""
+    return road_matrix_snapshot.get()
+
+
+async def aget_road_matrix() -> RoadTimeMatrix:
+    """Async variant of get_road_matrix."""
+    return await road_matrix_snapshot.aget()
+
+
+def load_vector_index() -> VectorIndex:
+    """(Re)build the process-wide vector index now."""
+    return vector_index_snapshot.load()
+
+
+# ─── Tool Queries ─────────────────────────────────────────────────────────────
+# Each query_type is planned once as a list of (cypher, params) statements plus a
+# function combining their rows, then executed by the sync or async runner.
+
+def _plan_query(query_type, params, embedding=None):
+    if query_type == "find_places":
+        # Find places matching user interests (Graph Search)
+        statements = [("""
+            MATCH (p:Place) WHERE p.category IN $interests
+            RETURN p LIMIT 5
+        """, {"interests": params.get('interests', [])})]
+        return statements, lambda rows: [record['p'] for record in rows[0]]
+
+    elif query_type == "vector_search":
+        # Semantic Search (Vector RAG) — fallback when the local vector index is unavailable
+        statements = [
+            # Search Places
+            ("""
+                CALL db.index.vector.queryNodes('place_desc_index', 5, $embedding)
+                YIELD node, score
+                RETURN node.name AS name, node.category AS category, node.description AS description, score
+            """, {"embedding": embedding}),
+            # Search Hotels
+            ("""
+                CALL db.index.vector.queryNodes('hotel_desc_index', 3, $embedding)
+                YIELD node, score
+                RETURN node.name AS name, 'hotel' AS category, node.description AS description, score
+            """, {"embedding": embedding}),
+        ]
+
+        def combine(rows):
+            results = rows[0] + rows[1]
+            # Sort by score descending
+            results.sort(key=lambda x: x['score'], reverse=True)
+            return results
+        return statements, combine
+
+    elif query_type == "find_hotels":
+        # Find hotels, optionally filter by max price or amenities
+        max_price = params.get('max_price', 100000)
+        amenity = params.get('amenity', None)
+
+        query = """
+            MATCH (h:Hotel)-[:HAS_ROOM]->(r:Room)
+            WHERE r.price <= $max_price
+        """
+        if amenity:
+            query += " AND $amenity IN r.amenities "
+
+        query += " RETURN h.id AS hotel_id, h.name AS name, h.location AS location, h.description AS description, collect({room_type: r.type, price: r.price, amenities: r.amenities}) AS rooms LIMIT 5"
+        return [(query, {"max_price": max_price, "amenity": amenity})], lambda rows: rows[0]
+
+    elif query_type == "find_cabs":
+        # Find transport agencies and their vehicles
+        max_price = params.get('max_price', 100000)
+        vehicle_type = params.get('vehicle_type', None) # e.g., Sedan, SUV
+
+        query = """
+            MATCH (a:Agency)-[:OWNS_VEHICLE]->(v:Vehicle)
+            WHERE v.price <= $max_price
+        """
+        if vehicle_type:
+            query += " AND v.type = $vehicle_type "
+
+        query += " RETURN a.id AS agency_id, a.name AS name, a.rating AS rating, collect({vehicle_id: v.id, model: v.model, type: v.type, price: v.price}) AS vehicles LIMIT 5"
+        return [(query, {"max_price": max_price, "vehicle_type": vehicle_type})], lambda rows: rows[0]
+
+    elif query_type == "calculate_itinerary":
+        # Use the Road Time logic from the previous prompt
+        statements = [("""
+            MATCH (h:Hotel)-[r1:NEARBY_PLACE]->(p1:Place)
+            MATCH (p1)-[r2:CONNECTED_TO]->(p2:Place)
+            RETURN p1.name AS place1, p2.name AS place2, (r1.road_time_mins + r2.road_time_mins) as total_time
+            ORDER BY total_time ASC LIMIT 1
+        """, {})]
+        return statements, lambda rows: rows[0][0] if rows[0] else None
+
+    return None, None
+
+
+def _query_error(e: Exception) -> dict:
+    print(f"⚠️  Neo4j query failed: {e}")
+    return {"error": f"Database temporarily unavailable. The AI will use its own knowledge instead. ({type(e).__name__})"}
+
+
+# Results per label for vector_search — same k as the Neo4j queryNodes calls
+VECTOR_SEARCH_K = {"Place": 5, "Hotel": 3}
+
+# ─── Query Result Cache ───────────────────────────────────────────────────────
+# These query types are pure functions of their params and the graph contents,
+# and the LLM issues identical calls across users. Results are cached per graph
+# version, and concurrent identical calls share one in-flight Neo4j query.
+
+CACHEABLE_QUERY_TYPES = {"find_places", "find_hotels", "find_cabs", "calculate_itinerary"}
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+QUERY_CACHE_TTL_SECS = float(os.getenv("QUERY_CACHE_TTL_SECS", "3600"))
+
+query_cache = LRUCache(maxsize=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL_SECS)
+_inflight_queries = {}          # cache key -> asyncio.Task
+_coalesced_queries = 0
+_MISSING = object()
+
+
+def _canonical(value):
+    """Order-insensitive, type-stable form of tool params (IN-lists sorted, 5000.0 == 5000)."""
+    if isinstance(value, dict):
+        return {k: _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        items = [_canonical(v) for v in value]
+        return sorted(items, key=lambda v: json.dumps(v, sort_keys=True, default=str))
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _query_cache_key(query_type, params, version):
+    """Key on the Cypher args actually sent, so defaults and ignored params collapse together."""
+    try:
+        statements, _ = _plan_query(query_type, params)
+        args = [_canonical(a) for _, a in statements]
+        return (version, query_type, json.dumps(args, sort_keys=True, default=str))
+    except Exception:
+        return None   # Malformed params — let the uncached path report the error
+
+
+def _is_cacheable_result(result) -> bool:
+    return not (isinstance(result, dict) and "error" in result)
+
+
+def query_cache_stats() -> dict:
+    return {**query_cache.stats(), "coalesced": _coalesced_queries, "in_flight": len(_inflight_queries)}
 
-# Initialize embedding model lazily
-_encoder = None
-def get_encoder():
-    global _encoder
-    if _encoder is None:
-        print("Loading SentenceTransformer model...")
-        _encoder = SentenceTransformer('all-MiniLM-L6-v2')
-    return _encoder
 
 def query_graph(query_type, params):
+    """Blocking entry point for scripts. The API uses aquery_graph."""
+    if query_type not in CACHEABLE_QUERY_TYPES:
+        return _run_query(query_type, params)
+
+    key = _query_cache_key(query_type, params, get_graph_version())
+    if key is None:
+        return _run_query(query_type, params)
+    result = query_cache.get(key, _MISSING)
+    if result is _MISSING:
+        result = _run_query(query_type, params)
+        if _is_cacheable_result(result):
+            query_cache.set(key, result)
+    return copy.deepcopy(result)
+
+
+async def aquery_graph(query_type, params):
+    """Non-blocking query_graph for the FastAPI event loop."""
+    global _coalesced_queries
+    if query_type not in CACHEABLE_QUERY_TYPES:
+        return await _arun_query(query_type, params)
+
+    key = _query_cache_key(query_type, params, await aget_graph_version())
+    if key is None:
+        return await _arun_query(query_type, params)
+    result = query_cache.get(key, _MISSING)
+    if result is not _MISSING:
+        return copy.deepcopy(result)
+
+    task = _inflight_queries.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_arun_query(query_type, params))
+        _inflight_queries[key] = task
+
+        def _store(done, key=key):
+            _inflight_queries.pop(key, None)
+            if not done.cancelled() and done.exception() is None and _is_cacheable_result(done.result()):
+                query_cache.set(key, done.result())
+        task.add_done_callback(_store)
+    else:
+        _coalesced_queries += 1
+
+    # shield: one caller disconnecting must not cancel the query the others are waiting on
+    return copy.deepcopy(await asyncio.shield(task))
+
+
+def _run_query(query_type, params):
     try:
+        embedding = None
+        if query_type == "vector_search":
+            user_query = params.get('query', '')
+            if not user_query: return []
+            vector = embed_query(user_query)
+            try:
+                return vector_index_snapshot.get().search(vector, VECTOR_SEARCH_K)
+            except Exception as e:
+                print(f"⚠️  Local vector index unavailable, falling back to Neo4j: {e}")
+            embedding = vector.tolist()
+
+        statements, combine = _plan_query(query_type, params, embedding)
+        if statements is None:
+            return None
+
         with driver.session() as session:
-            if query_type == "find_places":
-                # Find places matching user interests (Graph Search)
-                res = session.run("""
-                    MATCH (p:Place) WHERE p.category IN $interests 
-                    RETURN p LIMIT 5
-                """, {"interests": params.get('interests', [])})
-                return [dict(record['p']) for record in res]
-            
-            elif query_type == "vector_search":
-                # Semantic Search (Vector RAG)
-                user_query = params.get('query', '')
-                if not user_query: return []
-                
-                embedding = get_encoder().encode(user_query).tolist()
-                
-                # Search Places
-                place_res = session.run("""
-                    CALL db.index.vector.queryNodes('place_desc_index', 5, $embedding)
-                    YIELD node, score
-                    RETURN node.name AS name, node.category AS category, node.description AS description, score
-                """, {"embedding": embedding})
-                
-                # Search Hotels
-                hotel_res = session.run("""
-                    CALL db.index.vector.queryNodes('hotel_desc_index', 3, $embedding)
-                    YIELD node, score
-                    RETURN node.name AS name, 'hotel' AS category, node.description AS description, score
-                """, {"embedding": embedding})
-                
-                results = [record.data() for record in place_res] + [record.data() for record in hotel_res]
-                # Sort by score descending
-                results.sort(key=lambda x: x['score'], reverse=True)
-                return results
-
-            elif query_type == "find_hotels":
-                # Find hotels, optionally filter by max price or amenities
-                max_price = params.get('max_price', 100000)
-                amenity = params.get('amenity', None)
-                
-                query = """
-                    MATCH (h:Hotel)-[:HAS_ROOM]->(r:Room)
-                    WHERE r.price <= $max_price
-                """
-                if amenity:
-                    query += " AND $amenity IN r.amenities "
-                
-                query += " RETURN h.id AS hotel_id, h.name AS name, h.location AS location, h.description AS description, collect({room_type: r.type, price: r.price, amenities: r.amenities}) AS rooms LIMIT 5"
-                
-                res = session.run(query, {"max_price": max_price, "amenity": amenity})
-                return [record.data() for record in res]
-                
-            elif query_type == "find_cabs":
-                # Find transport agencies and their vehicles
-                max_price = params.get('max_price', 100000)
-                vehicle_type = params.get('vehicle_type', None) # e.g., Sedan, SUV
-                
-                query = """
-                    MATCH (a:Agency)-[:OWNS_VEHICLE]->(v:Vehicle)
-                    WHERE v.price <= $max_price
-                """
-                if vehicle_type:
-                    query += " AND v.type = $vehicle_type "
-                
-                query += " RETURN a.id AS agency_id, a.name AS name, a.rating AS rating, collect({vehicle_id: v.id, model: v.model, type: v.type, price: v.price}) AS vehicles LIMIT 5"
-                
-                res = session.run(query, {"max_price": max_price, "vehicle_type": vehicle_type})
-                return [record.data() for record in res]
-
-            elif query_type == "calculate_itinerary":
-                # Use the Road Time logic from the previous prompt
-                res = session.run("""
-                    MATCH (h:Hotel)-[r1:NEARBY_PLACE]->(p1:Place)
-                    MATCH (p1)-[r2:CONNECTED_TO]->(p2:Place)
-                    RETURN p1.name AS place1, p2.name AS place2, (r1.road_time_mins + r2.road_time_mins) as total_time
-                    ORDER BY total_time ASC LIMIT 1
-                """)
-                record = res.single()
-                return record.data() if record else None
-                
-        return None
+            rows = [session.run(cypher, args).data() for cypher, args in statements]
+        return combine(rows)
     except Exception as e:
-        print(f"⚠️  Neo4j query failed: {e}")
-        return {"error": f"Database temporarily unavailable. The AI will use its own knowledge instead. ({type(e).__name__})"}
+        return _query_error(e)
+
+
+async def _arun_query(query_type, params):
+    try:
+        embedding = None
+        if query_type == "vector_search":
+            user_query = params.get('query', '')
+            if not user_query: return []
+            vector = await aembed_query(user_query)
+            try:
+                # Fast path: both label sets from one in-process matmul, no round-trips
+                return (await vector_index_snapshot.aget()).search(vector, VECTOR_SEARCH_K)
+            except Exception as e:
+                print(f"⚠️  Local vector index unavailable, falling back to Neo4j: {e}")
+            embedding = vector.tolist()
+
+        statements, combine = _plan_query(query_type, params, embedding)
+        if statements is None:
+            return None
+
+        rows = []
+        async with async_driver.session() as session:
+            for cypher, args in statements:
+                res = await session.run(cypher, args)
+                rows.append(await res.data())
+        return combine(rows)
+    except Exception as e:
+        return _query_error(e)
+
+
+# ─── Trip Planner ─────────────────────────────────────────────────────────────
+
+# Places + the hotel (with rooms) in one round-trip
+_ROUTE_DETAILS_QUERY = """
+    CALL {
+        MATCH (p:Place) WHERE toLower(p.name) IN $names
+        RETURN collect({name: p.name, category: p.category,
+                        description: p.description, location: p.area,
+                        lat: p.lat, lng: p.lon,
+                        rating: p.rating}) AS places
+    }
+    CALL {
+        MATCH (h:Hotel)-[:HAS_ROOM]->(r:Room)
+        WHERE toLower(h.name) = toLower($hotel)
+        WITH h, collect({room_type: r.type, price: r.price, amenities: r.amenities}) AS rooms
+        RETURN collect({name: h.name, location: h.area, description: h.description,
+                        lat: h.lat, lng: h.lon, rooms: rooms}) AS hotels
+    }
+    RETURN places, hotels
+"""
+
+_TRANSPORT_SNAPSHOT_QUERY = """
+    MATCH (a:Agency)-[:OWNS_VEHICLE]->(v:Vehicle)
+    RETURN a.name AS agency, v.model AS model, v.type AS type, v.price AS price
+    ORDER BY v.price ASC LIMIT 5
+"""
+
+_transport_snapshot = None   # (graph_version, [options])
+
+
+def get_transport_options() -> list:
+    """Cheapest 5 vehicles — input-independent, so memoized per graph version."""
+    global _transport_snapshot
+    version = get_graph_version()
+    if _transport_snapshot is None or _transport_snapshot[0] != version:
+        with driver.session() as session:
+            res = session.run(_TRANSPORT_SNAPSHOT_QUERY)
+            _transport_snapshot = (version, [record.data() for record in res])
+    return [dict(option) for option in _transport_snapshot[1]]
+
+
+async def aget_transport_options() -> list:
+    """Async variant of get_transport_options."""
+    global _transport_snapshot
+    version = await aget_graph_version()
+    if _transport_snapshot is None or _transport_snapshot[0] != version:
+        async with async_driver.session() as session:
+            res = await session.run(_TRANSPORT_SNAPSHOT_QUERY)
+            _transport_snapshot = (version, await res.data())
+    return [dict(option) for option in _transport_snapshot[1]]
+
+
+def _normalize_trip(input_data: list, hotel_name: str, is_multiday: bool):
+    """Returns (days_list, hotel_name, all_unique_names)."""
+    days_list = input_data if is_multiday else [input_data]
+    hotel_name = hotel_name.strip() if hotel_name else None
+
+    all_unique_names = set()
+    if hotel_name: all_unique_names.add(hotel_name)
+    for day in days_list:
+        for p in day:
+            if p: all_unique_names.add(p.strip())
+    return days_list, hotel_name, all_unique_names
+
+
+def _minutes(t: float):
+    """Road time as the API has always reported it: int for whole minutes (the graph's usual values)."""
+    return int(t) if float(t).is_integer() else t
+
+
+def _optimize_days(days_list: list, hotel_name: str, stop_names: list, road_times: RoadTimeMatrix):
+    """Solve every day on one dense road-time matrix. Returns (days, total_time)."""
+    stop_index = {name: k for k, name in enumerate(stop_names)}
+    road_matrix = road_times.dense(stop_names)
+
+    optimized_days = []
+    total_time = 0
+
+    for i, day_places in enumerate(days_list):
+        day_places = [p.strip() for p in day_places if p and p.strip()]
+        if not day_places: continue
+
+        # Start/End at hotel if available
+        start = hotel_name if hotel_name else day_places[0]
+        stops = [start] + [p for p in dict.fromkeys(day_places) if p != start]
+        closed = bool(hotel_name) and len(stops) > 1
+
+        matrix = sub_matrix(road_matrix, [stop_index[s] for s in stops])
+        solution = optimize_route(matrix, closed=closed)
+
+        day_route = [stops[idx] for idx in solution["route"]]
+        day_legs = []
+        for a, b in zip(solution["route"], solution["route"][1:]):
+            t = matrix[a][b]
+            day_legs.append({"from": stops[a], "to": stops[b], "road_time_mins": _minutes(t)})
+            total_time += t
+
+        baseline = solution["baseline_cost"]
+        optimized_days.append({
+            "day_number": i + 1,
+            "route": day_route,
+            "legs": day_legs,
+            "optimization": {
+                "solver": solution["solver"],
+                "optimal": solution["optimal"],
+                "road_time_mins": round(solution["cost"], 2),
+                "baseline_road_time_mins": round(baseline, 2),
+                "improvement_pct": round(100 * (baseline - solution["cost"]) / baseline, 2) if baseline else 0.0,
+                "solve_time_ms": solution["solve_time_ms"],
+            },
+        })
+
+    return optimized_days, _minutes(round(total_time, 2))
+
+
+def _route_details(record, all_unique_names: set, hotel_name: str):
+    """Turn the consolidated details record into (places_detail, hotels_detail) with fallbacks."""
+    places_detail = list(record["places"]) if record else []
+
+    # Map lng to lon for frontend consistency if needed
+    for p in places_detail:
+        if 'lng' not in p and 'lon' in p: p['lng'] = p['lon']
+
+    # Fill missing places
+    found_names = {p['name'].lower() for p in places_detail}
+    for name in all_unique_names:
+        if name.lower() not in found_names and (not hotel_name or name.lower() != hotel_name.lower()):
+            places_detail.append({
+                "name": name, "category": "Point of Interest", "description": "Local spot",
+                "location": "Chennai", "lat": 13.0827, "lng": 80.2707
+            })
+
+    # Hotel Details
+    hotels_detail = []
+    if hotel_name:
+        hotels_detail = list(record["hotels"]) if record else []
+        if hotels_detail:
+            for h_det in hotels_detail: # Ensure all hotel details have 'lng'
+                if 'lng' not in h_det and 'lon' in h_det: h_det['lng'] = h_det['lon']
+        else:
+            hotels_detail = [{"name": hotel_name, "location": "Chennai", "lat": 13.0827, "lng": 80.2707, "rooms": []}]
+
+    return places_detail, hotels_detail
+
+
+def _route_response(optimized_days, total_time, places_detail, hotels_detail, transport_options) -> dict:
+    return {
+        "days": optimized_days,
+        "total_road_time_mins": total_time,
+        "places_detail": places_detail,
+        "hotels_detail": hotels_detail,
+        "transport_options": transport_options,
+        # For backward compatibility
+        "ordered_route": optimized_days[0]["route"] if optimized_days and optimized_days[0]["route"] else [],
+        "legs": optimized_days[0]["legs"] if optimized_days and optimized_days[0]["legs"] else []
+    }
 
 
 def calculate_optimal_route(input_data: list, hotel_name: str = None, is_multiday: bool = False):
     """
-    Optimizes travel routes. 
+    Optimizes travel routes.
     If is_multiday is True, input_data is List[List[str]] (places per day).
     Otherwise, it's a flat List[str].
+    Blocking entry point for scripts — the API uses acalculate_optimal_route.
     """
     try:
         # 1. Normalize Structure
-        days_list = input_data if is_multiday else [input_data]
-        hotel_name = hotel_name.strip() if hotel_name else None
-        
-        all_unique_names = set()
-        if hotel_name: all_unique_names.add(hotel_name)
-        for day in days_list:
-            for p in day: 
-                if p: all_unique_names.add(p.strip())
-        
+        days_list, hotel_name, all_unique_names = _normalize_trip(input_data, hotel_name, is_multiday)
         lower_names = [n.lower() for n in all_unique_names]
 
+        # 2 + 3. Optimize each day on the in-process road-time matrix — no edge queries
+        optimized_days, total_time = _optimize_days(
+            days_list, hotel_name, list(all_unique_names), get_road_matrix()
+        )
+
+        # 4. Fetch Details for UI (places + hotel in one read; transport is memoized)
         with driver.session() as session:
-            # 2. Pre-fetch All Road Times (Case-Insensitive)
-            edges_result = session.run("""
-                MATCH (n)-[r]-(m)
-                WHERE type(r) IN ['CONNECTED_TO', 'NEARBY_PLACE']
-                AND toLower(n.name) IN $names AND toLower(m.name) IN $names
-                RETURN n.name AS from_node, m.name AS to_node, r.road_time_mins AS road_time
-            """, {"names": lower_names})
-            
-            edges = {}
-            for record in edges_result:
-                edges[(record["from_node"], record["to_node"])] = record["road_time"]
-                edges[(record["to_node"], record["from_node"])] = record["road_time"]
-
-            # 3. Optimize Each Day
-            optimized_days = []
-            total_time = 0
-            
-            for i, day_places in enumerate(days_list):
-                day_places = [p.strip() for p in day_places if p and p.strip()]
-                if not day_places: continue
-                
-                # Start/End at hotel if available
-                start = hotel_name if hotel_name else day_places[0]
-                unvisited = set(day_places)
-                if start in unvisited: unvisited.remove(start)
-                
-                day_route = [start]
-                day_legs = []
-                current = start
-                
-                while unvisited:
-                    best = None
-                    best_time = float('inf')
-                    for place in unvisited:
-                        t = edges.get((current, place), 30)
-                        if t < best_time:
-                            best_time = t
-                            best = place
-                    
-                    if best:
-                        day_legs.append({"from": current, "to": best, "road_time_mins": best_time})
-                        total_time += best_time
-                        day_route.append(best)
-                        unvisited.remove(best)
-                        current = best
-                    else: break
-                
-                # Return to hotel at end of day
-                if hotel_name and day_route[-1] != hotel_name:
-                    t = edges.get((current, hotel_name), 30)
-                    day_legs.append({"from": current, "to": hotel_name, "road_time_mins": t})
-                    total_time += t
-                    day_route.append(hotel_name)
-                
-                optimized_days.append({
-                    "day_number": i + 1,
-                    "route": day_route,
-                    "legs": day_legs
-                })
-
-            # 4. Fetch Details for UI
-            places_result = session.run("""
-                MATCH (p:Place) WHERE toLower(p.name) IN $names
-                RETURN p.name AS name, p.category AS category, 
-                       p.description AS description, p.area AS location,
-                       p.lat AS lat, p.lon AS lng,
-                       p.rating AS rating
-            """, {"names": lower_names})
-            places_detail = [record.data() for record in places_result]
-            
-            # Map lng to lon for frontend consistency if needed
-            for p in places_detail:
-                if 'lng' not in p and 'lon' in p: p['lng'] = p['lon']
-
-            # Fill missing places
-            found_names = {p['name'].lower() for p in places_detail}
-            for name in all_unique_names:
-                if name.lower() not in found_names and (not hotel_name or name.lower() != hotel_name.lower()):
-                    places_detail.append({
-                        "name": name, "category": "Point of Interest", "description": "Local spot",
-                        "location": "Chennai", "lat": 13.0827, "lng": 80.2707
-                    })
-
-            # Hotel Details
-            hotels_detail = []
-            if hotel_name:
-                hotel_result = session.run("""
-                    MATCH (h:Hotel)-[:HAS_ROOM]->(r:Room)
-                    WHERE ($hotel IS NULL AND h.name IS NULL) OR (toLower(h.name) = toLower($hotel))
-                    RETURN h.name AS name, h.area AS location, h.description AS description,
-                           h.lat AS lat, h.lon AS lng,
-                           collect({room_type: r.type, price: r.price, amenities: r.amenities}) AS rooms
-                """, {"hotel": hotel_name})
-                hotels_detail = [record.data() for record in hotel_result]
-                if hotels_detail:
-                    for h_det in hotels_detail: # Ensure all hotel details have 'lng'
-                        if 'lng' not in h_det and 'lon' in h_det: h_det['lng'] = h_det['lon']
-                else:
-                    hotels_detail = [{"name": hotel_name, "location": "Chennai", "lat": 13.0827, "lng": 80.2707, "rooms": []}]
-
-            # Transport
-            transport_result = session.run("MATCH (a:Agency)-[:OWNS_VEHICLE]->(v:Vehicle) RETURN a.name AS agency, v.model AS model, v.type AS type, v.price AS price ORDER BY v.price ASC LIMIT 5")
-            transport_options = [record.data() for record in transport_result]
-
-            return {
-                "days": optimized_days,
-                "total_road_time_mins": total_time,
-                "places_detail": places_detail,
-                "hotels_detail": hotels_detail,
-                "transport_options": transport_options,
-                # For backward compatibility
-                "ordered_route": optimized_days[0]["route"] if optimized_days and optimized_days[0]["route"] else [],
-                "legs": optimized_days[0]["legs"] if optimized_days and optimized_days[0]["legs"] else []
-            }
+            record = session.run(_ROUTE_DETAILS_QUERY, {"names": lower_names, "hotel": hotel_name}).single()
+        places_detail, hotels_detail = _route_details(record, all_unique_names, hotel_name)
+
+        return _route_response(optimized_days, total_time, places_detail, hotels_detail, get_transport_options())
+
+    except Exception as e:
+        print(f"⚠️  Route optimization failed: {e}")
+        return {"error": str(e)}
+
+
+async def acalculate_optimal_route(input_data: list, hotel_name: str = None, is_multiday: bool = False):
+    """Non-blocking calculate_optimal_route for the FastAPI event loop."""
+    try:
+        days_list, hotel_name, all_unique_names = _normalize_trip(input_data, hotel_name, is_multiday)
+        lower_names = [n.lower() for n in all_unique_names]
+
+        # Solver work is CPU-bound (Held-Karp / local search) — run it in a worker thread
+        road_times = await aget_road_matrix()
+        optimized_days, total_time = await asyncio.to_thread(
+            _optimize_days, days_list, hotel_name, list(all_unique_names), road_times
+        )
+
+        async with async_driver.session() as session:
+            res = await session.run(_ROUTE_DETAILS_QUERY, {"names": lower_names, "hotel": hotel_name})
+            record = await res.single()
+        places_detail, hotels_detail = _route_details(record, all_unique_names, hotel_name)
+
+        return _route_response(optimized_days, total_time, places_detail, hotels_detail, await aget_transport_options())
 
     except Exception as e:
         print(f"⚠️  Route optimization failed: {e}")
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
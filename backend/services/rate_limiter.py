@@ -0,0 +1,60 @@
+"""
+services/rate_limiter.py
+------------------------
+Async token bucket used to pace calls to rate-limited APIs (Gemini).
+
+Tokens refill continuously at `rate_per_minute`; up to `burst` calls may go
+out back-to-back. A rate of 0 means no client-side limit. When the API still
+answers 429, `pause()` holds every caller until the server's retry delay has
+passed.
+"""
+
+import time
+import asyncio
+
+
+class AsyncTokenBucket:
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.rate = rate_per_minute / 60.0       # tokens per second
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.waits = 0
+        self._lock = None
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a call may be made. Waiters are served first-come, first-served."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.paused_until - now
+                if wait <= 0:
+                    if self.rate <= 0:
+                        return
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                self.waits += 1
+                await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Server-side rate limit hit: stop everyone for `seconds` and drain the bucket."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "rate_per_minute": round(self.rate * 60, 2) if self.rate > 0 else "unlimited",
+            "burst": self.capacity,
+            "tokens": round(min(self.capacity, self.tokens + (time.monotonic() - self.updated) * self.rate), 2),
+            "waits": self.waits,
+        }
@@ -0,0 +1,80 @@
+"""
+services/road_matrix.py
+-----------------------
+Process-wide road-time matrix for the trip planner.
+
+`CONNECTED_TO` / `NEARBY_PLACE` road times only change when `build_graph.py`
+is re-run, so they are read from Neo4j once, interned as
+lower-cased name → index, and kept in a compact float32 matrix.
+Missing edges are stored as NaN.
+
+The matrix is tagged with the graph version stamp written by the builder
+(see `neo4j_service.get_graph_version`) so a rebuild invalidates it.
+"""
+
+import numpy as np
+
+from services.route_optimizer import DEFAULT_ROAD_TIME
+
+
+class RoadTimeMatrix:
+    def __init__(self, names: list, matrix: np.ndarray, version: str = None):
+        self.names = names
+        self.index = {name.lower(): k for k, name in enumerate(names)}
+        self.matrix = matrix
+        self.version = version
+
+    @classmethod
+    def from_edges(cls, edges, version: str = None) -> "RoadTimeMatrix":
+        """
+        Build from an iterable of (from_name, to_name, road_time_mins).
+        Edges are treated as undirected; duplicate pairs keep the fastest time.
+        """
+        names, index, triples = [], {}, []
+        for a, b, t in edges:
+            if not a or not b or t is None:
+                continue
+            for name in (a, b):
+                if name.lower() not in index:
+                    index[name.lower()] = len(names)
+                    names.append(name)
+            triples.append((index[a.lower()], index[b.lower()], float(t)))
+
+        n = len(names)
+        matrix = np.full((n, n), np.nan, dtype=np.float32)
+        if n:
+            np.fill_diagonal(matrix, 0.0)
+        for i, j, t in triples:
+            if np.isnan(matrix[i, j]) or t < matrix[i, j]:
+                matrix[i, j] = t
+                matrix[j, i] = t
+        return cls(names, matrix, version)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def road_time(self, a: str, b: str):
+        """Road time in minutes between two names, or None if there is no edge."""
+        i, j = self.index.get(a.lower()), self.index.get(b.lower())
+        if i is None or j is None:
+            return None
+        t = self.matrix[i, j]
+        return None if np.isnan(t) else float(t)
+
+    def dense(self, names: list, default: float = DEFAULT_ROAD_TIME) -> list:
+        """
+        Dense n×n matrix (list of lists) for `names`, in that order.
+        Unknown names and missing edges fall back to `default`.
+        Values are rounded to 0.01 min so float32 noise never reaches the API.
+        """
+        n = len(names)
+        idx = np.array([self.index.get(name.lower(), -1) for name in names], dtype=np.int64)
+        known = idx >= 0
+
+        out = np.full((n, n), default, dtype=np.float32)
+        if known.any():
+            rows = np.flatnonzero(known)
+            sub = self.matrix[np.ix_(idx[known], idx[known])]
+            out[np.ix_(rows, rows)] = np.where(np.isnan(sub), default, sub)
+        np.fill_diagonal(out, 0.0)
+        return np.round(out.astype(np.float64), 2).tolist()
@@ -0,0 +1,217 @@
+"""
+services/route_optimizer.py
+---------------------------
+Small TSP engine used by the trip planner (`calculate_optimal_route`).
+
+Every day of a trip is solved on a dense road-time matrix where node 0 is the
+fixed start (the hotel, or the first place when no hotel is given):
+  - Up to HELD_KARP_MAX_STOPS stops  → exact Held-Karp dynamic programme.
+  - Larger days                      → nearest neighbour, then 2-opt and
+                                       Or-opt local search under a time budget.
+
+Closed tours return to node 0 at the end of the day (hotel round trip);
+open tours end wherever the last stop is.
+Pure Python, no database access — callers build the matrix
+(see `RoadTimeMatrix.dense` in services/road_matrix.py).
+"""
+
+import os
+import time
+
+DEFAULT_ROAD_TIME = 30            # minutes assumed when two stops have no road edge
+HELD_KARP_MAX_STOPS = 10          # 2^10 * 10^2 ≈ 100k DP steps — ~20 ms in CPython
+DEFAULT_TIME_BUDGET_MS = float(os.getenv("ROUTE_OPT_TIME_BUDGET_MS", "50"))
+
+_EPS = 1e-9
+
+
+# ─── Matrix ───────────────────────────────────────────────────────────────────
+
+def sub_matrix(matrix: list, indices: list) -> list:
+    """Slice the rows/columns `indices` out of a larger matrix, in that order."""
+    return [[matrix[a][b] for b in indices] for a in indices]
+
+
+def route_cost(route: list, matrix: list) -> float:
+    """Total travel time of visiting `route` in order."""
+    return sum(matrix[route[k]][route[k + 1]] for k in range(len(route) - 1))
+
+
+# ─── Construction ─────────────────────────────────────────────────────────────
+
+def nearest_neighbour(matrix: list, closed: bool = False) -> list:
+    """Greedy tour from node 0. Closed tours end with a trailing 0."""
+    n = len(matrix)
+    route = [0]
+    unvisited = set(range(1, n))
+    current = 0
+    while unvisited:
+        nxt = min(unvisited, key=lambda j: (matrix[current][j], j))
+        route.append(nxt)
+        unvisited.remove(nxt)
+        current = nxt
+    if closed and n > 1:
+        route.append(0)
+    return route
+
+
+def held_karp(matrix: list, closed: bool = False) -> list:
+    """Exact shortest tour/path from node 0 through every other node."""
+    n = len(matrix)
+    if n <= 2:
+        return nearest_neighbour(matrix, closed)
+
+    m = n - 1                       # nodes 1..n-1 map to bits 0..m-1
+    full = (1 << m) - 1
+    inf = float("inf")
+    cost = [[inf] * m for _ in range(1 << m)]
+    parent = [[-1] * m for _ in range(1 << m)]
+    for j in range(m):
+        cost[1 << j][j] = matrix[0][j + 1]
+
+    for mask in range(1, full + 1):
+        row = cost[mask]
+        for j in range(m):
+            base = row[j]
+            if base == inf or not (mask >> j) & 1:
+                continue
+            from_row = matrix[j + 1]
+            for k in range(m):
+                if (mask >> k) & 1:
+                    continue
+                nxt_mask = mask | (1 << k)
+                c = base + from_row[k + 1]
+                if c < cost[nxt_mask][k]:
+                    cost[nxt_mask][k] = c
+                    parent[nxt_mask][k] = j
+
+    last = min(
+        range(m),
+        key=lambda j: cost[full][j] + (matrix[j + 1][0] if closed else 0.0),
+    )
+
+    # Walk parents back to the start
+    order = []
+    mask, j = full, last
+    while j != -1:
+        order.append(j + 1)
+        prev = parent[mask][j]
+        mask &= ~(1 << j)
+        j = prev
+    route = [0] + order[::-1]
+    if closed:
+        route.append(0)
+    return route
+
+
+# ─── Local Search ─────────────────────────────────────────────────────────────
+
+def two_opt(route: list, matrix: list, closed: bool, deadline: float) -> bool:
+    """One pass of first-improvement 2-opt. Returns True if the route changed."""
+    last = len(route) - 2 if closed else len(route) - 1
+    improved = False
+    for i in range(1, last):
+        a, b = route[i - 1], route[i]
+        for k in range(i + 1, last + 1):
+            c = route[k]
+            if k + 1 < len(route):
+                e = route[k + 1]
+                delta = matrix[a][c] + matrix[b][e] - matrix[a][b] - matrix[c][e]
+            else:
+                delta = matrix[a][c] - matrix[a][b]
+            if delta < -_EPS:
+                route[i:k + 1] = route[i:k + 1][::-1]
+                improved = True
+                b = route[i]
+        if time.perf_counter() > deadline:
+            break
+    return improved
+
+
+def or_opt(route: list, matrix: list, closed: bool, deadline: float) -> bool:
+    """
+    One pass of Or-opt: relocate segments of 1–3 stops (optionally reversed)
+    to the cheapest other position. Returns True if the route changed.
+    """
+    last = len(route) - 2 if closed else len(route) - 1
+    for seg_len in (1, 2, 3):
+        for i in range(1, last - seg_len + 2):
+            j = i + seg_len - 1
+            p, s, e = route[i - 1], route[i], route[j]
+            nx = route[j + 1] if j + 1 < len(route) else None
+            if nx is None:
+                gain = matrix[p][s]
+            else:
+                gain = matrix[p][s] + matrix[e][nx] - matrix[p][nx]
+
+            best_delta, best_k, best_rev = -_EPS, None, False
+            for k in range(0, last + 1):
+                if i - 1 <= k <= j:
+                    continue
+                u = route[k]
+                v = route[k + 1] if k + 1 < len(route) else None
+                if v is None:
+                    fwd, rev = matrix[u][s], matrix[u][e]
+                else:
+                    fwd = matrix[u][s] + matrix[e][v] - matrix[u][v]
+                    rev = matrix[u][e] + matrix[s][v] - matrix[u][v]
+                if fwd - gain < best_delta:
+                    best_delta, best_k, best_rev = fwd - gain, k, False
+                if rev - gain < best_delta:
+                    best_delta, best_k, best_rev = rev - gain, k, True
+
+            if best_k is not None:
+                segment = route[i:j + 1]
+                if best_rev:
+                    segment.reverse()
+                rest = route[:i] + route[j + 1:]
+                insert_at = best_k + 1 if best_k < i else best_k + 1 - seg_len
+                route[:] = rest[:insert_at] + segment + rest[insert_at:]
+                return True
+            if time.perf_counter() > deadline:
+                return False
+    return False
+
+
+# ─── Entry Point ──────────────────────────────────────────────────────────────
+
+def optimize_route(matrix: list, closed: bool = False, time_budget_ms: float = None) -> dict:
+    """
+    Solve one day. Node 0 is the fixed start.
+
+    Returns:
+      route            list of node indices (closed tours end with 0 again)
+      cost             total road time of `route`
+      baseline_cost    nearest-neighbour cost, for quality reporting
+      solver           'trivial' | 'held_karp' | 'local_search'
+      optimal          True when the result is provably optimal
+      solve_time_ms    wall time spent in the solver
+    """
+    started = time.perf_counter()
+    budget = DEFAULT_TIME_BUDGET_MS if time_budget_ms is None else time_budget_ms
+    deadline = started + budget / 1000.0
+    n = len(matrix)
+
+    baseline = nearest_neighbour(matrix, closed)
+    baseline_cost = route_cost(baseline, matrix)
+
+    if n <= 3:
+        route, solver, optimal = baseline, "trivial", True
+    elif n - 1 <= HELD_KARP_MAX_STOPS:
+        route, solver, optimal = held_karp(matrix, closed), "held_karp", True
+    else:
+        route, solver, optimal = list(baseline), "local_search", False
+        while time.perf_counter() < deadline:
+            changed = two_opt(route, matrix, closed, deadline)
+            changed = or_opt(route, matrix, closed, deadline) or changed
+            if not changed:
+                break
+
+    return {
+        "route": route,
+        "cost": route_cost(route, matrix),
+        "baseline_cost": baseline_cost,
+        "solver": solver,
+        "optimal": optimal,
+        "solve_time_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
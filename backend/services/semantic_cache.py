@@ -0,0 +1,232 @@
+"""
+services/semantic_cache.py
+--------------------------
+Semantic cache for the first turn of a new chat.
+
+Opening messages repeat across users with small wording changes ("plan a
+weekend in chennai", "Plan a weekend in Chennai!"), and each one costs a full
+Gemini turn with tool round-trips. The reply depends only on the message and
+the session context, so a first turn is looked up by meaning instead:
+  - the message is normalized and embedded with MiniLM (via the query
+    embedding cache in neo4j_service),
+  - candidates are scoped by what the prompt adds or the wording can't show:
+    the user's country, today's date, and the numbers / month names in the
+    message ("3 days" and "4 days" embed almost identically),
+  - the most similar stored message at or above SEMANTIC_CACHE_THRESHOLD
+    (cosine) returns its stored reply.
+
+Entries expire after SEMANTIC_CACHE_TTL_SECS and are dropped when the graph
+version changes (the reply quotes hotels, prices and places from the graph).
+Replies are stored with the user's name (whole words only) swapped out, so a
+greeting never leaks one user's name to another; a reply where the name also
+starts a proper noun ("Anna Nagar" for a user named Anna) is not cached.
+"""
+
+import os
+import re
+import copy
+import time
+from datetime import datetime
+
+import numpy as np
+
+from services.cache import LRUCache
+from services.neo4j_service import aembed_query, aget_graph_version, embedding_cache
+
+SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE", "true").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_TTL_SECS = float(os.getenv("SEMANTIC_CACHE_TTL_SECS", "21600"))
+SEMANTIC_CACHE_SCOPE_SIZE = int(os.getenv("SEMANTIC_CACHE_SCOPE_SIZE", "256"))
+
+_MAX_SCOPES = 512
+_FULL_NAME = "\x00full_name\x00"
+_FIRST_NAME = "\x00first_name\x00"
+_SALIENT_TOKENS = re.compile(
+    r"\d+(?:\.\d+)?|\b(?:one|two|three|four|five|six|seven|eight|nine|ten|twelve|fifteen|twenty|"
+    r"january|february|march|april|may|june|july|august|september|october|november|december|"
+    r"jan|feb|mar|apr|jun|jul|aug|sep|sept|oct|nov|dec|weekend|week|fortnight|month)\b"
+)
+
+
+class Probe:
+    """A first turn that was looked up: enough to store its reply without re-embedding."""
+
+    __slots__ = ("scope", "text", "vector", "version")
+
+    def __init__(self, scope: tuple, text: str, vector: np.ndarray, version):
+        self.scope = scope
+        self.text = text
+        self.vector = vector
+        self.version = version
+
+
+class _Bucket:
+    """Entries of one scope; vectors are kept as one matrix for a single matmul per lookup."""
+
+    def __init__(self):
+        self.texts = []
+        self.responses = []
+        self.versions = []
+        self.expires = []
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def keep(self, mask: list) -> int:
+        """Drop entries whose mask is False; returns how many were dropped."""
+        if all(mask):
+            return 0
+        idx = [k for k, ok in enumerate(mask) if ok]
+        self.texts = [self.texts[k] for k in idx]
+        self.responses = [self.responses[k] for k in idx]
+        self.versions = [self.versions[k] for k in idx]
+        self.expires = [self.expires[k] for k in idx]
+        self.vectors = self.vectors[idx]
+        return len(mask) - len(idx)
+
+    def add(self, text: str, vector: np.ndarray, response: dict, version, expires_at: float) -> None:
+        if text in self.texts:
+            self.keep([t != text for t in self.texts])
+        if len(self.texts) >= SEMANTIC_CACHE_SCOPE_SIZE:
+            self.keep([k > 0 for k in range(len(self.texts))])    # oldest first
+        self.texts.append(text)
+        self.responses.append(response)
+        self.versions.append(version)
+        self.expires.append(expires_at)
+        row = vector.reshape(1, -1)
+        self.vectors = row.copy() if not len(self.vectors) else np.vstack([self.vectors, row])
+
+
+class SemanticCache:
+    def __init__(self, threshold: float, ttl: float):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.buckets = LRUCache(maxsize=_MAX_SCOPES)    # scope -> _Bucket
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evicted = 0
+
+    # ─── Keys ─────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def scope(text: str, profile: dict) -> tuple:
+        country = str((profile or {}).get("country") or "").strip().lower()
+        salient = tuple(sorted(_SALIENT_TOKENS.findall(text)))
+        return country, datetime.now().date().isoformat(), salient
+
+    @staticmethod
+    def _map_strings(value, fn):
+        """`value` with `fn` applied to every string inside it."""
+        if isinstance(value, str):
+            return fn(value)
+        if isinstance(value, list):
+            return [SemanticCache._map_strings(v, fn) for v in value]
+        if isinstance(value, dict):
+            return {k: SemanticCache._map_strings(v, fn) for k, v in value.items()}
+        return value
+
+    @staticmethod
+    def _strings(value):
+        if isinstance(value, str):
+            yield value
+        elif isinstance(value, (list, dict)):
+            for v in value.values() if isinstance(value, dict) else value:
+                yield from SemanticCache._strings(v)
+
+    @staticmethod
+    def _names(profile: dict) -> list:
+        """(placeholder, name) for the full and first name — the forms a reply greets the user with."""
+        full_name = str((profile or {}).get("full_name") or "").strip()
+        first_name = full_name.split()[0] if full_name else ""
+        return [(_FULL_NAME, full_name), (_FIRST_NAME, first_name)]
+
+    # ─── Lookup & Store ───────────────────────────────────────────────────────
+
+    async def lookup(self, user_input: str, profile: dict) -> tuple:
+        """
+        (response or None, probe). Pass the probe to `store` after a miss;
+        probe is None when the turn can't be cached (embedding failed).
+        """
+        text = embedding_cache.normalize(user_input or "")
+        if not text:
+            return None, None
+        try:
+            vector = np.asarray(await aembed_query(text), dtype=np.float32)
+        except Exception as e:
+            print(f"⚠️  Semantic cache embedding failed: {e}")
+            return None, None
+        norm = float(np.linalg.norm(vector))
+        if norm:
+            vector = vector / norm
+        probe = Probe(self.scope(text, profile), text, vector, await aget_graph_version())
+
+        bucket = self.buckets.get(probe.scope)
+        if bucket is not None and len(bucket):
+            now = time.monotonic()
+            self.evicted += bucket.keep([
+                expires_at > now and version == probe.version
+                for expires_at, version in zip(bucket.expires, bucket.versions)
+            ])
+        if bucket is not None and len(bucket):
+            similarities = bucket.vectors @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.threshold:
+                self.hits += 1
+                print(f"🧠 Semantic cache hit ({similarities[best]:.3f}): {text!r} ≈ {bucket.texts[best]!r}")
+                response = copy.deepcopy(bucket.responses[best])
+                for placeholder, name in self._names(profile):
+                    response = self._map_strings(response, lambda v: v.replace(placeholder, name or "there"))
+                return response, probe
+        self.misses += 1
+        return None, probe
+
+    def store(self, probe: Probe, response: dict, profile: dict) -> None:
+        if probe is None or not isinstance(response, dict) or not response.get("text"):
+            return
+        stored = copy.deepcopy(response)
+        for placeholder, name in self._names(profile):    # full name first, then what's left of the first name
+            if len(name) < 2:
+                continue
+            word = re.compile(rf"(?<!\w){re.escape(name)}(?!\w)")
+            # "Anna Nagar", "Marina Beach": the name is part of a proper noun, not a greeting — don't cache
+            if any(re.search(rf"{word.pattern}\s+[A-Z]", v) for v in self._strings(stored)):
+                print("🧠 Semantic cache skipped a reply where the user's name is ambiguous.")
+                return
+            stored = self._map_strings(stored, lambda v: word.sub(lambda _: placeholder, v))
+
+        bucket = self.buckets.get(probe.scope)
+        if bucket is None:
+            bucket = _Bucket()
+            self.buckets.set(probe.scope, bucket)
+        bucket.add(probe.text, probe.vector, stored, probe.version, time.monotonic() + self.ttl)
+        self.stores += 1
+
+    def clear(self) -> None:
+        self.buckets.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": sum(len(b) for b in self.buckets.values()),
+            "scopes": len(self.buckets),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "stores": self.stores,
+            "evicted": self.evicted,
+            "threshold": self.threshold,
+        }
+
+
+semantic_cache = SemanticCache(SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_TTL_SECS)
+
+
+def is_first_turn(history: dict, submitted_data: dict = None) -> bool:
+    """Only a new chat's free-text opener is cacheable — later turns depend on the conversation."""
+    return SEMANTIC_CACHE and not submitted_data and not (history or {}).get("messages")
+
+
+def stats() -> dict:
+    return semantic_cache.stats()
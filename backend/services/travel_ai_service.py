@@ -1,6 +1,7 @@
 import os
+import re
 import json
-import httpx
+import time
 from datetime import datetime
 from dotenv import load_dotenv
 import asyncio
@@ -10,17 +11,96 @@ _BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 load_dotenv(dotenv_path=os.path.join(_BACKEND_DIR, ".env"))
 
 from google import genai
-from google.genai import types
+from google.genai import types, errors
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.tools import tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
 
-from services.neo4j_service import query_graph
+from services import weather_service
+from services.neo4j_service import query_graph, aquery_graph
+from services.intent_router import route_request
+from services.semantic_cache import semantic_cache, is_first_turn
+from services import firestore_async
 from services.firestore_service import get_user_profile
+from services.chat_history import history_contents, summary_backlog, backlog_messages, summary_prompt
+from services.rate_limiter import AsyncTokenBucket
 
 # Initialize Gemini
 MODEL = "gemini-2.5-flash"
 client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
 
+# ─── Gemini Pacing ───
+# Chat turns take a token from gemini_limiter: GEMINI_RPM per minute, GEMINI_BURST
+# back-to-back — unlimited by default; set it to the project's quota. Background work
+# (history summaries, title refinement) has its own, smaller bucket so it never
+# queues ahead of a user's turn. A 429 pauses both buckets for the server's retry
+# delay (the quota is shared) and the call is retried.
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "0"))
+GEMINI_BURST = int(os.getenv("GEMINI_BURST", "5"))
+GEMINI_BACKGROUND_RPM = float(os.getenv("GEMINI_BACKGROUND_RPM", "10"))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+
+gemini_limiter = AsyncTokenBucket(GEMINI_RPM, GEMINI_BURST)
+gemini_background_limiter = AsyncTokenBucket(GEMINI_BACKGROUND_RPM, 1)
+
+
+def _retry_delay(e: errors.APIError, attempt: int) -> float:
+    """Server-suggested delay from RetryInfo (e.g. "17s"), else exponential backoff."""
+    try:
+        for detail in e.details.get("error", {}).get("details", []):
+            if detail.get("@type", "").endswith("RetryInfo"):
+                return float(re.match(r"[\d.]+", detail["retryDelay"]).group())
+    except Exception:
+        pass
+    return float(2 ** attempt)
+
+
+def _recover(e: errors.APIError, attempt: int, config):
+    """Config to retry a failed call with, or None to re-raise."""
+    if attempt == GEMINI_MAX_RETRIES:
+        return None
+    if e.code == 429:
+        delay = _retry_delay(e, attempt)
+        print(f"⏳ Gemini rate limit hit, retrying in {delay:.1f}s (attempt {attempt + 1}/{GEMINI_MAX_RETRIES}).")
+        gemini_limiter.pause(delay)
+        gemini_background_limiter.pause(delay)
+        return config
+    if getattr(config, "cached_content", None) and e.code in (400, 403, 404):
+        # Cache expired or was evicted server-side — resend the prompt inline
+        print(f"⚠️  Cached system prompt rejected ({e.code}); sending it inline.")
+        prompt_cache.invalidate()
+        return chat_config()
+    return None
+
+
+async def generate_content(contents, config, background: bool = False):
+    """Rate-limited client.aio.models.generate_content; `background` calls use the low-priority bucket."""
+    limiter = gemini_background_limiter if background else gemini_limiter
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        await limiter.acquire()
+        try:
+            return await client.aio.models.generate_content(model=MODEL, contents=contents, config=config)
+        except errors.APIError as e:
+            config = _recover(e, attempt, config)
+            if config is None:
+                raise
+
+
+async def generate_stream(contents, config):
+    """Rate-limited client.aio.models.generate_content_stream; a 429 before the first chunk is retried."""
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        await gemini_limiter.acquire()
+        started = False
+        try:
+            async for chunk in await client.aio.models.generate_content_stream(model=MODEL, contents=contents, config=config):
+                started = True
+                yield chunk
+            return
+        except errors.APIError as e:
+            config = None if started else _recover(e, attempt, config)
+            if config is None:
+                raise
+
 # ─── TOOLS FOR THE AI ───
 
 @tool
@@ -42,15 +122,7 @@ async def check_chennai_weather(start_date: str, end_date: str):
     Fetch weather forecast for Chennai using YYYY-MM-DD dates.
     Use this once travel dates are known to warn about bad weather.
     """
-    url = f"https://api.open-meteo.com/v1/forecast?latitude=13.0827&longitude=80.2707&daily=weathercode,temperature_2m_max,temperature_2m_min,precipitation_sum&start_date={start_date}&end_date={end_date}&timezone=Asia%2FKolkata"
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.get(url)
-            if resp.status_code == 200:
-                return resp.json().get("daily", {})
-            return {"error": "Weather forecast unavailable for these dates."}
-        except Exception as e:
-            return {"error": f"Failed to fetch weather: {str(e)}"}
+    return await weather_service.get_forecast(start_date, end_date)
 
 @tool
 def get_current_date() -> str:
@@ -66,110 +138,323 @@ TOOLS = [search_travel_graph, check_chennai_weather, get_current_date]
 async def execute_tool(name: str, args: dict):
     """Router to execute the correct tool based on GenAI's function call."""
     if name == "search_travel_graph":
-        return search_travel_graph.func(**args)
+        return await aquery_graph(**args)
     elif name == "check_chennai_weather":
         return await check_chennai_weather.func(**args)
     elif name == "get_current_date":
         return get_current_date.func()
     return f"Error: Tool '{name}' not found."
 
+# ─── Prompt & Tool Schema ───
+# Everything here is identical for every user and turn, so it is built once and,
+# where the API allows, registered as cached content and referenced by name.
+
+SYSTEM_PROMPT = """
+You are Xplorer AI, an expert travel agent for Chennai, India. 
+
+SESSION CONTEXT:
+The latest user message starts with a [SESSION CONTEXT] block with the current date and the user's name and origin. Use it for relative dates and personalization.
+
+CONVERSATIONAL GUIDELINES:
+- Be concise, natural, and friendly.
+- DO NOT repeat information.
+- DO NOT acknowledge intent (e.g., don't say "I will check that for you"). Just use the tools immediately.
+- Handle missing data step-by-step. Ask for dates or interests before providing a final plan.
+- DO NOT ask for a budget.
+
+CORE WORKFLOW:
+1. Identify intent: Itinerary, Hotel booking, Cab booking, or a mix.
+2. Gather info: Dates, traveler count, interests.
+3. Use Tools: 
+    * Use `search_travel_graph` with `query_type='vector_search'` for descriptive/vague requests (e.g. "romantic place", "quiet hotel").
+    * Use `search_travel_graph` with 'find_places'/'find_hotels' for specific categorical filters.
+    * Use `check_chennai_weather` once dates are known.
+4. Evaluation: If tools return errors or bad weather, inform the user and suggest alternatives.
+5. Response: Provide the final plan or ask for missing info.
+
+RESPONSE FORMAT (JSON):
+You MUST respond ONLY with a valid JSON object.
+If generating a multi-day itinerary, structure the `itinerary` key as an ARRAY of DAY OBJECTS. Each day object must have:
+- `dayNumber`: (int)
+- `theme`: (str, e.g., "Cultural Exploration")
+- `activities`: (List[str], e.g., ["Morning: Visit Fort St. George", "Afternoon: Explore Government Museum"])
+- `hotels`: (Optional[str], name of hotel or null)
+- `transport`: (Optional[str], type of transport or null)
+
+Example for itinerary key:
+"itinerary": [
+    {
+        "dayNumber": 1,
+        "theme": "Historical Chennai",
+        "activities": [
+            "Morning: Visit Fort St. George",
+            "Afternoon: Explore Government Museum"
+        ],
+        "hotels": "The Leela Palace",
+        "transport": "Cab"
+    },
+    {
+        "dayNumber": 2,
+        "theme": "Beaches and Temples",
+        "activities": [
+            "Morning: Sunrise at Marina Beach",
+            "Afternoon: Visit Kapaleeshwarar Temple"
+        ],
+        "hotels": null,
+        "transport": "Auto-rickshaw"
+    }
+]
+"""
+
+
+def _function_declaration(lc_tool) -> types.FunctionDeclaration:
+    """LangChain @tool → Gemini function declaration (JSON schema of its arguments)."""
+    schema = convert_to_openai_tool(lc_tool)["function"]
+    return types.FunctionDeclaration(
+        name=schema["name"],
+        description=schema.get("description", ""),
+        parameters_json_schema=schema.get("parameters", {"type": "object", "properties": {}}),
+    )
+
+
+# Serialized once at import — not rebuilt from the @tool objects on every call
+TOOL_SCHEMA = types.Tool(function_declarations=[_function_declaration(t) for t in TOOLS])
+
+GEMINI_CONTEXT_CACHE = os.getenv("GEMINI_CONTEXT_CACHE", "true").lower() == "true"
+GEMINI_CONTEXT_CACHE_TTL_SECS = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL_SECS", "3600"))
+_CACHE_RETRY_SECS = 300
+_CACHE_RENEW_EARLY_SECS = 120
+_CACHE_TOO_SMALL = ("too small", "min_total_token_count", "minimum token")
+
+
+class PromptCache:
+    """
+    Handle to SYSTEM_PROMPT + TOOL_SCHEMA registered via the cached-content API.
+    get() returns the cache name, or None to send the prompt inline (caching
+    disabled, prompt below the model's caching minimum, or API errors).
+
+    The cache is created at startup (main.py lifespan) and renewed in a
+    background task — a chat turn never waits on caches.create. A rejection
+    because the prompt is below the model's minimum disables caching for the
+    life of the process.
+    """
+
+    def __init__(self, enabled: bool, ttl_secs: int):
+        self.enabled = enabled
+        self.ttl_secs = ttl_secs
+        self.name = None
+        self.expires_at = 0.0
+        self.renew_at = 0.0
+        self.retry_at = 0.0
+        self._task = None
+
+    async def get(self):
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        if self.name and now < self.expires_at:
+            if now >= self.renew_at:
+                self._schedule_refresh()
+            return self.name
+        self._schedule_refresh()
+        return None
+
+    def _schedule_refresh(self) -> None:
+        if self._task is None and time.monotonic() >= self.retry_at:
+            self._task = asyncio.create_task(self.refresh())
+            self._task.add_done_callback(lambda _: setattr(self, "_task", None))
+
+    async def refresh(self) -> None:
+        """Create (or renew) the cached content. Never raises."""
+        if not self.enabled:
+            return
+        try:
+            cache = await client.aio.caches.create(
+                model=MODEL,
+                config=types.CreateCachedContentConfig(
+                    display_name="xplorer-system-prompt",
+                    system_instruction=SYSTEM_PROMPT,
+                    tools=[TOOL_SCHEMA],
+                    ttl=f"{self.ttl_secs}s",
+                ),
+            )
+            now = time.monotonic()
+            self.name = cache.name
+            # Stop using it a minute early so in-flight turns never reference an expired cache
+            self.expires_at = now + max(self.ttl_secs - 60, 0)
+            self.renew_at = now + max(self.ttl_secs - _CACHE_RENEW_EARLY_SECS, 0)
+            print(f"🗄️  System prompt cached as {cache.name}.")
+        except errors.APIError as e:
+            if e.code == 400 and any(s in str(e.message or e).lower() for s in _CACHE_TOO_SMALL):
+                self.enabled = False
+                self.name = None
+                print("⚠️  System prompt is below the model's context-caching minimum; sending it inline from now on.")
+            else:
+                self._refresh_failed(e)
+        except Exception as e:
+            self._refresh_failed(e)
+
+    def _refresh_failed(self, e: Exception) -> None:
+        self.retry_at = time.monotonic() + _CACHE_RETRY_SECS
+        print(f"⚠️  Prompt caching unavailable, sending system prompt inline: {e}")
+
+    def invalidate(self) -> None:
+        self.name = None
+        self.expires_at = 0.0
+
+
+prompt_cache = PromptCache(GEMINI_CONTEXT_CACHE, GEMINI_CONTEXT_CACHE_TTL_SECS)
+
+
+def chat_config(cached_content: str = None) -> types.GenerateContentConfig:
+    """Generation config for chat turns; the cached handle replaces system prompt + tools."""
+    if cached_content:
+        return types.GenerateContentConfig(
+            cached_content=cached_content,
+            temperature=0.3,
+            response_mime_type="application/json",
+        )
+    return types.GenerateContentConfig(
+        system_instruction=SYSTEM_PROMPT,
+        tools=[TOOL_SCHEMA],
+        temperature=0.3,
+        response_mime_type="application/json",
+    )
+
+# ─── History Summary ───
+# Older turns are folded into a rolling summary on the conversation doc, off the request path.
+_summary_tasks = {}     # (uid, convo_id) -> asyncio.Task
+
+async def refresh_history_summary(uid: str, history: dict) -> None:
+    """Fold the turns waiting in `history` into its rolling summary and store it."""
+    backlog = summary_backlog(history)
+    if not backlog:
+        return
+    start, end = backlog
+    messages = backlog_messages(history, start, end)
+    if messages is None:
+        # Summary fell behind the turn's partial load — read the whole conversation once
+        full = await firestore_async.get_conversation(uid, history["convo_id"])
+        messages = full["messages"][start:end]
+    response = await generate_content(
+        contents=summary_prompt(history.get("history_summary", ""), messages),
+        config=types.GenerateContentConfig(temperature=0.2),
+        background=True,
+    )
+    if response.text:
+        await firestore_async.update_conversation_summary(uid, history["convo_id"], response.text.strip(), end)
+        print(f"📝 History summary refreshed for {history['convo_id']} (through message {end}).")
+
+def schedule_summary_refresh(uid: str, history: dict) -> None:
+    """Start refresh_history_summary in the background (at most one per conversation)."""
+    convo_id = history.get("convo_id")
+    if not convo_id or not summary_backlog(history):
+        return
+    key = (uid, convo_id)
+    if key in _summary_tasks:
+        return
+
+    async def run():
+        try:
+            await refresh_history_summary(uid, history)
+        except Exception as e:
+            print(f"⚠️  History summary refresh failed for {convo_id}: {e}")
+        finally:
+            _summary_tasks.pop(key, None)
+    _summary_tasks[key] = asyncio.create_task(run())
+
+# ─── Conversation Titles ───
+# New chats get an instant local title; the LLM title replaces it in the background.
+CHAT_TITLE_REFINE = os.getenv("CHAT_TITLE_REFINE", "true").lower() == "true"
+DEFAULT_CHAT_TITLE = "New Trip Plan"
+_TITLE_FILLER = {
+    "a", "an", "the", "i", "im", "i'm", "me", "my", "we", "us", "our", "you", "can", "could", "would",
+    "will", "please", "want", "wanna", "like", "need", "help", "plan", "to", "for", "with", "and", "of",
+    "in", "on", "at", "is", "are", "be", "some", "hi", "hello", "hey", "there", "going", "looking",
+}
+_title_tasks = set()    # keeps background refinements referenced until done
+
+def quick_title(user_input: str, max_words: int = 5) -> str:
+    """Instant title from the first message: its first few content words, title-cased."""
+    words = [w for w in re.findall(r"[A-Za-z0-9][A-Za-z0-9'&-]*", user_input or "") if w.lower() not in _TITLE_FILLER]
+    if not words:
+        return DEFAULT_CHAT_TITLE
+    return " ".join(w if w.isupper() else w.capitalize() for w in words[:max_words])[:60]
+
+def schedule_title_refinement(agent: "XplorerAI", convo_id: str, user_input: str) -> None:
+    """Replace a conversation's quick_title with the LLM title, off the request path."""
+    if not CHAT_TITLE_REFINE:
+        return
+
+    async def run():
+        try:
+            title = await agent.generate_title(user_input)
+            if title:
+                await firestore_async.update_conversation_title(agent.uid, convo_id, title[:100])
+        except Exception as e:
+            print(f"⚠️  Title refinement failed for {convo_id}: {e}")
+
+    task = asyncio.create_task(run())
+    _title_tasks.add(task)
+    task.add_done_callback(_title_tasks.discard)
+
+# Seconds each tool may take before the model is told to carry on without it
+TOOL_TIMEOUT_SECS = float(os.getenv("TOOL_TIMEOUT_SECS", "15"))
+TOOL_TIMEOUTS = {
+    "check_chennai_weather": 10.0,
+    "get_current_date": 2.0,
+}
+
+async def run_tool_call(name: str, args: dict):
+    """execute_tool under the tool's timeout; failures become an error result for the model."""
+    timeout = TOOL_TIMEOUTS.get(name, TOOL_TIMEOUT_SECS)
+    print(f"🔧 Tool call: {name}({args})")
+    try:
+        result = await asyncio.wait_for(execute_tool(name, args), timeout)
+    except asyncio.TimeoutError:
+        result = {"error": f"Tool '{name}' timed out after {timeout:g}s. Continue without this data."}
+    except Exception as e:
+        result = {"error": f"Tool '{name}' failed: {e}"}
+    print(f"   ↳ {name} result: {str(result)[:200]}...")
+    return result
+
 class XplorerAI:
-    def __init__(self, uid: str):
+    def __init__(self, uid: str, user_profile: dict = None):
         self.uid = uid
-        self.user_profile = get_user_profile(uid)
+        self.user_profile = user_profile if user_profile is not None else get_user_profile(uid)
+
+    @classmethod
+    async def create(cls, uid: str) -> "XplorerAI":
+        """Build the agent without blocking the event loop (profile comes from the cache when warm)."""
+        return cls(uid, await firestore_async.get_user_profile(uid))
 
     async def generate_title(self, user_input: str) -> str:
         """Generates a concise title for the chat session based on the first message."""
-        response = await client.aio.models.generate_content(
-            model=MODEL,
+        response = await generate_content(
             contents=f"Generate a short, concise 3-5 word title for a travel conversation that starts with this message. Do not use quotes.\nUser: {user_input}",
-            config=types.GenerateContentConfig(temperature=0.5)
+            config=types.GenerateContentConfig(temperature=0.5),
+            background=True,
         )
         return response.text.strip()
 
-    async def process_chat(self, user_input: str, history: dict, submitted_data: dict = None):
+    def _session_context(self) -> str:
+        """Per-user / per-day part of the prompt — sent with the user turn, never cached."""
         today_str = datetime.now().strftime("%A, %B %d, %Y")
+        return (
+            "[SESSION CONTEXT]\n"
+            f"Current Date: {today_str}.\n"
+            f"User Name: {self.user_profile.get('full_name')}\n"
+            f"User Origin: {self.user_profile.get('country')}"
+        )
 
+    async def _build_request(self, user_input: str, history: dict, submitted_data: dict = None):
+        """Returns (contents, config) for the first model call of a chat turn."""
         if submitted_data:
             user_input = f"[USER SUBMITTED FORM DATA: {json.dumps(submitted_data)}]\n{user_input}"
+        user_input = f"{self._session_context()}\n\n{user_input}"
 
-        # System Prompt
-        system_prompt = f"""
-        You are Xplorer AI, an expert travel agent for Chennai, India. 
-        Current Date: {today_str}.
-
-        USER CONTEXT:
-        - Name: {self.user_profile.get('full_name')}
-        - Origin: {self.user_profile.get('country')}
-
-        CONVERSATIONAL GUIDELINES:
-        - Be concise, natural, and friendly.
-        - DO NOT repeat information.
-        - DO NOT acknowledge intent (e.g., don't say "I will check that for you"). Just use the tools immediately.
-        - Handle missing data step-by-step. Ask for dates or interests before providing a final plan.
-        - DO NOT ask for a budget.
-
-        CORE WORKFLOW:
-        1. Identify intent: Itinerary, Hotel booking, Cab booking, or a mix.
-        2. Gather info: Dates, traveler count, interests.
-        3. Use Tools: 
-            * Use `search_travel_graph` with `query_type='vector_search'` for descriptive/vague requests (e.g. "romantic place", "quiet hotel").
-            * Use `search_travel_graph` with 'find_places'/'find_hotels' for specific categorical filters.
-            * Use `check_chennai_weather` once dates are known.
-        4. Evaluation: If tools return errors or bad weather, inform the user and suggest alternatives.
-        5. Response: Provide the final plan or ask for missing info.
-
-        RESPONSE FORMAT (JSON):
-        You MUST respond ONLY with a valid JSON object.
-        If generating a multi-day itinerary, structure the `itinerary` key as an ARRAY of DAY OBJECTS. Each day object must have:
-        - `dayNumber`: (int)
-        - `theme`: (str, e.g., "Cultural Exploration")
-        - `activities`: (List[str], e.g., ["Morning: Visit Fort St. George", "Afternoon: Explore Government Museum"])
-        - `hotels`: (Optional[str], name of hotel or null)
-        - `transport`: (Optional[str], type of transport or null)
-        
-        Example for itinerary key:
-        "itinerary": [
-            {{
-                "dayNumber": 1,
-                "theme": "Historical Chennai",
-                "activities": [
-                    "Morning: Visit Fort St. George",
-                    "Afternoon: Explore Government Museum"
-                ],
-                "hotels": "The Leela Palace",
-                "transport": "Cab"
-            }},
-            {{
-                "dayNumber": 2,
-                "theme": "Beaches and Temples",
-                "activities": [
-                    "Morning: Sunrise at Marina Beach",
-                    "Afternoon: Visit Kapaleeshwarar Temple"
-                ],
-                "hotels": null,
-                "transport": "Auto-rickshaw"
-            }}
-        ]
-        """
-
-        # Build conversation contents
-        contents = []
-
-        # Add past messages
-        past_messages = history.get('messages', [])
-        for msg in past_messages:
-            contents.append(types.Content(
-                role="user",
-                parts=[types.Part.from_text(text=msg.get('user_input', ''))]
-            ))
-            ai_out = msg.get('ai_generated_output', '')
-            if isinstance(ai_out, dict):
-                ai_out = json.dumps(ai_out)
-            contents.append(types.Content(
-                role="model",
-                parts=[types.Part.from_text(text=str(ai_out))]
-            ))
+        # Build conversation contents: rolling summary + compacted older turns + the last few verbatim
+        contents = history_contents(history)
 
         # Append current user input
         contents.append(types.Content(
@@ -177,76 +462,268 @@ class XplorerAI:
             parts=[types.Part.from_text(text=user_input)]
         ))
 
-        # Configuration
-        config = types.GenerateContentConfig(
-            system_instruction=system_prompt,
-            tools=TOOLS,
-            temperature=0.3,
-            response_mime_type="application/json",
-        )
+        # Static prompt + tool schema by cached-content handle when available
+        return contents, chat_config(await prompt_cache.get())
+
+    @staticmethod
+    def _parse_final(raw_text: str) -> dict:
+        """Final model text → response dict (plain text falls back to {"text", "itinerary": None})."""
+        raw_text = raw_text.strip() if raw_text else '{"text": "I encountered an issue. Please try again.", "itinerary": null}'
+
+        # Clean up markdown code blocks
+        if raw_text.startswith("```json"):
+            raw_text = raw_text[7:-3].strip()
+        elif raw_text.startswith("```"):
+            raw_text = raw_text[3:-3].strip()
+
+        try:
+            return json.loads(raw_text)
+        except json.JSONDecodeError:
+            return {
+                "text": raw_text,
+                "itinerary": None
+            }
+
+    async def process_chat(self, user_input: str, history: dict, submitted_data: dict = None):
+        # Well-formed hotel / cab form submissions are answered from the graph without the model
+        routed = await route_request(user_input, submitted_data, history)
+        if routed is not None:
+            return routed
+
+        # A new chat's opener may match an earlier one closely enough to reuse its reply
+        probe = None
+        if is_first_turn(history, submitted_data):
+            cached, probe = await semantic_cache.lookup(user_input, self.user_profile)
+            if cached is not None:
+                return cached
+
+        contents, config = await self._build_request(user_input, history, submitted_data)
+        schedule_summary_refresh(self.uid, history)
 
         # Call the model
-        response = await client.aio.models.generate_content(
-            model=MODEL,
-            contents=contents,
-            config=config,
-        )
+        response = await generate_content(contents, config)
 
         # Tool calling loop
         while response.candidates and response.candidates[0].content.parts:
-            has_function_call = False
-            tool_response_parts = []
-
-            for part in response.candidates[0].content.parts:
-                if part.function_call:
-                    has_function_call = True
-                    fn_name = part.function_call.name
-                    fn_args = dict(part.function_call.args) if part.function_call.args else {}
-
-                    print(f"🔧 Tool call: {fn_name}({fn_args})")
-                    tool_result = await execute_tool(fn_name, fn_args)
-                    print(f"   ↳ Result: {tool_result[:200]}...")
-
-                    tool_response_parts.append(
-                        types.Part.from_function_response(
-                            name=fn_name,
-                            response={"result": tool_result}
-                        )
-                    )
-
-            if not has_function_call:
+            calls = [part.function_call for part in response.candidates[0].content.parts if part.function_call]
+            if not calls:
                 break
 
+            # All tool calls of one turn run concurrently — the turn costs the slowest tool, not the sum
+            results = await asyncio.gather(*(
+                run_tool_call(call.name, dict(call.args) if call.args else {}) for call in calls
+            ))
+            tool_response_parts = [
+                types.Part.from_function_response(name=call.name, response={"result": result})
+                for call, result in zip(calls, results)
+            ]
+
             # Add the model's function call message and our tool responses
             contents.append(response.candidates[0].content)
             contents.append(types.Content(
                 role="user",
                 parts=tool_response_parts
             ))
-            
-            # Add a delay to prevent hitting rate limits
-            await asyncio.sleep(1) 
 
-            # Get updated response
-            response = await client.aio.models.generate_content(
-                model=MODEL,
-                contents=contents,
-                config=config,
-            )
+            # Get updated response (paced by gemini_limiter when GEMINI_RPM is set)
+            response = await generate_content(contents, config)
 
         # Extract final text
-        raw_text = response.text.strip() if response.text else '{"text": "I encountered an issue. Please try again.", "itinerary": null}'
+        final = self._parse_final(response.text)
+        if response.text:
+            semantic_cache.store(probe, final, self.user_profile)
+        return final
 
-        # Clean up markdown code blocks
-        if raw_text.startswith("```json"):
-            raw_text = raw_text[7:-3].strip()
-        elif raw_text.startswith("```"):
-            raw_text = raw_text[3:-3].strip()
+    async def stream_chat(self, user_input: str, history: dict, submitted_data: dict = None):
+        """
+        Streaming process_chat. Async generator of (event, data) tuples:
+          ("tool_call",   {"name", "args"})
+          ("tool_result", {"name", "ok", "elapsed_ms"})
+          ("delta",       {"text"})         — new characters of the reply's "text" field
+          ("final",       {...})            — the parsed response, same shape as process_chat
+        """
+        routed = await route_request(user_input, submitted_data, history)
+        if routed is not None:
+            yield "delta", {"text": routed["text"]}
+            yield "final", routed
+            return
+
+        probe = None
+        if is_first_turn(history, submitted_data):
+            cached, probe = await semantic_cache.lookup(user_input, self.user_profile)
+            if cached is not None:
+                yield "delta", {"text": cached.get("text", "")}
+                yield "final", cached
+                return
+
+        contents, config = await self._build_request(user_input, history, submitted_data)
+        schedule_summary_refresh(self.uid, history)
+
+        while True:
+            text_field = _JsonTextStreamer()
+            raw_chunks, model_parts = [], []
+
+            async for chunk in generate_stream(contents, config):
+                if not chunk.candidates or not chunk.candidates[0].content or not chunk.candidates[0].content.parts:
+                    continue
+                for part in chunk.candidates[0].content.parts:
+                    model_parts.append(part)
+                    if part.text and not part.thought:
+                        raw_chunks.append(part.text)
+                        new_text = text_field.feed(part.text)
+                        if new_text:
+                            yield "delta", {"text": new_text}
+
+            calls = [part.function_call for part in model_parts if part.function_call]
+            if not calls:
+                final = self._parse_final("".join(raw_chunks))
+                if raw_chunks:
+                    semantic_cache.store(probe, final, self.user_profile)
+                yield "final", final
+                return
+
+            # Same concurrent tool round as process_chat, reporting each tool as it finishes
+            async def timed_call(k, call):
+                started = time.perf_counter()
+                result = await run_tool_call(call.name, dict(call.args) if call.args else {})
+                return k, result, round((time.perf_counter() - started) * 1000, 1)
+
+            for call in calls:
+                yield "tool_call", {"name": call.name, "args": dict(call.args) if call.args else {}}
+            results = [None] * len(calls)
+            for next_done in asyncio.as_completed([timed_call(k, call) for k, call in enumerate(calls)]):
+                k, result, elapsed_ms = await next_done
+                results[k] = result
+                ok = not (isinstance(result, dict) and "error" in result)
+                yield "tool_result", {"name": calls[k].name, "ok": ok, "elapsed_ms": elapsed_ms}
+
+            contents.append(types.Content(role="model", parts=model_parts))
+            contents.append(types.Content(
+                role="user",
+                parts=[
+                    types.Part.from_function_response(name=call.name, response={"result": result})
+                    for call, result in zip(calls, results)
+                ]
+            ))
 
+
+class _JsonTextStreamer:
+    """
+    Incrementally decodes the top-level "text" string of a JSON reply that
+    arrives in chunks, so the UI can show the answer while it is generated.
+    """
+
+    _ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+    _VALUE = re.compile(r'\s*:\s*"')
+    _VALUE_PREFIX = re.compile(r'\s*(?::\s*)?')
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = None      # index of the next undecoded char inside the string, once found
+        self.done = False
+        self.scan = 0        # next char to scan while looking for the top-level "text" key
+        self.depth = 0
+        self.key_position = False
+
+    def _string_end(self, start: int):
+        """Index of the quote closing the JSON string opened at `start`, or None if not buffered yet."""
+        i, buf = start + 1, self.buffer
+        while i < len(buf):
+            if buf[i] == '\\':
+                i += 2
+            elif buf[i] == '"':
+                return i
+            else:
+                i += 1
+        return None
+
+    def _find_text(self):
+        """Start of the top-level "text" value — keys of nested objects are skipped."""
+        i, buf = self.scan, self.buffer
+        while i < len(buf):
+            ch = buf[i]
+            if ch == '"':
+                end = self._string_end(i)
+                if end is None:
+                    break
+                if self.depth == 1 and self.key_position and buf[i + 1:end] == "text":
+                    match = self._VALUE.match(buf, end + 1)
+                    if match:
+                        return match.end()
+                    if self._VALUE_PREFIX.fullmatch(buf, end + 1):
+                        break                          # ': "' not fully arrived yet
+                self.key_position = False
+                i = end + 1
+                continue
+            if ch in "{[":
+                self.depth += 1
+                self.key_position = ch == "{"
+            elif ch in "}]":
+                self.depth -= 1
+            elif ch == ",":
+                self.key_position = True
+            elif ch == ":":
+                self.key_position = False
+            i += 1
+        self.scan = i
+        return None
+
+    def _unicode_escape(self, i: int):
+        """(char, length) for the \\u escape at `i`, pairing surrogates; None if not fully buffered."""
+        buf = self.buffer
+        if i + 6 > len(buf):
+            return None
         try:
-            return json.loads(raw_text)
-        except json.JSONDecodeError:
-            return {
-                "text": raw_text,
-                "itinerary": None
-            }
\ No newline at end of file
+            code = int(buf[i + 2:i + 6], 16)
+        except ValueError:
+            return "", 6
+        if 0xD800 <= code <= 0xDBFF:
+            follow = buf[i + 6:i + 8]
+            if "\\u".startswith(follow) and i + 12 > len(buf):
+                return None                            # low surrogate may still be on its way
+            if follow == "\\u":
+                try:
+                    low = int(buf[i + 8:i + 12], 16)
+                except ValueError:
+                    low = None
+                if low is not None and 0xDC00 <= low <= 0xDFFF:
+                    return chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)), 12
+            return "\ufffd", 6
+        if 0xDC00 <= code <= 0xDFFF:
+            return "\ufffd", 6                         # lone low surrogate
+        return chr(code), 6
+
+    def feed(self, chunk: str) -> str:
+        self.buffer += chunk
+        if self.done:
+            return ""
+        if self.pos is None:
+            self.pos = self._find_text()
+            if self.pos is None:
+                return ""
+
+        out, i, buf = [], self.pos, self.buffer
+        while i < len(buf):
+            ch = buf[i]
+            if ch == '"':
+                self.done = True
+                i += 1
+                break
+            if ch != '\\':
+                out.append(ch)
+                i += 1
+                continue
+            if i + 1 >= len(buf):
+                break                                  # escape split across chunks
+            esc = buf[i + 1]
+            if esc == 'u':
+                decoded = self._unicode_escape(i)
+                if decoded is None:
+                    break
+                out.append(decoded[0])
+                i += decoded[1]
+            else:
+                out.append(self._ESCAPES.get(esc, esc))
+                i += 2
+        self.pos = i
+        return "".join(out)
@@ -0,0 +1,110 @@
+"""
+services/vector_index.py
+------------------------
+In-process vector index over Place and Hotel description embeddings.
+
+The catalogue is small (tens to low thousands of 384-dim vectors), so a
+snapshot of the graph's embeddings answers `vector_search` without the two
+`db.index.vector.queryNodes` round-trips:
+  - Exact search: one matrix-vector product over every row, then a top-k
+    per label with argpartition.
+  - Large catalogues (≥ VECTOR_INDEX_HNSW_MIN rows per label) use an HNSW
+    graph per label when the optional `hnswlib` package is installed.
+
+Scores use Neo4j's cosine convention, (1 + cos) / 2, so results are
+interchangeable with the Neo4j vector index. Neo4j stays the source of truth;
+the snapshot is rebuilt when the graph version changes.
+"""
+
+import os
+import numpy as np
+
+try:
+    import hnswlib  # Optional — only worth it for large catalogues
+except ImportError:
+    hnswlib = None
+
+VECTOR_INDEX_HNSW_MIN = int(os.getenv("VECTOR_INDEX_HNSW_MIN", "20000"))
+
+# Cypher used to snapshot every embedded Place/Hotel
+SNAPSHOT_QUERY = """
+    MATCH (n) WHERE (n:Place OR n:Hotel) AND n.embedding IS NOT NULL
+    RETURN CASE WHEN n:Place THEN 'Place' ELSE 'Hotel' END AS label,
+           n.name AS name,
+           CASE WHEN n:Place THEN n.category ELSE 'hotel' END AS category,
+           n.description AS description,
+           n.embedding AS embedding
+"""
+
+
+class VectorIndex:
+    def __init__(self, rows: list, vectors: np.ndarray, labels: list, version: str = None):
+        self.rows = rows                      # [{name, category, description}]
+        self.version = version
+        if len(vectors):
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1, norms)
+        self.vectors = vectors
+        self.label_rows = {
+            label: np.flatnonzero(np.asarray(labels) == label) for label in sorted(set(labels))
+        }
+        self.hnsw = {}
+        if hnswlib is not None:
+            for label, idx in self.label_rows.items():
+                if len(idx) >= VECTOR_INDEX_HNSW_MIN:
+                    graph = hnswlib.Index(space="cosine", dim=self.vectors.shape[1])
+                    graph.init_index(max_elements=len(idx), ef_construction=200, M=16)
+                    graph.add_items(self.vectors[idx], idx)
+                    graph.set_ef(64)
+                    self.hnsw[label] = graph
+
+    @classmethod
+    def from_records(cls, records, version: str = None) -> "VectorIndex":
+        """Build from SNAPSHOT_QUERY rows (dicts with label/name/category/description/embedding)."""
+        rows, vectors, labels = [], [], []
+        for rec in records:
+            if not rec.get("embedding"):
+                continue
+            rows.append({
+                "name": rec["name"],
+                "category": rec["category"],
+                "description": rec["description"],
+            })
+            vectors.append(rec["embedding"])
+            labels.append(rec["label"])
+        matrix = np.asarray(vectors, dtype=np.float32) if vectors else np.zeros((0, 0), dtype=np.float32)
+        return cls(rows, matrix, labels, version)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def search(self, query, k_by_label: dict) -> list:
+        """
+        Top-k rows per label for one query vector, merged and sorted by score.
+        e.g. k_by_label={"Place": 5, "Hotel": 3}
+        """
+        if not len(self.rows):
+            return []
+        q = np.asarray(query, dtype=np.float32)
+        q = q / (np.linalg.norm(q) or 1.0)
+
+        exact_labels = [label for label in k_by_label if label not in self.hnsw]
+        cosines = self.vectors @ q if exact_labels else None   # one matmul for every label
+
+        hits = []
+        for label, k in k_by_label.items():
+            idx = self.label_rows.get(label)
+            if idx is None or not len(idx) or k <= 0:
+                continue
+            k = min(k, len(idx))
+            if label in self.hnsw:
+                ids, distances = self.hnsw[label].knn_query(q, k=k)
+                hits.extend(zip(ids[0].tolist(), (1.0 - distances[0]).tolist()))
+            else:
+                label_scores = cosines[idx]
+                top = np.argpartition(-label_scores, k - 1)[:k]
+                hits.extend(zip(idx[top].tolist(), label_scores[top].tolist()))
+
+        results = [{**self.rows[i], "score": (1.0 + cos) / 2.0} for i, cos in hits]
+        results.sort(key=lambda x: x["score"], reverse=True)
+        return results
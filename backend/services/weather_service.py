@@ -0,0 +1,135 @@
+"""
+services/weather_service.py
+---------------------------
+Chennai daily forecast (Open-Meteo) behind a per-day cache.
+
+Every trip planned for overlapping dates asks for the same fixed coordinates,
+so forecasts are stored one record per date and any range is answered from
+the cache, fetching only the missing span:
+  - TTL grows with lead time — tomorrow's forecast is revised more often
+    than one two weeks out, past dates never change.
+  - Concurrent requests for the same dates share one in-flight fetch.
+  - OPEN_METEO_BASE_URL can point at a local fake server for tests.
+"""
+
+import os
+import asyncio
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from services import http_client
+from services.cache import LRUCache
+
+OPEN_METEO_BASE_URL = os.getenv("OPEN_METEO_BASE_URL", "https://api.open-meteo.com/v1/forecast")
+WEATHER_CACHE_SIZE = int(os.getenv("WEATHER_CACHE_SIZE", "512"))
+WEATHER_CACHE_MIN_TTL_SECS = int(os.getenv("WEATHER_CACHE_MIN_TTL_SECS", "3600"))
+WEATHER_CACHE_MAX_TTL_SECS = int(os.getenv("WEATHER_CACHE_MAX_TTL_SECS", "43200"))
+
+CHENNAI_LAT, CHENNAI_LON = 13.0827, 80.2707
+TIMEZONE = "Asia/Kolkata"
+DAILY_FIELDS = ("weathercode", "temperature_2m_max", "temperature_2m_min", "precipitation_sum")
+
+UNAVAILABLE = {"error": "Weather forecast unavailable for these dates."}
+
+forecast_cache = LRUCache(maxsize=WEATHER_CACHE_SIZE)    # "YYYY-MM-DD" -> {field: value}
+_inflight = {}                                           # date -> asyncio.Task fetching it
+_fetches = 0
+
+
+# ─── Cache Policy ─────────────────────────────────────────────────────────────
+
+def _today() -> date:
+    return datetime.now(ZoneInfo(TIMEZONE)).date()
+
+
+def forecast_ttl(day: date, today: date = None) -> int:
+    """Seconds a day's forecast stays fresh: MIN_TTL per day of lead time, capped at MAX_TTL."""
+    lead_days = (day - (today or _today())).days
+    if lead_days < 0:
+        return WEATHER_CACHE_MAX_TTL_SECS
+    return min(WEATHER_CACHE_MIN_TTL_SECS * (1 + lead_days), WEATHER_CACHE_MAX_TTL_SECS)
+
+
+def _date_range(start: date, end: date) -> list:
+    return [start + timedelta(days=k) for k in range((end - start).days + 1)]
+
+
+# ─── Fetching ─────────────────────────────────────────────────────────────────
+
+async def _fetch_span(start: date, end: date) -> None:
+    """Fetch [start, end] in one request and cache every returned day."""
+    global _fetches
+    _fetches += 1
+    resp = await http_client.get(OPEN_METEO_BASE_URL, params={
+        "latitude": CHENNAI_LAT,
+        "longitude": CHENNAI_LON,
+        "daily": ",".join(DAILY_FIELDS),
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "timezone": TIMEZONE,
+    })
+    if resp.status_code != 200:
+        return
+    daily = resp.json().get("daily", {})
+    today = _today()
+    columns = {field: daily.get(field) or [] for field in DAILY_FIELDS}
+    for k, day in enumerate(daily.get("time", [])):
+        record = {field: values[k] if k < len(values) else None for field, values in columns.items()}
+        forecast_cache.set(day, record, ttl=forecast_ttl(date.fromisoformat(day), today))
+
+
+def _start_fetch(days: list) -> asyncio.Task:
+    task = asyncio.create_task(_fetch_span(days[0], days[-1]))
+    for day in days:
+        _inflight[day] = task
+
+    def _done(t):
+        for day in days:
+            if _inflight.get(day) is t:
+                del _inflight[day]
+        if not t.cancelled():
+            t.exception()    # retrieved here; waiters see it via shield()
+
+    task.add_done_callback(_done)
+    return task
+
+
+async def get_forecast(start_date: str, end_date: str) -> dict:
+    """
+    Daily forecast for Chennai between two YYYY-MM-DD dates, in Open-Meteo's
+    `daily` shape ({"time": [...], "weathercode": [...], ...}), or an error dict.
+    """
+    try:
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    except (TypeError, ValueError):
+        return UNAVAILABLE
+    if end < start:
+        return UNAVAILABLE
+
+    days = _date_range(start, end)
+    records = {d: forecast_cache.get(d.isoformat()) for d in days}
+    missing = [d for d, r in records.items() if r is None]
+    if missing:
+        to_fetch = [d for d in missing if d not in _inflight]
+        tasks = {_inflight[d] for d in missing if d in _inflight}
+        if to_fetch:
+            # One request for the whole missing span (re-fetching any cached days inside it)
+            tasks.add(_start_fetch(_date_range(to_fetch[0], to_fetch[-1])))
+        try:
+            # shield: a caller timing out must not cancel a fetch others are waiting on
+            await asyncio.gather(*(asyncio.shield(t) for t in tasks))
+        except Exception as e:
+            return {"error": f"Failed to fetch weather: {str(e)}"}
+        for d in missing:
+            records[d] = forecast_cache.peek(d.isoformat())     # already counted as a miss above
+
+    if any(r is None for r in records.values()):
+        return UNAVAILABLE
+    daily = {"time": [d.isoformat() for d in days]}
+    for field in DAILY_FIELDS:
+        daily[field] = [records[d][field] for d in days]
+    return daily
+
+
+def stats() -> dict:
+    return {**forecast_cache.stats(), "fetches": _fetches, "inflight": len(set(_inflight.values()))}